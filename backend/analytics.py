@@ -0,0 +1,277 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# --- Analytics Store ---
+# log_event() only enqueues; a writer thread inserts events in batches with
+# typed columns (tokens, model, region, theme, latency) and folds each batch
+# into rollup tables in the same transaction. /analytics reads the rollups,
+# so its cost depends on the number of distinct dimensions, not on history.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYTICS_DB_PATH = os.environ.get("ANALYTICS_DB_PATH", os.path.join(BASE_DIR, "data", "analytics.db"))
+ANALYTICS_FLUSH_INTERVAL = float(os.environ.get("ANALYTICS_FLUSH_INTERVAL", "1"))
+ANALYTICS_BATCH = int(os.environ.get("ANALYTICS_BATCH", "500"))
+ANALYTICS_QUEUE_SIZE = int(os.environ.get("ANALYTICS_QUEUE_SIZE", "10000"))
+
+SCHEMA_VERSION = "2"
+TYPED_FIELDS = ("model", "region", "theme", "tokens_input", "tokens_output", "latency_ms")
+DIMENSIONS = ("event_type", "region", "theme", "model")
+RECENT_LIMIT = 20
+DAILY_DAYS = 30
+
+_STOP = object()
+
+
+def event_row(event_type: str, details: dict) -> tuple:
+    # Known keys become columns; anything else (e.g. outreach type) stays in `details`
+    details = dict(details or {})
+    row = {
+        "model": details.pop("model", None) or "unknown",
+        "region": details.pop("target_region", None) or details.pop("region", None) or "unknown",
+        "theme": details.pop("theme", None) or "unknown",
+        "tokens_input": int(details.pop("tokens_input", 0) or 0),
+        "tokens_output": int(details.pop("tokens_output", 0) or 0),
+        "latency_ms": details.pop("latency_ms", None),
+    }
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    return (event_type, timestamp) + tuple(row[f] for f in TYPED_FIELDS) + (json.dumps(details) if details else None,)
+
+
+class AnalyticsStore:
+    def __init__(self, db_path: str = ANALYTICS_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._queue = queue.Queue(maxsize=ANALYTICS_QUEUE_SIZE)
+        self._thread = None
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "dropped": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                # Same table name as the old JSON-blob schema so existing databases upgrade in place
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        event_type TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        details TEXT
+                    )
+                """)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+                for name, sql_type in (("model", "TEXT"), ("region", "TEXT"), ("theme", "TEXT"),
+                                       ("tokens_input", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("tokens_output", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("latency_ms", "REAL")):
+                    if name not in columns:
+                        conn.execute(f"ALTER TABLE events ADD COLUMN {name} {sql_type}")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type_time ON events(event_type, timestamp)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                for table, keys in (("rollup_totals", DIMENSIONS), ("rollup_daily", ("day",) + DIMENSIONS)):
+                    key_columns = "".join(f"{k} TEXT NOT NULL, " for k in keys)
+                    conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            {key_columns}
+                            events INTEGER NOT NULL DEFAULT 0,
+                            tokens_input INTEGER NOT NULL DEFAULT 0,
+                            tokens_output INTEGER NOT NULL DEFAULT 0,
+                            latency_ms_sum REAL NOT NULL DEFAULT 0,
+                            latency_samples INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY ({", ".join(keys)})
+                        )
+                    """)
+            version = conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+            if not version or version[0] != SCHEMA_VERSION:
+                self._migrate(conn)
+            self._initialized = True
+
+    def _migrate(self, conn: sqlite3.Connection):
+        # One-time: move old JSON details into typed columns, then build rollups from history
+        legacy = conn.execute("SELECT id, event_type, details FROM events WHERE model IS NULL").fetchall()
+        updates = []
+        for row in legacy:
+            try:
+                details = json.loads(row["details"] or "{}")
+            except ValueError:
+                details = {}
+            typed = event_row(row["event_type"], details)
+            updates.append(typed[2:] + (row["id"],))
+        with conn:
+            conn.executemany(
+                "UPDATE events SET model = ?, region = ?, theme = ?, tokens_input = ?, tokens_output = ?, "
+                "latency_ms = ?, details = ? WHERE id = ?", updates
+            )
+            conn.execute("DELETE FROM rollup_totals")
+            conn.execute("DELETE FROM rollup_daily")
+            for table, day in (("rollup_totals", ""), ("rollup_daily", "date(timestamp), ")):
+                conn.execute(f"""
+                    INSERT INTO {table}
+                    SELECT {day}event_type, region, theme, model, COUNT(*), SUM(tokens_input), SUM(tokens_output),
+                           COALESCE(SUM(latency_ms), 0), COUNT(latency_ms)
+                    FROM events GROUP BY {day}event_type, region, theme, model
+                """)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (SCHEMA_VERSION,))
+        if updates:
+            print(f"Analytics Migration: moved {len(updates)} events to typed columns")
+
+    # --- Writer ---
+
+    def log_event(self, event_type: str, details: dict = None):
+        try:
+            self._queue.put_nowait(event_row(event_type, details))
+            self.stats["queued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+        except Exception as e:
+            print(f"Analytics Error: {e}")
+
+    def write_batch(self, rows: list):
+        rollup = {}
+        for row in rows:
+            event_type, timestamp, model, region, theme, tokens_input, tokens_output, latency_ms, _ = row
+            key = (timestamp[:10], event_type, region, theme, model)
+            agg = rollup.setdefault(key, [0, 0, 0, 0.0, 0])
+            agg[0] += 1
+            agg[1] += tokens_input
+            agg[2] += tokens_output
+            if latency_ms is not None:
+                agg[3] += latency_ms
+                agg[4] += 1
+
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (event_type, timestamp, model, region, theme, tokens_input, tokens_output, "
+                "latency_ms, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            upsert = """
+                INSERT INTO {table} VALUES ({placeholders}?, ?, ?, ?, ?)
+                ON CONFLICT ({keys}) DO UPDATE SET
+                    events = events + excluded.events,
+                    tokens_input = tokens_input + excluded.tokens_input,
+                    tokens_output = tokens_output + excluded.tokens_output,
+                    latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum,
+                    latency_samples = latency_samples + excluded.latency_samples
+            """
+            conn.executemany(upsert.format(table="rollup_daily", placeholders="?, " * 5, keys="day, " + ", ".join(DIMENSIONS)),
+                             [key + tuple(agg) for key, agg in rollup.items()])
+            totals = {}
+            for key, agg in rollup.items():
+                total = totals.setdefault(key[1:], [0, 0, 0, 0.0, 0])
+                for i, value in enumerate(agg):
+                    total[i] += value
+            conn.executemany(upsert.format(table="rollup_totals", placeholders="?, " * 4, keys=", ".join(DIMENSIONS)),
+                             [key + tuple(agg) for key, agg in totals.items()])
+        self.stats["written"] += len(rows)
+        self.stats["batches"] += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=ANALYTICS_FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            rows = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    rows.append(item)
+                if stopping or len(rows) >= ANALYTICS_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    self.write_batch(rows)
+                except Exception as e:
+                    print(f"Analytics Write Error ({len(rows)} events lost): {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Queries ---
+
+    def summary(self) -> dict:
+        conn = self._conn()
+        totals = conn.execute(
+            "SELECT event_type, region, theme, events, tokens_input, tokens_output, latency_ms_sum, latency_samples "
+            "FROM rollup_totals"
+        ).fetchall()
+
+        counts, region_counts, theme_counts, latency = {}, {}, {}, {}
+        total_input_tokens = total_output_tokens = 0
+        for row in totals:
+            counts[row["event_type"]] = counts.get(row["event_type"], 0) + row["events"]
+            total_input_tokens += row["tokens_input"]
+            total_output_tokens += row["tokens_output"]
+            if row["latency_samples"]:
+                agg = latency.setdefault(row["event_type"], [0.0, 0])
+                agg[0] += row["latency_ms_sum"]
+                agg[1] += row["latency_samples"]
+            if row["event_type"] == "resume_generated":
+                region_counts[row["region"]] = region_counts.get(row["region"], 0) + row["events"]
+                theme_counts[row["theme"]] = theme_counts.get(row["theme"], 0) + row["events"]
+
+        since = (datetime.utcnow() - timedelta(days=DAILY_DAYS - 1)).strftime("%Y-%m-%d")
+        daily = {}
+        for row in conn.execute(
+            "SELECT day, event_type, SUM(events) AS events, SUM(tokens_input + tokens_output) AS tokens "
+            "FROM rollup_daily WHERE day >= ? GROUP BY day, event_type ORDER BY day", (since,)
+        ):
+            day = daily.setdefault(row["day"], {"day": row["day"], "tokens": 0})
+            day[row["event_type"]] = row["events"]
+            day["tokens"] += row["tokens"]
+
+        recent = [dict(row) for row in conn.execute(
+            "SELECT id, event_type, timestamp, model, region, theme, tokens_input, tokens_output, latency_ms, details "
+            "FROM events ORDER BY id DESC LIMIT ?", (RECENT_LIMIT,)
+        )]
+
+        return {
+            "total_resumes": counts.get("resume_generated", 0),
+            "total_cover_letters": counts.get("cover_letter_generated", 0),
+            "total_tokens_input": total_input_tokens,
+            "total_tokens_output": total_output_tokens,
+            "region_distribution": region_counts,
+            "theme_distribution": theme_counts,
+            "event_counts": counts,
+            "avg_latency_ms": {k: round(v[0] / v[1], 1) for k, v in latency.items()},
+            "daily_activity": list(daily.values()),
+            "recent_activity": recent,
+        }
+
+
+analytics_store = AnalyticsStore()
@@ -0,0 +1,399 @@
+import re
+from collections import Counter
+
+import yaml
+
+# --- Local ATS Scoring Engine ---
+# Deterministic, network-free keyword coverage score. Same input -> same score,
+# a few milliseconds per resume. Returns the same shape as the Gemini scorer
+# (score / feedback / missing_keywords / formatting_check).
+
+# canonical skill -> aliases (lowercase, matched as whole token sequences)
+SKILL_SYNONYMS = {
+    # Languages
+    "python": ["python", "python3", "py"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "ecmascript", "es6"],
+    "typescript": ["typescript", "ts"],
+    "golang": ["golang", "go lang"],
+    "rust": ["rust"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp", "c sharp"],
+    "kotlin": ["kotlin"],
+    "scala": ["scala"],
+    "ruby": ["ruby"],
+    "php": ["php"],
+    "bash": ["bash", "shell scripting", "sh"],
+    "powershell": ["powershell"],
+    "sql": ["sql"],
+    "hcl": ["hcl"],
+    "yaml": ["yaml", "yml"],
+    # Web / backend
+    "react": ["react", "reactjs", "react.js"],
+    "next.js": ["next.js", "nextjs"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vuejs", "vue.js"],
+    "node.js": ["node.js", "nodejs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring boot": ["spring boot", "springboot"],
+    "graphql": ["graphql"],
+    "rest api": ["rest api", "rest apis", "restful", "restful apis"],
+    "grpc": ["grpc"],
+    "microservices": ["microservices", "micro-services", "microservice"],
+    # Cloud
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "ec2": ["ec2", "amazon ec2", "aws ec2"],
+    "s3": ["s3", "amazon s3", "aws s3"],
+    "lambda": ["aws lambda", "lambda functions"],
+    "dynamodb": ["dynamodb"],
+    "rds": ["rds", "amazon rds"],
+    "iam": ["iam", "identity and access management"],
+    "cloudformation": ["cloudformation"],
+    "cloudwatch": ["cloudwatch", "amazon cloudwatch"],
+    "vpc": ["vpc", "vpcs"],
+    "serverless": ["serverless"],
+    "openstack": ["openstack"],
+    # DevOps / infra
+    "docker": ["docker", "containerization", "containerized"],
+    "kubernetes": ["kubernetes", "k8s", "eks", "aks", "gke", "openshift"],
+    "helm": ["helm"],
+    "terraform": ["terraform"],
+    "ansible": ["ansible"],
+    "puppet": ["puppet enterprise"],
+    "chef": ["chef infra"],
+    "jenkins": ["jenkins"],
+    "github actions": ["github actions"],
+    "gitlab ci": ["gitlab ci", "gitlab ci/cd", "gitlab"],
+    "ci/cd": ["ci/cd", "cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "git": ["git"],
+    "linux": ["linux", "unix", "ubuntu", "rhel", "centos"],
+    "infrastructure as code": ["infrastructure as code", "iac"],
+    "prometheus": ["prometheus"],
+    "grafana": ["grafana"],
+    "elk": ["elk", "elastic stack", "elasticsearch", "logstash", "kibana"],
+    "datadog": ["datadog"],
+    "splunk": ["splunk"],
+    "observability": ["observability"],
+    "sre": ["sre", "site reliability engineering", "site reliability"],
+    "argocd": ["argocd", "argo cd"],
+    "sonarqube": ["sonarqube"],
+    "nginx": ["nginx"],
+    # Data
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["apache spark", "pyspark", "spark sql"],
+    "airflow": ["airflow", "apache airflow"],
+    "etl": ["etl", "elt", "data pipelines", "data pipeline"],
+    "snowflake": ["snowflake"],
+    "bigquery": ["bigquery"],
+    "pandas": ["pandas"],
+    # AI / ML
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "generative ai": ["generative ai", "genai", "gen ai"],
+    "llm": ["llm", "llms", "large language models", "large language model"],
+    "rag": ["rag", "retrieval augmented generation", "retrieval-augmented generation"],
+    "mlops": ["mlops"],
+    "langchain": ["langchain"],
+    "pytorch": ["pytorch"],
+    "tensorflow": ["tensorflow"],
+    "nlp": ["nlp", "natural language processing"],
+    "hugging face": ["hugging face", "huggingface"],
+    # Networking / security
+    "networking": ["networking", "tcp/ip", "dns", "subnetting"],
+    "security": ["security", "secops", "devsecops", "cybersecurity"],
+    "waf": ["waf", "web application firewall"],
+    "ssl/tls": ["ssl/tls", "ssl", "tls"],
+    "vpn": ["vpn"],
+    "load balancing": ["load balancing", "load balancer", "elb", "alb"],
+    "cdn": ["cdn", "cloudfront"],
+    # Practices
+    "agile": ["agile", "scrum", "kanban"],
+    "system design": ["system design", "system architecture", "distributed systems"],
+    "testing": ["testing", "unit testing", "test automation", "tdd"],
+    "cloud migration": ["cloud migration"],
+    "automation": [],
+    # Business tools
+    "excel": ["microsoft excel", "ms excel"],
+    "power bi": ["power bi", "powerbi"],
+    "tableau": ["tableau"],
+    "quickbooks": ["quickbooks"],
+    "sap": ["sap"],
+    "salesforce": ["salesforce"],
+    "gaap": ["gaap", "us gaap"],
+}
+
+# Bare aliases that are also ordinary English ("the rest of the team this spring",
+# "data migration", "you will excel"). They count only when written as a proper noun
+# mid-sentence ("REST", "Spark") or within CONTEXT_WINDOW tokens of an unambiguous
+# skill ("Terraform, Ansible, Chef or Puppet"); otherwise they stay plain words.
+AMBIGUOUS_ALIASES = {
+    "spring": "spring boot",
+    "rest": "rest api",
+    "node": "node.js",
+    "shell": "bash",
+    "containers": "docker",
+    "lambda": "lambda",
+    "chef": "chef",
+    "puppet": "puppet",
+    "spark": "spark",
+    "monitoring": "observability",
+    "migration": "cloud migration",
+    "migrations": "cloud migration",
+    "automation": "automation",
+    "automated": "automation",
+    "automating": "automation",
+    "excel": "excel",
+}
+CONTEXT_WINDOW = 3
+
+# Low-signal words that look "technical" by shape alone (capitalized at sentence start etc.)
+STOPWORDS = set("""
+a an and are as at be but by for from has have in into is it its of on or our that the their this to
+we will with you your who what when where which why how all any can may must should would could
+about across after also among more most other over such than then these those through under up
+experience experienced years year team teams work working role roles job responsibilities responsible
+ability able strong excellent good great knowledge skills skill including include includes plus
+preferred required requirements qualifications minimum bonus nice etc using use used build building
+new help support within per well including join company candidate candidates opportunity world
+""".split())
+
+# Acronyms every JD carries that are not skills: HR, benefits, currencies, places, titles
+NON_SKILL_ACRONYMS = set("""
+eeo eoe eeoc ada pto hr usd eur gbp inr cad aud chf sgd aed ctc ote k 401k 401 dei lgbtq lgbtqia
+us usa uk eu emea apac na latam nyc sf est pst cst cet gmt utc ist
+ceo cto cfo coo cio vp svp evp faq llc inc ltd gmbh ag co plc
+wfh fte ft pt ic tbd asap ie eg vs
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]", re.I)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_REQUIRED_RE = re.compile(r"\b(required|must|requirements|qualifications|minimum|essential)\b", re.I)
+_OPTIONAL_RE = re.compile(r"\b(nice to have|preferred|plus|bonus|desirable|ideally)\b", re.I)
+_TECH_SHAPE_RE = re.compile(r"^(?:[A-Z0-9]{2,}|[A-Za-z]+[A-Z][A-Za-z]*|.*\d.*|.*[+#./].*)$")
+# Salaries, dates, counts and versions on their own: "120", "2024-12-31", "120k", "3.5", "10+"
+_NUMERIC_RE = re.compile(r"^[$€£₹]?\d[\d,./:-]*(?:k|m|bn|st|nd|rd|th|\+|%)?$", re.I)
+
+# alias token tuple -> canonical; first token -> longest alias starting with it
+_ALIASES = {}
+_ALIAS_FIRST = {}
+for _canonical, _aliases in SKILL_SYNONYMS.items():
+    for _alias in _aliases + [_canonical]:
+        if _alias in AMBIGUOUS_ALIASES:
+            continue
+        _key = tuple(_TOKEN_RE.findall(_alias))
+        _ALIASES[_key] = _canonical
+        _ALIAS_FIRST[_key[0]] = max(_ALIAS_FIRST.get(_key[0], 0), len(_key))
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+BM25_K1 = 1.2
+# Scoring sees one JD at a time, so there is no corpus to take document frequencies
+# from; these are fixed prior idf values per term class rather than computed idf
+LEXICON_IDF = 2.0   # known skills
+SHAPE_IDF = 1.2     # unknown but technical-looking tokens (acronyms, CamelCase, versions)
+REQUIRED_BOOST = 1.5
+OPTIONAL_DAMP = 0.7
+
+
+def tokenize(text: str) -> list:
+    # Original case is kept so ambiguous aliases can be told apart ("REST" vs "the rest")
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        # "Bash/Shell" and "Prometheus/Grafana" are two tools, "ci/cd" is one
+        if "/" in token and (token.lower(),) not in _ALIASES:
+            tokens.extend(part for part in token.split("/") if part)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _sentence_terms(sentence: str, keyword: bool = False) -> list:
+    # Greedy longest-match of alias n-grams, so "amazon web services" -> "aws"
+    raw = tokenize(sentence)
+    tokens = [token.lower() for token in raw]
+    terms, skill_positions = [], []
+    i = 0
+    while i < len(tokens):
+        longest = _ALIAS_FIRST.get(tokens[i], 0)
+        for n in range(min(longest, len(tokens) - i), 0, -1):
+            canonical = _ALIASES.get(tuple(tokens[i:i + n]))
+            if canonical:
+                terms.append((i, canonical))
+                skill_positions.append(i)
+                i += n
+                break
+        else:
+            terms.append((i, tokens[i]))
+            i += 1
+
+    resolved = []
+    for i, term in terms:
+        canonical = AMBIGUOUS_ALIASES.get(term)
+        if canonical:
+            proper_noun = i > 0 and raw[i][0].isupper()
+            if not (keyword or proper_noun or any(abs(i - j) <= CONTEXT_WINDOW for j in skill_positions)):
+                continue  # an ordinary word here; dropped so it can't match the skill by name
+            term = canonical
+        resolved.append(term)
+    return resolved
+
+
+def canonical_terms(text: str, keyword: bool = False) -> list:
+    # keyword=True: text is already a skill name (JD analysis keywords), so ambiguous aliases need no context
+    terms = []
+    for sentence in _SENTENCE_RE.split(text):
+        terms.extend(_sentence_terms(sentence, keyword))
+    return terms
+
+
+def _technical_shapes(text: str) -> dict:
+    # Original-case tokens that look like tools/acronyms: "SQL", "GraphQL", "SOC2"
+    shapes = {}
+    for raw in re.findall(r"[A-Za-z0-9][A-Za-z0-9+#.-]*", text):
+        raw = raw.rstrip(".")
+        lower = raw.lower()
+        if len(raw) < 2 or not _TECH_SHAPE_RE.match(raw) or _NUMERIC_RE.match(raw):
+            continue
+        if lower in STOPWORDS or lower in NON_SKILL_ACRONYMS or not re.search(r"[a-z]", lower):
+            continue
+        shapes.setdefault(lower, raw)
+    return shapes
+
+
+def _resume_text(resume_yaml: str, data=None) -> tuple:
+    # Only score the values, never YAML keys like "highlights" or "start_date".
+    # Callers that already hold the parsed document pass it as `data` to skip the parse.
+    if data is None:
+        try:
+            data = yaml.load(resume_yaml, Loader=_YAML_LOADER)
+        except Exception:
+            return resume_yaml, []
+    strings, bullets = [], []
+
+    def walk(obj, key=None):
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if k == "design":
+                    continue
+                walk(v, k)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item, key)
+                if key == "highlights" and isinstance(item, str):
+                    bullets.append(item)
+        elif obj is not None:
+            strings.append(str(obj))
+
+    walk(data)
+    return "\n".join(strings), bullets
+
+
+def jd_term_weights(job_description: str, extra_keywords: list = None) -> tuple:
+    # BM25-style weights: saturated term frequency x prior idf x requirement context
+    term_freq = Counter()
+    context = {}
+    for sentence in _SENTENCE_RE.split(job_description):
+        if not sentence.strip():
+            continue
+        factor = REQUIRED_BOOST if _REQUIRED_RE.search(sentence) else OPTIONAL_DAMP if _OPTIONAL_RE.search(sentence) else 1.0
+        for term in canonical_terms(sentence):
+            term_freq[term] += 1
+            context[term] = max(context.get(term, 0), factor)
+
+    shapes = _technical_shapes(job_description)
+    weights, display = {}, {}
+    for term, tf in term_freq.items():
+        if term in SKILL_SYNONYMS:
+            idf = LEXICON_IDF
+            display[term] = shapes.get(term, term)
+        elif term in shapes and term not in STOPWORDS:
+            idf = SHAPE_IDF
+            display[term] = shapes[term]
+        else:
+            continue
+        saturation = tf * (BM25_K1 + 1) / (tf + BM25_K1)
+        weights[term] = saturation * idf * context.get(term, 1.0)
+
+    # Keywords from a cached JD analysis count as required terms
+    for keyword in extra_keywords or []:
+        terms = canonical_terms(keyword, keyword=True)
+        if not terms:
+            continue
+        term = terms[0] if len(terms) == 1 else " ".join(terms)
+        base = LEXICON_IDF * REQUIRED_BOOST
+        if weights.get(term, 0) < base:
+            weights[term] = base
+            display.setdefault(term, keyword)
+    return weights, display
+
+
+def score_resume(resume_yaml: str, job_description: str, extra_keywords: list = None, data=None) -> dict:
+    text, bullets = _resume_text(resume_yaml, data)
+    resume_terms = canonical_terms(text)
+    resume_set = set(resume_terms)
+    # Multi-word keywords from the JD analysis are matched as phrases
+    resume_phrases = " " + " ".join(resume_terms) + " "
+
+    weights, display = jd_term_weights(job_description, extra_keywords)
+    total = sum(weights.values())
+    if not total:
+        return {
+            "score": 0,
+            "feedback": "No recognizable skills or keywords were found in the job description.",
+            "missing_keywords": [],
+            "formatting_check": _formatting_check(bullets),
+            "mode": "fast",
+        }
+
+    covered, missing = 0.0, []
+    for term, weight in weights.items():
+        if term in resume_set or (" " in term and f" {term} " in resume_phrases):
+            covered += weight
+        else:
+            missing.append((weight, display.get(term, term)))
+    missing.sort(key=lambda pair: (-pair[0], pair[1]))
+
+    coverage = covered / total
+    quantified = sum(1 for b in bullets if re.search(r"\d", b)) / len(bullets) if bullets else 0.0
+    score = round(100 * (0.85 * coverage + 0.15 * quantified))
+
+    if score >= 90:
+        verdict = "Excellent match."
+    elif score >= 80:
+        verdict = "Good match."
+    elif score >= 70:
+        verdict = "Fair match."
+    else:
+        verdict = "Weak match."
+    top_missing = [name for _, name in missing[:15]]
+    feedback = f"{verdict} Covers {round(coverage * 100)}% of weighted job keywords ({len(weights) - len(missing)}/{len(weights)} terms)."
+    if top_missing:
+        feedback += f" Highest-impact gaps: {', '.join(top_missing[:5])}."
+
+    return {
+        "score": max(0, min(100, score)),
+        "feedback": feedback,
+        "missing_keywords": top_missing,
+        "formatting_check": _formatting_check(bullets),
+        "mode": "fast",
+    }
+
+
+def _formatting_check(bullets: list) -> str:
+    if not bullets:
+        return "No bullet highlights found; add achievement bullets under experience and projects."
+    quantified = sum(1 for b in bullets if re.search(r"\d", b))
+    long_bullets = sum(1 for b in bullets if len(b.split()) > 40)
+    parts = [f"{quantified}/{len(bullets)} bullets include quantified results."]
+    if long_bullets:
+        parts.append(f"{long_bullets} bullets exceed 40 words; consider tightening.")
+    return " ".join(parts)
+
@@ -0,0 +1,80 @@
+import glob
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from jd_extract import extract_job_description
+
+# Benchmarks job-description extraction over the saved pages in fixtures/job_pages:
+#   python bench_jd_extract.py [iterations]
+# Compares the lxml extractor with the previous BeautifulSoup implementation and
+# checks that each page yields the posting text and none of the page chrome.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "job_pages")
+EXPECTED = "Design, build and operate scalable backend services"
+NOISE = ("Footer link", "Link number", "window.__DATA__")
+
+
+def legacy_extract(html: str) -> str:
+    # The pre-lxml extractor, verbatim apart from the error type
+    soup = BeautifulSoup(html, 'html.parser')
+    content = soup.find(class_=re.compile(r"(description|show-more-less-html|job-details)", re.I))
+    if not content:
+        content = soup.find('main') or soup.find('article') or soup.body
+    if not content:
+        raise ValueError("Could not extract content from page")
+    text_elements = content.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'ul', 'div'])
+    lines = [elem.get_text(strip=True) for elem in text_elements if len(elem.get_text(strip=True)) > 20]
+    seen = set()
+    unique_lines = []
+    for line in lines:
+        if line not in seen:
+            unique_lines.append(line)
+            seen.add(line)
+    return "\n\n".join(unique_lines[:100])
+
+
+def best_of(fn, html, iterations):
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+    print(f"{'fixture':<24}{'KB':>7}{'source':>12}{'lxml ms':>10}{'legacy ms':>11}{'speedup':>9}  check")
+    failures = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        text, source = extract_job_description(html, with_source=True)
+        ok = EXPECTED in text and not any(n in text for n in NOISE)
+        failures += not ok
+        new_ms = best_of(extract_job_description, html, iterations)
+        old_ms = best_of(legacy_extract, html, max(1, iterations // 4))
+        print(f"{os.path.basename(path):<24}{len(html) / 1024:>7.0f}{source:>12}{new_ms:>10.2f}{old_ms:>11.2f}"
+              f"{old_ms / new_ms:>8.1f}x  {'ok' if ok else 'FAIL'}")
+
+    # Linearity: repeat the heaviest page's body and watch time grow with size, not faster
+    with open(os.path.join(FIXTURES_DIR, "generic_nested.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    head, rest = html.split("<body>", 1)
+    body, tail = rest.rsplit("</body>", 1)
+    base_ms = None
+    for factor in (1, 2, 4):
+        page = f"{head}<body>{body * factor}</body>{tail}"
+        ms = best_of(extract_job_description, page, max(1, iterations // 4))
+        base_ms = base_ms or ms
+        print(f"generic_nested x{factor:<3}{len(page) / 1024:>10.0f} KB{ms:>10.2f} ms  ({ms / base_ms:.1f}x)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import sys
+import time
+
+import yaml
+
+from render_cache import make_cache_key
+from resume_doc import ResumeDocument
+
+# Benchmarks the rewrite -> render document path on generated resumes:
+#   python bench_resume_doc.py [iterations]
+# "legacy" is the previous flow: safe_load + recursive rebuild + yaml.dump after the
+# rewrite, then safe_load + theme injection + yaml.dump + cache key again for render.
+# "document" parses once (libyaml), normalizes in one in-place walk and reuses the
+# parsed model for the render cache key and the RenderCV input.
+
+
+def make_resume(entries: int) -> str:
+    experience = [
+        {
+            "company": f"Company {i}",
+            "position": "Senior Backend Engineer",
+            "location": "Berlin, Germany",
+            "start_date": f"{2024 - i}-01-01",
+            "end_date": "Present" if i == 0 else f"{2024 - i}-12-31",
+            "highlights": [
+                f"Cut p99 latency of service {i}.{j} by {10 + j}% by replacing the ORM hot path with batched SQL"
+                for j in range(6)
+            ],
+        }
+        for i in range(entries)
+    ]
+    data = {
+        "cv": {
+            "basics": {"name": "Jane Doe", "email": "jane@example.com", "phone": 4915112345678},
+            "sections": {
+                "summary": ["Backend engineer with a decade of distributed systems work."],
+                "experience": experience,
+                "skills": [{"label": "Languages", "details": "Python, Go, SQL"}],
+                "references": "Available upon request",
+            },
+        }
+    }
+    return yaml.dump(data, allow_unicode=True, sort_keys=False)
+
+
+def legacy_path(text: str, theme: str):
+    # Verbatim apart from the error handling
+    data = yaml.safe_load(text)
+    cv_data = data["cv"]
+    if "basics" in cv_data:
+        for key in ["name", "email", "phone", "location", "website", "social_networks"]:
+            if key in cv_data["basics"] and key not in cv_data:
+                cv_data[key] = cv_data["basics"][key]
+    if "phone" in cv_data:
+        cv_data["phone"] = str(cv_data["phone"])
+
+    def recursive_lowercase_present(obj):
+        if isinstance(obj, dict):
+            return {k: recursive_lowercase_present(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [recursive_lowercase_present(i) for i in obj]
+        elif isinstance(obj, str):
+            if obj.strip().lower() in ["present", "current", "now"]:
+                return "present"
+            return obj
+        return obj
+
+    data = recursive_lowercase_present(data)
+    cv_data = data["cv"]
+    if "sections" in cv_data and isinstance(cv_data["sections"].get("references"), str):
+        cv_data["sections"]["references"] = [cv_data["sections"]["references"]]
+    new_yaml = yaml.dump(data, allow_unicode=True, sort_keys=False)
+
+    # render_pdf / tailor_render
+    data = yaml.safe_load(new_yaml)
+    data.setdefault("design", {})["theme"] = theme
+    final_yaml = yaml.dump(data, allow_unicode=True, sort_keys=False)
+    return make_cache_key(data, theme), final_yaml
+
+
+def document_path(text: str, theme: str):
+    doc = ResumeDocument.parse(text).normalize()
+    doc.to_yaml()  # the rewrite response
+    theme = doc.with_theme(theme)
+    return doc.cache_key(theme), doc.to_yaml()
+
+
+def best_of(fn, text, iterations):
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(text, "classic")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"libyaml: {'yes' if hasattr(yaml, 'CSafeLoader') else 'NO (pure-Python fallback)'}")
+    print(f"{'entries':>8}{'KB':>7}{'legacy ms':>11}{'document ms':>13}{'speedup':>9}  check")
+    failures = 0
+    for entries in (10, 50, 200, 1000):
+        text = make_resume(entries)
+        legacy_key, legacy_yaml = legacy_path(text, "classic")
+        new_key, new_yaml = document_path(text, "classic")
+        # Same document either way: identical render cache key and identical parsed output
+        ok = legacy_key == new_key and yaml.safe_load(legacy_yaml) == yaml.safe_load(new_yaml)
+        failures += not ok
+        old_ms = best_of(legacy_path, text, max(1, iterations // 2))
+        new_ms = best_of(document_path, text, iterations)
+        print(f"{entries:>8}{len(text) / 1024:>7.0f}{old_ms:>11.1f}{new_ms:>13.1f}{old_ms / new_ms:>8.1f}x  "
+              f"{'ok' if ok else 'FAIL'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
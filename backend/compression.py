@@ -0,0 +1,63 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- Response Compression ---
+# Brotli when the client accepts it and the `brotli` package is installed,
+# gzip otherwise. Reuses Starlette's gzip responder machinery so streamed
+# bodies are flushed per chunk and excluded types pass through untouched:
+# SSE streams (so events aren't held back) and PDFs (already compressed).
+
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/pdf",)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = 5, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+def _accepts(accept_encoding: str, encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and _accepts(accept_encoding, "br"):
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality,
+                                        exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        elif _accepts(accept_encoding, "gzip"):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level,
+                                      exclude_content_types=EXCLUDED_CONTENT_TYPES)
+        else:
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Exercises POST /scrape-jobs against two local fixture servers (two "hosts"),
+# serving the saved pages in fixtures/job_pages with an artificial delay:
+#   python debug_scrape_bulk.py
+# Reports per-host peak concurrency so the politeness limits can be checked.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "job_pages")
+DELAY = 0.3
+_lock = threading.Lock()
+IN_FLIGHT = {}
+PEAK = {}
+
+
+class FixtureServer(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        port = self.server.server_port
+        with _lock:
+            IN_FLIGHT[port] = IN_FLIGHT.get(port, 0) + 1
+            PEAK[port] = max(PEAK.get(port, 0), IN_FLIGHT[port])
+        try:
+            time.sleep(DELAY)
+            name = self.path.strip("/").split("?")[0]
+            path = os.path.join(FIXTURES_DIR, name)
+            if not name.endswith(".html") or not os.path.exists(path):
+                self.send_response(404)
+                self.end_headers()
+                return
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with _lock:
+                IN_FLIGHT[port] -= 1
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    os.environ.setdefault("SCRAPE_CACHE_DIR", os.path.join(temp_dir, "scrape_cache"))
+    os.environ.setdefault("TRACKER_DB_PATH", os.path.join(temp_dir, "tracker.db"))
+    os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(temp_dir, "analytics.db"))
+    os.environ.setdefault("RENDER_POOL_SIZE", "1")
+
+    import httpx
+    import uvicorn
+    import main as backend
+
+    servers = [serve(), serve()]
+    pages = sorted(f for f in os.listdir(FIXTURES_DIR) if f.endswith(".html"))
+    urls = [f"http://127.0.0.1:{s.server_port}/{page}?copy={i}" for s in servers for page in pages for i in range(2)]
+    urls.append(f"http://127.0.0.1:{servers[0].server_port}/missing.html")
+
+    # A real server: the test client buffers streamed responses
+    api = uvicorn.Server(uvicorn.Config(backend.app, host="127.0.0.1", port=8765, log_level="warning"))
+    threading.Thread(target=api.run, daemon=True).start()
+    while not api.started:
+        time.sleep(0.05)
+
+    start = time.perf_counter()
+    counts = {"result": 0, "error": 0}
+    with httpx.stream("POST", "http://127.0.0.1:8765/scrape-jobs", json={"urls": urls}, timeout=60) as response:
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                elapsed = time.perf_counter() - start
+                if event == "result":
+                    counts["result"] += 1
+                    print(f"{elapsed:6.2f}s result #{data['index']:<3} {data['url'][-32:]:<32} {len(data['description'])} chars")
+                elif event == "error":
+                    counts["error"] += 1
+                    print(f"{elapsed:6.2f}s error  #{data['index']:<3} {data['detail']}")
+                else:
+                    print(f"{elapsed:6.2f}s {event}: {data}")
+
+    print(f"{len(urls)} URLs -> {counts}; peak in-flight per host: {PEAK} "
+          f"(limit {backend.SCRAPE_PER_HOST_CONCURRENCY}, {backend.SCRAPE_HOST_INTERVAL}s apart)")
+    api.should_exit = True
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+# Exercises the Sheets sync worker against an in-process fake of the Sheets v4 API:
+#   python debug_sheets.py
+# Only the calls the worker makes are implemented (metadata, values get/append/batchUpdate).
+
+SHEET_ID = "fake-sheet"
+ROWS = []
+CALLS = []
+FAIL_NEXT = {"count": 0}
+
+
+class FakeSheets(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        path = unquote(urlparse(self.path).path)
+        CALLS.append(("GET", path))
+        if path == f"/{SHEET_ID}":
+            return self._reply({
+                "spreadsheetId": SHEET_ID,
+                "properties": {"title": "Fake"},
+                "sheets": [{"properties": {"title": "Tracker", "sheetId": 0, "index": 0,
+                                           "gridProperties": {"rowCount": 1000, "columnCount": 26}}}],
+            })
+        if "/values/" in path:
+            # Column read (col_values): return column F
+            return self._reply({"range": "Tracker!F1:F", "majorDimension": "COLUMNS",
+                                "values": [[row[5] for row in ROWS]]})
+        self._reply({"error": {"code": 404, "message": "not found"}}, 404)
+
+    def do_POST(self):
+        path = unquote(urlparse(self.path).path)
+        body = self._body()
+        CALLS.append(("POST", path))
+        if FAIL_NEXT["count"]:
+            FAIL_NEXT["count"] -= 1
+            return self._reply({"error": {"code": 503, "message": "backend unavailable", "status": "UNAVAILABLE"}}, 503)
+        if path.endswith(":append"):
+            first = len(ROWS) + 1
+            ROWS.extend(body["values"])
+            return self._reply({"updates": {"updatedRange": f"Tracker!A{first}:F{len(ROWS)}",
+                                            "updatedRows": len(body["values"])}})
+        if path.endswith("values:batchUpdate"):
+            for item in body["data"]:
+                row = int(re.search(r"(\d+)$", item["range"]).group(1))
+                ROWS[row - 1][3] = item["values"][0][0]
+            return self._reply({"totalUpdatedCells": len(body["data"])})
+        self._reply({"error": {"code": 404, "message": "not found"}}, 404)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSheets)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GOOGLE_SHEETS_API_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["GOOGLE_SHEET_ID"] = SHEET_ID
+    os.environ["SHEETS_SYNC_INTERVAL"] = "0.5"
+
+    import sheets_sync as module
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sync = module.SheetsSync(db_path=os.path.join(temp_dir, "tracker.db"))
+        sync.start()
+
+        start = time.perf_counter()
+        for i in range(25):
+            sync.enqueue_append({"id": f"app{i}", "company_name": f"Company {i}", "job_title": "Engineer",
+                                 "status": "Applied", "date_applied": "2024-01-01", "job_description": "JD"})
+        sync.enqueue_status("app3", "Interview")
+        print(f"Enqueued 26 ops in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        time.sleep(1.5)
+        appends = [c for c in CALLS if c[1].endswith(":append")]
+        print(f"Rows in sheet: {len(ROWS)} via {len(appends)} append call(s); app3 status: {ROWS[3][3]}")
+
+        # Transient failure: the status update backs off and retries
+        FAIL_NEXT["count"] = 1
+        sync.enqueue_status("app7", "Offer")
+        time.sleep(4)
+        print(f"After retry, app7 status: {ROWS[7][3]}; stats: {sync.snapshot()}")
+
+        sync.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+# --- Gemini Client Registry ---
+# genai.configure() swaps a process-global API key, so two concurrent requests
+# with different user keys could run on each other's credentials, and every
+# request rebuilt its model and gRPC channel. Here each (api_key, model) pair
+# gets its own client manager and model, built once and reused (bounded LRU),
+# so its channel stays open between requests.
+
+GEMINI_CLIENT_CACHE_SIZE = int(os.environ.get("GEMINI_CLIENT_CACHE_SIZE", "64"))
+
+
+def _key_id(api_key: str) -> str:
+    # Registry keys never hold the raw API key
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class GeminiClientRegistry:
+    def __init__(self, max_size: int = GEMINI_CLIENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._models = OrderedDict()
+        self.stats = {"hits": 0, "created": 0, "evicted": 0}
+
+    def _build(self, api_key: str, model_name: str):
+        manager = genai_client._ClientManager()
+        manager.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name)
+        # Bind the model to this key's clients so it never falls back to the global default
+        model._client = manager.get_default_client("generative")
+        model._async_client = manager.get_default_client("generative_async")
+        return model
+
+    def get(self, api_key: str, model_name: str):
+        key = (_key_id(api_key), model_name)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return model
+            # Built under the lock: construction is cheap and no I/O happens until first use
+            model = self._build(api_key, model_name)
+            self._models[key] = model
+            self.stats["created"] += 1
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+                self.stats["evicted"] += 1
+            return model
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "size": len(self._models), "max_size": self.max_size}
+
+
+gemini_clients = GeminiClientRegistry()
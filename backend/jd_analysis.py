@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+# --- Job Description Analysis ---
+# One structured read of a JD (keywords, seniority, company, role, must-have vs
+# nice-to-have skills), computed once per normalized JD and reused by every
+# LLM endpoint instead of each prompt re-deriving it from the raw text.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JD_CACHE_DIR = os.environ.get("JD_CACHE_DIR", os.path.join(BASE_DIR, "data", "jd_cache"))
+JD_CACHE_MEMORY_ITEMS = int(os.environ.get("JD_CACHE_MEMORY_ITEMS", "512"))
+
+JD_ANALYSIS_PROMPT = """
+    Analyze the following Job Description and extract a structured profile of the role.
+    Focus on specific technologies (e.g., "React", "AWS Lambda", "Terraform") rather than generic terms.
+
+    Return **ONLY** a JSON object with exactly these keys. Do not include any other text.
+    {{
+        "role_title": "Senior DevOps Engineer",
+        "company": "Company name, or empty string if not stated",
+        "seniority": "one of: intern, junior, mid, senior, lead, principal, executive",
+        "keywords": ["Top 15-20 most critical technical keywords, hard skills, tools, and certifications"],
+        "must_have": ["skills/qualifications stated as required"],
+        "nice_to_have": ["skills/qualifications stated as preferred, bonus or plus"],
+        "summary": "2-3 sentences describing the core responsibilities"
+    }}
+
+    Job Description:
+    {job_description}
+    """
+
+_LIST_FIELDS = ("keywords", "must_have", "nice_to_have")
+_TEXT_FIELDS = ("role_title", "company", "seniority", "summary")
+
+
+def normalize_job_description(job_description: str) -> str:
+    return re.sub(r"\s+", " ", job_description or "").strip().lower()
+
+
+def jd_hash(job_description: str) -> str:
+    return hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+
+
+def empty_analysis(key: str) -> dict:
+    return {"jd_hash": key, **{f: "" for f in _TEXT_FIELDS}, **{f: [] for f in _LIST_FIELDS}}
+
+
+def parse_analysis(text: str, key: str) -> dict:
+    text = text.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```(?:json)?", "", text).replace("```", "")
+    raw = json.loads(text)
+    # Older prompt shape (plain keyword list) is still a usable artifact
+    if isinstance(raw, list):
+        raw = {"keywords": raw}
+    analysis = empty_analysis(key)
+    for field in _TEXT_FIELDS:
+        value = raw.get(field)
+        analysis[field] = str(value).strip() if value else ""
+    for field in _LIST_FIELDS:
+        value = raw.get(field) or []
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(",")]
+        seen = set()
+        for item in value:
+            item = str(item).strip()
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                analysis[field].append(item)
+    return analysis
+
+
+def format_jd_context(analysis: dict) -> str:
+    # Compact text form of the artifact for embedding in prompts
+    lines = []
+    if analysis.get("role_title"):
+        lines.append(f"Role: {analysis['role_title']}")
+    if analysis.get("company"):
+        lines.append(f"Company: {analysis['company']}")
+    if analysis.get("seniority"):
+        lines.append(f"Seniority: {analysis['seniority']}")
+    if analysis.get("must_have"):
+        lines.append(f"Must-have: {', '.join(analysis['must_have'])}")
+    if analysis.get("nice_to_have"):
+        lines.append(f"Nice-to-have: {', '.join(analysis['nice_to_have'])}")
+    if analysis.get("keywords"):
+        lines.append(f"Keywords: {', '.join(analysis['keywords'])}")
+    if analysis.get("summary"):
+        lines.append(f"Responsibilities: {analysis['summary']}")
+    return "\n".join(lines)
+
+
+def is_usable(analysis: dict) -> bool:
+    return bool(analysis.get("keywords") or analysis.get("must_have") or analysis.get("summary"))
+
+
+class JDAnalysisCache:
+    def __init__(self, cache_dir: str = JD_CACHE_DIR, memory_items: int = JD_CACHE_MEMORY_ITEMS):
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._inflight = {}  # key -> asyncio.Future, so concurrent callers share one LLM call
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        with self._lock:
+            analysis = self._memory.get(key)
+            if analysis is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return analysis
+        try:
+            with open(self._path(key), "r") as f:
+                analysis = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self._remember(key, analysis)
+        return analysis
+
+    def _remember(self, key: str, analysis: dict):
+        self._memory[key] = analysis
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def put(self, key: str, analysis: dict):
+        with self._lock:
+            self._remember(key, analysis)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(analysis, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"JD Cache Write Error: {e}")
+
+    async def get_or_compute(self, job_description: str, generate, prepare=None) -> dict:
+        # `generate(prompt)` is an awaitable returning a Gemini response; `prepare(text)`
+        # optionally trims the JD for the prompt (the cache key is always the full JD)
+        key = jd_hash(job_description)
+        analysis = self.get(key)
+        if analysis is not None:
+            return analysis
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                prompt_text = prepare(job_description) if prepare else job_description
+                response = await generate(JD_ANALYSIS_PROMPT.format(job_description=prompt_text))
+                analysis = parse_analysis(response.text, key)
+                print(f"DEBUG: JD analysis: {analysis['role_title']} @ {analysis['company']} ({len(analysis['keywords'])} keywords)")
+            except Exception as e:
+                print(f"DEBUG: JD analysis failed, proceeding without it. Error: {e}")
+                analysis = empty_analysis(key)
+            # Don't pin a failed analysis in the cache; the next request retries
+            if is_usable(analysis):
+                self.put(key, analysis)
+            future.set_result(analysis)
+            return analysis
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+
+jd_analysis_cache = JDAnalysisCache()
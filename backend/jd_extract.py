@@ -0,0 +1,177 @@
+import json
+import re
+from html import unescape
+
+import lxml.html
+from lxml import etree
+
+# --- Job Description Extraction ---
+# 1. schema.org JobPosting in <script type="application/ld+json"> (most boards ship it)
+# 2. Known site containers (LinkedIn, Indeed, Greenhouse, Lever, Workday), then the
+#    generic "description"/"job-details" class heuristic, then <main>/<article>/<body>
+# Text comes from one iterwalk over the chosen subtree: every node is visited once,
+# so extraction is linear in page size (the old find_all + get_text per element
+# re-read nested divs over and over). Full-tree XPath scans are gated on cheap
+# substring checks of the raw HTML so pages don't pay for boards they aren't on.
+
+MIN_JSON_LD_CHARS = 200
+MAX_BLOCKS = 100
+GENERIC_MIN_LINE_CHARS = 20
+
+_LD_JSON_RE = re.compile(
+    r"<script[^>]+type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.I | re.S
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_BLOCK_TAGS = frozenset("""
+address article aside blockquote dd details div dl dt fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6
+header hr li main nav ol p pre section summary table tbody td tfoot th thead tr ul br
+""".split())
+_SKIP_TAGS = frozenset("script style noscript svg template iframe button select option head".split())
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# (site, marker, XPath) in priority order; each XPath matches the element wrapping only the
+# posting text. Every XPath is a full-tree scan, so it only runs when its marker is in the raw HTML.
+SITE_CONTAINERS = [
+    ("linkedin", "show-more-less-html",
+     f"//div[{_has_class('show-more-less-html__markup')}] | //section[{_has_class('show-more-less-html')}]"),
+    ("indeed", "jobDescriptionText", "//*[@id='jobDescriptionText']"),
+    ("greenhouse", "job__description", f"//div[{_has_class('job__description')}]"),
+    ("greenhouse", "app_body", "//div[@id='app_body']//div[@id='content']"),
+    ("lever", "job-description", "//div[@data-qa='job-description']"),
+    ("lever", "posting-page", f"//div[{_has_class('posting-page')}]//div[{_has_class('section-wrapper')}]"),
+    ("workday", "jobPostingDescription", "//*[@data-automation-id='jobPostingDescription']"),
+]
+_SITE_XPATHS = [(site, marker, etree.XPath(path)) for site, marker, path in SITE_CONTAINERS]
+# The pre-lxml heuristic, kept as the generic fallback: find the first matching class
+# attribute with a regex over the raw page, then look that exact value up in the tree
+_GENERIC_CLASS_RE = re.compile(
+    r"""\bclass\s*=\s*(?:"([^"]*(?:description|show-more-less-html|job-details)[^"]*)"|'([^']*(?:description|show-more-less-html|job-details)[^']*)')""",
+    re.I,
+)
+_CLASS_XPATH = etree.XPath("//*[@class = $value]")
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def block_lines(root) -> list:
+    # Single pass: inline text accumulates into the current block and is flushed
+    # when a block element opens or closes, yielding the leaf-level text blocks
+    lines, buffer = [], []
+
+    def flush():
+        if buffer:
+            line = _clean("".join(buffer))
+            buffer.clear()
+            if line:
+                lines.append(line)
+
+    walker = etree.iterwalk(root, events=("start", "end"))
+    for event, el in walker:
+        tag = el.tag if el.tag.__class__ is str else ""
+        if event == "start":
+            if tag in _SKIP_TAGS or not tag:
+                # Comments / processing instructions have no tag name; their tail is still text
+                walker.skip_subtree()
+                continue
+            if tag in _BLOCK_TAGS:
+                flush()
+            if el.text:
+                buffer.append(el.text)
+        else:
+            if tag in _BLOCK_TAGS:
+                flush()
+            if el.tail and el is not root:
+                buffer.append(el.tail)
+    flush()
+    return lines
+
+
+def _finish(lines: list, min_chars: int = 1) -> str:
+    seen, unique = set(), []
+    for line in lines:
+        if len(line) >= min_chars and line not in seen:
+            seen.add(line)
+            unique.append(line)
+    return "\n\n".join(unique[:MAX_BLOCKS])
+
+
+def _iter_json_ld(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from _iter_json_ld(item)
+    elif isinstance(node, dict):
+        yield node
+        if "@graph" in node:
+            yield from _iter_json_ld(node["@graph"])
+
+
+def _is_job_posting(node: dict) -> bool:
+    kind = node.get("@type")
+    return kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind)
+
+
+def from_json_ld(html: str) -> str:
+    # Regex over the raw page is enough to find the blocks; no DOM needed on this path
+    for match in _LD_JSON_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        for node in _iter_json_ld(data):
+            if not _is_job_posting(node) or not isinstance(node.get("description"), str):
+                continue
+            description = node["description"]
+            if "<" in description:
+                fragment = lxml.html.fragment_fromstring(description, create_parent="div")
+                text = _finish(block_lines(fragment))
+            else:
+                text = _finish([_clean(p) for p in description.split("\n")])
+            if len(text) >= MIN_JSON_LD_CHARS:
+                return text
+    return ""
+
+
+def extract_job_description(html: str, with_source: bool = False):
+    text, source = from_json_ld(html), "json-ld"
+    if not text:
+        text, source = _from_dom(html)
+    if not text:
+        raise ValueError("Could not extract content from page")
+    return (text, source) if with_source else text
+
+
+def _from_dom(html: str):
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return "", None
+
+    for site, marker, xpath in _SITE_XPATHS:
+        if marker not in html:
+            continue
+        found = xpath(doc)
+        if found:
+            text = _finish(block_lines(found[0]))
+            if text:
+                return text, site
+
+    content = None
+    match = _GENERIC_CLASS_RE.search(html)
+    if match:
+        found = _CLASS_XPATH(doc, value=unescape(match.group(1) or match.group(2)))
+        content = found[0] if found else None
+    if content is None:
+        content = next(iter(doc.xpath("//main | //article")), None)
+    if content is None:
+        content = doc.find("body")
+    if content is None:
+        return "", None
+    # Outside a known container short lines are mostly navigation and buttons
+    return _finish(block_lines(content), GENERIC_MIN_LINE_CHARS), "generic"
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+# --- Job Store ---
+# SQLite (WAL) state for background work: one row per job with its payload,
+# status, stage and JSON result; binary outputs (PDFs) live next to it on disk.
+# Batches are parent jobs whose children are the individual items.
+# Secrets (user API keys) are never written here.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(BASE_DIR, "data", "jobs.db"))
+JOB_RESULTS_DIR = os.environ.get("JOB_RESULTS_DIR", os.path.join(BASE_DIR, "data", "job_results"))
+JOB_RETENTION_DAYS = float(os.environ.get("JOB_RETENTION_DAYS", "7"))
+
+FINISHED = ("done", "failed", "cancelled")
+_JSON_FIELDS = ("payload", "result")
+
+
+class JobStore:
+    def __init__(self, db_path: str = JOBS_DB_PATH, results_dir: str = JOB_RESULTS_DIR):
+        self.db_path = db_path
+        self.results_dir = results_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        parent_id TEXT,
+                        position INTEGER,
+                        label TEXT,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        stage TEXT,
+                        payload TEXT,
+                        result TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_parent ON jobs(parent_id, position)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+            self._initialized = True
+
+    def _row(self, row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    # --- Writes ---
+
+    def create(self, kind: str, payload: dict = None, parent_id: str = None, position: int = None,
+               label: str = None) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, parent_id, position, label, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, parent_id, position, label, json.dumps(payload) if payload is not None else None, now, now),
+            )
+        return job_id
+
+    def update(self, job_id: str, status: str = None, stage: str = None, result: dict = None, error: str = None):
+        sets, params = ["updated_at = ?"], [time.time()]
+        if status is not None:
+            sets.append("status = ?")
+            params.append(status)
+        if stage is not None:
+            sets.append("stage = ?")
+            params.append(stage)
+        if result is not None:
+            sets.append("result = ?")
+            params.append(json.dumps(result))
+        if error is not None:
+            sets.append("error = ?")
+            params.append(error)
+        conn = self._conn()
+        with conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(sets)} WHERE id = ?", params + [job_id])
+
+    def unfinished(self) -> list:
+        # Queued or running when the process stopped; oldest first so the queue keeps its order
+        rows = self._conn().execute(
+            "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at, position"
+        )
+        return [self._row(row) for row in rows]
+
+    def purge_expired(self, max_age_days: float = JOB_RETENTION_DAYS) -> int:
+        cutoff = time.time() - max_age_days * 86400
+        conn = self._conn()
+        expired = [r[0] for r in conn.execute(
+            "SELECT id FROM jobs WHERE parent_id IS NULL AND updated_at < ? AND status IN ('done', 'failed', 'cancelled')",
+            (cutoff,),
+        )]
+        with conn:
+            for job_id in expired:
+                conn.execute("DELETE FROM jobs WHERE id = ? OR parent_id = ?", (job_id, job_id))
+        for job_id in expired:
+            shutil.rmtree(os.path.join(self.results_dir, job_id), ignore_errors=True)
+        return len(expired)
+
+    # --- Reads ---
+
+    def get(self, job_id: str):
+        return self._row(self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def children(self, parent_id: str) -> list:
+        rows = self._conn().execute("SELECT * FROM jobs WHERE parent_id = ? ORDER BY position", (parent_id,))
+        return [self._row(row) for row in rows]
+
+    def child(self, parent_id: str, position: int):
+        return self._row(self._conn().execute(
+            "SELECT * FROM jobs WHERE parent_id = ? AND position = ?", (parent_id, position)
+        ).fetchone())
+
+    def status_counts(self, parent_id: str) -> dict:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE parent_id = ? GROUP BY status", (parent_id,)
+        )
+        return {status: count for status, count in rows}
+
+    # --- Artifacts ---
+
+    def artifact_path(self, job_id: str, name: str, parent_id: str = None) -> str:
+        # Children's files sit under the parent's directory so a batch is removed in one go
+        folder = os.path.join(self.results_dir, parent_id, job_id) if parent_id else os.path.join(self.results_dir, job_id)
+        return os.path.join(folder, name)
+
+    def save_artifact(self, job_id: str, name: str, data: bytes, parent_id: str = None) -> str:
+        path = self.artifact_path(job_id, name, parent_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+job_store = JobStore()
@@ -1,13 +1,10 @@
-from fastapi import FastAPI, HTTPException, Body
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Body, Request, Response, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Annotated
 import os
-import subprocess
 import yaml
-import google.generativeai as genai
-import tempfile
-import shutil
 from dotenv import load_dotenv
 import base64
 import json
@@ -15,15 +12,37 @@ import base64
 import json
 import re
 import io
+import asyncio
+import contextlib
+import hashlib
+import time
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.lib import colors
 from reportlab.lib import colors
-import gspread
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from urllib.parse import urlsplit
+from starlette.concurrency import run_in_threadpool
+from render_cache import render_cache
+from render_pool import render_pool, RenderError, RENDER_PROFILES, RENDER_PREVIEW_DPI, first_page_png
+from yaml_stream import SectionStreamValidator
+from jd_analysis import jd_analysis_cache, format_jd_context, is_usable, jd_hash
+from ats_local import score_resume
+from ai_detect import analyze_text, banned_vocabulary
+from tracker_store import tracker_store
+from sheets_sync import sheets_sync
+from analytics import analytics_store
+from gemini_clients import gemini_clients
+from job_store import job_store, FINISHED as FINISHED_JOB_STATES
+from scrape_cache import scrape_cache, canonical_job_url
+from jd_extract import extract_job_description
+from compression import CompressionMiddleware
+from prompt_compact import prompt_compactor, dump_yaml
+from resume_doc import ResumeDocument, parse_yaml
+from resume_units import split_units, is_relevant, unit_cache_key, merge_unit, apply_units, unit_cache
+from version_store import version_store, sanitize_name as sanitize_version_name
 
 load_dotenv()
 
@@ -35,7 +54,40 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "ETag"],
 )
+# gzip / brotli for JSON; PDFs and SSE streams are sent as-is
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("COMPRESS_MIN_BYTES", "1000")))
+
+# --- Render Worker Pool Lifecycle ---
+@app.on_event("startup")
+def start_render_pool():
+    # Spawn workers up front so the first render doesn't pay RenderCV import time
+    render_pool.start()
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    render_pool.shutdown()
+
+# --- Analytics Writer Lifecycle ---
+@app.on_event("startup")
+def start_analytics_writer():
+    analytics_store.start()
+
+@app.on_event("shutdown")
+def stop_analytics_writer():
+    # Drains queued events before exit
+    analytics_store.stop()
+
+# --- Google Sheets Sync Lifecycle ---
+@app.on_event("startup")
+def start_sheets_sync():
+    sheets_sync.start()
+
+@app.on_event("shutdown")
+def stop_sheets_sync():
+    # Final flush of whatever is still queued; anything left stays in the outbox for next start
+    sheets_sync.stop()
 
 # --- Manual OPTIONS Handler (CORS fix) ---
 @app.options("/{full_path:path}")
@@ -56,11 +108,22 @@ class RewriteRequest(BaseModel):
     user_comments: str = ""
     model_version: str = "gemini-3-flash-preview"
     api_key: str = None
+    rewrite_mode: str = "full" # 'full' (one prompt) or 'sections' (parallel per-section rewrites)
+
+class JDAnalysisRequest(BaseModel):
+    job_description: str
+    api_key: str = None
 
 class ATSRequest(BaseModel):
     job_description: str
     resume_yaml: str
     api_key: str = None
+    mode: str = "deep" # 'deep' (Gemini) or 'fast' (local, deterministic)
+
+class TailorRequest(RewriteRequest):
+    theme: str = "classic"
+    ats_mode: str = "deep" # or "fast" for the local scorer
+    stream: bool = False
 
 class RenderRequest(BaseModel):
     resume_yaml: str
@@ -69,6 +132,7 @@ class RenderRequest(BaseModel):
 class AIAnalysisRequest(BaseModel):
     resume_yaml: str
     api_key: str = None
+    mode: str = "deep" # or "fast" for the local lexicon + burstiness detector
 
 class CoverLetterRequest(BaseModel):
     job_description: str
@@ -100,15 +164,108 @@ def get_gemini_model(api_key: str = None, model_version: str = "models/gemini-3-
     key = api_key or os.environ.get("GEMINI_API_KEY")
     if not key:
         raise HTTPException(status_code=400, detail="Gemini API Key is required")
-    genai.configure(api_key=key)
     
     # User strictly requested this model name
     # We will trust the user has access to this specific preview model
     if "gemini-3" in model_version or "flash" in model_version:
          model_version = "models/gemini-3-flash-preview" 
 
-    print(f"Using AI Model: {model_version}")
-    return genai.GenerativeModel(model_version)
+    # One cached model per (key, model) with its own credentials; no process-global configure()
+    return gemini_clients.get(key, model_version)
+
+# --- Async I/O Helpers ---
+# Endpoints are `async def`, so every slow call below must be awaited, never run inline.
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "32"))
+SCRAPE_MAX_CONCURRENCY = int(os.environ.get("SCRAPE_MAX_CONCURRENCY", "16"))
+SCRAPE_PER_HOST_CONCURRENCY = int(os.environ.get("SCRAPE_PER_HOST_CONCURRENCY", "2"))
+SCRAPE_HOST_INTERVAL = float(os.environ.get("SCRAPE_HOST_INTERVAL", "0.5"))
+SCRAPE_BULK_MAX_URLS = int(os.environ.get("SCRAPE_BULK_MAX_URLS", "100"))
+
+gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+render_semaphore = asyncio.Semaphore(render_pool.size)
+scrape_semaphore = asyncio.Semaphore(SCRAPE_MAX_CONCURRENCY)
+
+# Pacing entries are swept once more than this many hosts are remembered
+SCRAPE_HOST_STATE_SWEEP = 256
+
+class HostLimiter:
+    # Politeness per job board: at most N in-flight requests and a minimum gap
+    # between request starts to the same host, on top of the global scrape cap
+    # State is only kept for hosts in use: a host's semaphore goes away with its last
+    # request, and its pacing entry once the interval has passed
+    def __init__(self, per_host: int, interval: float):
+        self.per_host = per_host
+        self.interval = interval
+        self._slots = {}  # host -> [semaphore, requests holding or waiting for it]
+        self._next_start = {}
+
+    def _forget_idle(self, now: float):
+        for host in [h for h, start in self._next_start.items() if start <= now and h not in self._slots]:
+            del self._next_start[host]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str):
+        entry = self._slots.setdefault(host, [asyncio.Semaphore(self.per_host), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                loop = asyncio.get_running_loop()
+                start = max(loop.time(), self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.interval
+                delay = start - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._slots[host]
+            if len(self._next_start) > SCRAPE_HOST_STATE_SWEEP:
+                self._forget_idle(asyncio.get_running_loop().time())
+
+host_limiter = HostLimiter(SCRAPE_PER_HOST_CONCURRENCY, SCRAPE_HOST_INTERVAL)
+
+async def generate_content_async(model, prompt, **kwargs):
+    async with gemini_semaphore:
+        return await model.generate_content_async(prompt, **kwargs)
+
+async def stream_content_async(model, prompt, **kwargs):
+    # Holds the Gemini slot for the whole stream, not just the first chunk
+    async with gemini_semaphore:
+        response = await model.generate_content_async(prompt, stream=True, **kwargs)
+        async for chunk in response:
+            yield chunk
+
+def elapsed_ms(started: float):
+    return round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+async def render_pdf_bytes(yaml_content: str, profile: str = "final") -> bytes:
+    # Waiters queue here on the event loop instead of parking threadpool threads
+    async with render_semaphore:
+        return await run_in_threadpool(render_pool.render, yaml_content, None, profile)
+
+_http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        # Keep-alive pool: repeat fetches from the same job board reuse the TLS connection
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=SCRAPE_MAX_CONCURRENCY * 2, max_keepalive_connections=32, keepalive_expiry=60),
+        )
+    return _http_client
+
+@app.on_event("shutdown")
+async def close_http_client():
+    if _http_client is not None:
+        await _http_client.aclose()
 
 # --- Endpoints ---
 
@@ -116,41 +273,38 @@ def get_gemini_model(api_key: str = None, model_version: str = "models/gemini-3-
 def health_check():
     return {"status": "healthy", "message": "Antigravity Resume Backend is Running"}
 
-@app.post("/rewrite")
-async def rewrite_resume(request: RewriteRequest):
-    model = get_gemini_model(request.api_key, request.model_version)
-    
+def strip_json_fences(text: str) -> str:
+    text = text.strip()
+    # Clean potential markdown code blocks
+    if text.startswith("```json"):
+        text = text.replace("```json", "").replace("```", "")
+    elif text.startswith("```"):
+        text = text.replace("```", "")
+    return text
+
+async def get_jd_analysis(model, job_description: str) -> dict:
+    # Computed once per normalized JD, then served from the JD analysis cache
+    return await jd_analysis_cache.get_or_compute(
+        job_description, lambda prompt: generate_content_async(model, prompt),
+        prepare=lambda text: prompt_compactor.job_description("jd_analysis", text)[0],
+    )
+
+def jd_prompt_context(analysis: dict, job_description: str, endpoint: str) -> str:
+    # Structured artifact when available, otherwise the compacted JD within the endpoint's budget
+    if is_usable(analysis):
+        return format_jd_context(analysis)
+    return prompt_compactor.job_description(endpoint, job_description)[0]
+
+async def extract_keywords(model, job_description: str) -> list:
     # --- Step 1: Keyword Extraction (The "Brain" Step) ---
     # We first identify exactly what an ATS would look for.
-    identify_keywords_prompt = f"""
-    Analyze the following Job Description and identify the Top 15-20 most critical technical keywords, hard skills, tools, and certifications.
-    Focus on specific technologies (e.g., "React", "AWS Lambda", "Terraform") rather than generic terms.
-    
-    Return **ONLY** a JSON list of strings. Do not include any other text.
-    Example: ["Python", "FastAPI", "AWS", "Docker", "Agile"]
-    
-    Job Description:
-    {request.job_description}
-    """
-    
-    keywords = []
-    try:
-        kw_response = model.generate_content(identify_keywords_prompt)
-        text = kw_response.text.strip()
-        # Clean potential markdown code blocks
-        if text.startswith("```json"):
-            text = text.replace("```json", "").replace("```", "")
-        elif text.startswith("```"):
-            text = text.replace("```", "")
-        keywords = json.loads(text)
-        print(f"DEBUG: Extracted Keywords: {keywords}")
-    except Exception as e:
-        print(f"DEBUG: Keyword extraction failed, proceeding with generic rewrite. Error: {e}")
-        keywords = []
+    analysis = await get_jd_analysis(model, job_description)
+    return analysis["keywords"]
 
+def build_region_instructions(target_region: str) -> str:
     # --- Region Specific Instructions ---
     region_instructions = ""
-    if request.target_region == "germany":
+    if target_region == "germany":
         region_instructions = """
     6. **GERMAN REGION STANDARDS (Lebenslauf)**:
        - **Tone**: Strictly factual, formal, and results-oriented (Tech focus). Avoid "salesy" adjectives.
@@ -164,7 +318,7 @@ async def rewrite_resume(request: RewriteRequest):
        - **Signature**: Add a custom field or section for `signature: "[City, Date]"` at the end.
        - **Date Format**: Use strict ISO 8601 `YYYY-MM-DD` (renderer handles display).
         """
-    elif request.target_region == "dubai":
+    elif target_region == "dubai":
         region_instructions = """
     6. **DUBAI / UAE REGION STANDARDS**:
        - **Strict Professional Tone**: Use professional English. Avoid slang or overly casual language.
@@ -181,7 +335,7 @@ async def rewrite_resume(request: RewriteRequest):
        - **Formatting**: Keep the structure linear and clean (1 column style logic).
        - **Date Format**: Use strict ISO 8601 `YYYY-MM-DD`.
         """
-    elif request.target_region == "uk":
+    elif target_region == "uk":
         region_instructions = """
     6. **UK REGION STANDARDS**:
        - **Format**: Reverse-Chronological. Prioritize recent, high-level achievements (last 10-15 years).
@@ -195,7 +349,7 @@ async def rewrite_resume(request: RewriteRequest):
        - **References**: Add a section `references` with "References available upon request".
        - **Date Format**: ISO 8601 `YYYY-MM-DD`.
         """
-    elif request.target_region == "usa":
+    elif target_region == "usa":
         region_instructions = """
     6. **USA REGION STANDARDS**:
        - **Format**: Reverse-Chronological. Single-column logic. No tables.
@@ -220,6 +374,34 @@ async def rewrite_resume(request: RewriteRequest):
        - **Date Format**: Use strict ISO 8601 `YYYY-MM-DD`.
         """
 
+    return region_instructions
+
+def build_banned_vocabulary_lines() -> str:
+    # Same lexicon the local /detect_ai scanner flags, five words per prompt line
+    words = [f'"{word.capitalize()}"' for word in banned_vocabulary()]
+    return "\n".join("         - " + ", ".join(words[i:i + 5]) for i in range(0, len(words), 5))
+
+class BaseResume:
+    # A resume rewritten against many JDs (a batch's saved version): parsed, split into
+    # section units and compacted for the rewrite prompt once, shared read-only by every item
+    def __init__(self, text: str):
+        self.text = text
+        self.data = parse_yaml(text)
+        self.units = split_units(self.data)
+        # Keep design/settings: the rewrite hands back the full document
+        self.rewrite_yaml, self.tokens_saved = prompt_compactor.resume("rewrite", text, content_only=False)
+
+def build_rewrite_prompt(request: RewriteRequest, keywords: list, base: BaseResume = None):
+    # Returns (prompt, tokens saved by compaction)
+    job_description, jd_saved = prompt_compactor.job_description("rewrite", request.job_description)
+    if base is not None:
+        current_yaml, resume_saved = base.rewrite_yaml, base.tokens_saved
+    else:
+        # Keep design/settings: the rewrite hands back the full document
+        current_yaml, resume_saved = prompt_compactor.resume("rewrite", request.current_yaml, content_only=False)
+    region_instructions = build_region_instructions(request.target_region)
+    banned_vocabulary_lines = build_banned_vocabulary_lines()
+
     # --- Step 2: Targeted Rewrite (The "Action" Step) ---
     custom_instructions = ""
     if request.user_comments:
@@ -235,9 +417,9 @@ async def rewrite_resume(request: RewriteRequest):
     INPUT DATA:
     1. **Critial Keywords to Inject**: {keywords}
     2. **Job Description**:
-    {request.job_description}
+    {job_description}
     3. **Current Resume (YAML)**:
-    {request.current_yaml}
+    {current_yaml}
 
     CRITICAL INSTRUCTIONS - "ANTI-AI" MODE ENGAGED:
 
@@ -250,9 +432,7 @@ async def rewrite_resume(request: RewriteRequest):
 
     2. **BANNED VOCABULARY (Strict Enforcement)**:
        - **NEVER** use these "AI-giveaway" words/phrases:
-         - "Spearheaded", "Orchestrated", "Navigating", "Meticulous", "Paramount"
-         - "Delve", "Tapestry", "Unleashed", "Transformative", "Foster", "Leverage"
-         - "Utilizing", "Showcasing", "Ensuring", "Facilitated", "Augmenting"
+{banned_vocabulary_lines}
        - **Alternatives**:
          - Instead of "Spearheaded" -> "Led", "Ran", "Directed".
          - Instead of "Orchestrated" -> "Built", "Managed", "Fixed".
@@ -285,118 +465,269 @@ async def rewrite_resume(request: RewriteRequest):
     Return ONLY the YAML. Start immediately with `cv:`.
     """
 
+    return rewrite_prompt, jd_saved + resume_saved
+
+def clean_rewrite_output(new_yaml_content: str) -> str:
+    # Robust Cleaning
+    match = re.search(r"```(?:yaml)?\n(.*?)```", new_yaml_content, re.DOTALL)
+    if match:
+        new_yaml_content = match.group(1)
+    
+    # Remove any leading text before "cv:" if regex didn't catch it
+    if "cv:" in new_yaml_content:
+        preamble_check = new_yaml_content.split("cv:", 1)
+        # If there's a lot of text before 'cv:', it's probably chat.
+        if len(preamble_check[0]) < 50: # Maybe just indentation or newline
+             pass 
+        else:
+             # Aggressive strip: Find the first "cv:" and take everything from there
+             new_yaml_content = "cv:" + preamble_check[1]
+
+    # Sanitize: Remove markdown bolding (double asterisks) to prevent YAML alias errors
+    # Replaces **Text** with Text
+    new_yaml_content = new_yaml_content.replace("**", "")
+    
+    return new_yaml_content.strip()
+
+def normalize_resume_document(new_yaml_content: str):
+    # Returns (doc, yaml_text); doc is None when the YAML could not be fixed up.
+    # The fixups themselves (basics lifting, "Present" casing, list sections) live in ResumeDocument.normalize
     try:
-        rewrite_response = model.generate_content(rewrite_prompt)
-        new_yaml_content = rewrite_response.text
-        
-        # Robust Cleaning
-        match = re.search(r"```(?:yaml)?\n(.*?)```", new_yaml_content, re.DOTALL)
-        if match:
-            new_yaml_content = match.group(1)
-        
-        # Remove any leading text before "cv:" if regex didn't catch it
-        if "cv:" in new_yaml_content:
-            preamble_check = new_yaml_content.split("cv:", 1)
-            # If there's a lot of text before 'cv:', it's probably chat.
-            if len(preamble_check[0]) < 50: # Maybe just indentation or newline
-                 pass 
-            else:
-                 # Aggressive strip: Find the first "cv:" and take everything from there
-                 new_yaml_content = "cv:" + preamble_check[1]
+        doc = ResumeDocument.parse(new_yaml_content).normalize()
+    except Exception as parse_e:
+        print(f"Warning: Post-process YAML fix failed: {parse_e}")
+        # Continue with original content if fix fails
+        return None, new_yaml_content
+    return doc, doc.to_yaml()
+
+def normalize_resume_yaml(new_yaml_content: str) -> str:
+    return normalize_resume_document(new_yaml_content)[1]
+
+def log_rewrite_usage(request: RewriteRequest, rewrite_response, started: float = None, tokens_saved: int = 0):
+    # Analytics
+    usage = getattr(rewrite_response, 'usage_metadata', None)
+    tokens_input = usage.prompt_token_count if usage else 0
+    tokens_output = usage.candidates_token_count if usage else 0
+    
+    analytics_store.log_event("resume_generated", {
+        "target_region": request.target_region, 
+        "model": request.model_version,
+        "theme": getattr(request, "theme", None),
+        "tokens_input": tokens_input,
+        "tokens_output": tokens_output,
+        "latency_ms": elapsed_ms(started),
+        "prompt_tokens_saved": tokens_saved,
+    })
+
+async def run_rewrite(model, request: RewriteRequest, base: BaseResume = None):
+    # Keyword extraction + rewrite + post-processing; returns (keywords, doc, yaml_text).
+    # `base` is the already-prepared request.current_yaml, when the caller has one.
+    if request.rewrite_mode == "sections":
+        return await run_section_rewrite(model, request, base)
+    keywords = await extract_keywords(model, request.job_description)
+    rewrite_prompt, tokens_saved = build_rewrite_prompt(request, keywords, base)
 
-        # Analytics
-        usage = getattr(rewrite_response, 'usage_metadata', None)
-        tokens_input = usage.prompt_token_count if usage else 0
-        tokens_output = usage.candidates_token_count if usage else 0
-        
-        log_event("resume_generated", {
-            "target_region": request.target_region, 
-            "model": request.model_version,
-            "tokens_input": tokens_input,
-            "tokens_output": tokens_output
-        })
+    try:
+        started = time.perf_counter()
+        rewrite_response = await generate_content_async(model, rewrite_prompt)
+        new_yaml_content = clean_rewrite_output(rewrite_response.text)
+        log_rewrite_usage(request, rewrite_response, started, tokens_saved)
+        doc, new_yaml_content = normalize_resume_document(new_yaml_content)
 
-        # Sanitize: Remove markdown bolding (double asterisks) to prevent YAML alias errors
-        # Replaces **Text** with Text
-        new_yaml_content = new_yaml_content.replace("**", "")
-        
-        new_yaml_content = new_yaml_content.strip()
-        
-        # --- CRITICAL FIX Check for Header Structure ---
-        # AI often puts contact info in 'basics', but RenderCV often needs them at 'cv' root or vice versa depending on version.
-        # We enforce a Flattened Structure for safety: if 'basics' exists, move keys to 'cv' root.
-        try:
-            data = yaml.safe_load(new_yaml_content)
-            if data and "cv" in data:
-                cv_data = data["cv"]
-            elif data and "name" in data: # AI forgot 'cv' root key entirely
-                 cv_data = data
-                 data = {"cv": cv_data}
-            else:
-                 cv_data = {}
-
-            # Fallback: Check if 'basics' exists and lift fields
-            if "basics" in cv_data:
-                basics = cv_data["basics"]
-                # Copy standard fields if they are missing at root
-                for key in ["name", "email", "phone", "location", "website", "social_networks"]:
-                    if key in basics and key not in cv_data:
-                        cv_data[key] = basics[key]
-            
-            # FORCE STRING TYPE for phone to prevent RenderCV validation error
-            if "phone" in cv_data:
-                cv_data["phone"] = str(cv_data["phone"])
-
-            # --- RECURSIVE FIX for "Present" -> "present" case sensitivity in RenderCV ---
-            def recursive_lowercase_present(obj):
-                if isinstance(obj, dict):
-                    return {k: recursive_lowercase_present(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [recursive_lowercase_present(i) for i in obj]
-                elif isinstance(obj, str):
-                    if obj.strip().lower() in ["present", "current", "now"]:
-                        return "present"
-                    return obj
-                return obj
-
-            data = recursive_lowercase_present(data)
-            cv_data = data["cv"] # Re-bind after recursion
-
-            # --- FIX REFERENCES SECTION STRUCTURE ---
-            # RenderCV expects sections to be lists. If AI made 'references' a string, wrap it.
-            if "sections" in cv_data and "references" in cv_data["sections"]:
-                refs = cv_data["sections"]["references"]
-                if isinstance(refs, str):
-                     cv_data["sections"]["references"] = [refs] # Wrap in list -> TextEntry
-                elif isinstance(refs, list):
-                     # If it's a list of strings, it's allowed (TextEntry).
-                     # If it's a list of dicts, it might be failing if keys don't match.
-                     # Force it to simple text if it looks complex and is failing
-                     pass 
-
-            # --- FIX SIGNATURE SECTION STRUCTURE ---
-            # Similar to references, signature needs to be a list
-            if "sections" in cv_data and "signature" in cv_data["sections"]:
-                sig = cv_data["sections"]["signature"]
-                if isinstance(sig, str):
-                     cv_data["sections"]["signature"] = [sig] # Wrap in list -> TextEntry 
-
-            # Re-dump to string
-            new_yaml_content = yaml.dump(data, allow_unicode=True, sort_keys=False)
-            
-        except Exception as parse_e:
-            print(f"Warning: Post-process YAML fix failed: {parse_e}")
-            # Continue with original content if fix fails
-
-        return {"yaml": new_yaml_content}
+        return keywords, doc, new_yaml_content
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Rewrite failed: {str(e)}")
 
-@app.post("/ats_score")
-async def calculate_ats_score(request: ATSRequest):
+# --- Section-Level Rewrite ---
+# rewrite_mode="sections": only the units the JD touches (summary, recent or
+# keyword-matching experience entries, projects, skills) are rewritten, each in
+# its own prompt and all in parallel; basics, education etc. are never sent back
+# through the model. Wall-clock time is roughly the slowest single unit.
+
+UNIT_INSTRUCTIONS = {
+    "summary": "Rewrite this professional summary so it leads with the experience most relevant to the role.",
+    "experience": "Rewrite the bullet points (`highlights`) and `summary` of this single job entry so they show the most relevant work for the role.",
+    "projects": "Rewrite the descriptions and bullet points of these projects to emphasise what is relevant to the role.",
+    "skills": "Reorder and regroup these skills so the ones the role asks for come first; only rename to the JD's spelling of a skill the candidate already lists.",
+}
+
+def build_unit_prompt(request: RewriteRequest, unit: dict, job_context: str, keywords: list) -> str:
+    custom_instructions = f'User instructions (follow unless they require inventing facts): "{request.user_comments}"' if request.user_comments else ""
+    return f"""
+    You are a Strategic Resume Optimizer rewriting ONE part of a resume for this role.
+    {UNIT_INSTRUCTIONS[unit["kind"]]}
+
+    JOB:
+    {job_context}
+    Keywords to integrate where the existing facts support them: {keywords}
+
+    RESUME PART (YAML):
+{dump_yaml(unit["content"])}
+
+    RULES:
+    - NEVER invent employers, titles, dates, locations, degrees, metrics or tools the input does not mention.
+    - Keep company, position, dates, location, names and labels exactly as given.
+    - Vary sentence structure; plain text only, no markdown bolding.
+    - NEVER use these words:
+{build_banned_vocabulary_lines()}
+    {build_region_instructions(request.target_region)}
+    {custom_instructions}
+
+    Return ONLY the YAML for this part, with the same structure as the input (no `cv:` or section key).
+    """
+
+async def rewrite_unit(model, request: RewriteRequest, unit: dict, job_context: str, keywords: list):
+    # -> (new content or None, usage metadata or None)
+    response = await generate_content_async(model, build_unit_prompt(request, unit, job_context, keywords))
+    text = clean_rewrite_output(response.text)
+    try:
+        rewritten = parse_yaml(text)
+    except yaml.YAMLError:
+        rewritten = None
+    return merge_unit(unit, rewritten), getattr(response, "usage_metadata", None)
+
+async def run_section_rewrite(model, request: RewriteRequest, base: BaseResume = None):
+    if base is not None:
+        data, units = base.data, base.units
+    else:
+        try:
+            data = parse_yaml(request.current_yaml)
+        except yaml.YAMLError as e:
+            raise HTTPException(status_code=400, detail=f"Current resume is not valid YAML: {e}")
+        units = split_units(data)
+    if not units:
+        # Nothing to split (no cv.sections): the single-prompt path handles free-form input
+        return await run_rewrite(model, request.copy(update={"rewrite_mode": "full"}), base)
+
+    started = time.perf_counter()
+    analysis = await get_jd_analysis(model, request.job_description)
+    keywords = analysis["keywords"]
+    job_context = jd_prompt_context(analysis, request.job_description, "rewrite")
+    analysis_key = analysis.get("jd_hash") or jd_hash(request.job_description)
+
+    replacements, pending, experience_rank = {}, [], 0
+    counts = {"rewritten": 0, "cached": 0, "skipped": 0, "failed": 0}
+    for unit in units:
+        relevant = is_relevant(unit, keywords, experience_rank)
+        if unit["kind"] == "experience":
+            experience_rank += 1
+        if not relevant:
+            counts["skipped"] += 1
+            continue
+        key = unit_cache_key(unit, analysis_key, request.target_region, request.model_version, request.user_comments)
+        cached = unit_cache.get(key)
+        if cached is not None:
+            replacements[unit["id"]] = cached
+            counts["cached"] += 1
+        else:
+            pending.append((unit, key))
+
+    results = await asyncio.gather(
+        *(rewrite_unit(model, request, unit, job_context, keywords) for unit, _ in pending),
+        return_exceptions=True,
+    )
+    tokens_input = tokens_output = 0
+    for (unit, key), result in zip(pending, results):
+        if isinstance(result, BaseException) or result[0] is None:
+            # A failed unit keeps its original text; the rest of the rewrite still lands
+            print(f"Section Rewrite Error ({unit['id']}): {result if isinstance(result, BaseException) else 'unusable output'}")
+            counts["failed"] += 1
+            continue
+        content, usage = result
+        replacements[unit["id"]] = content
+        unit_cache.put(key, content)
+        counts["rewritten"] += 1
+        if usage:
+            tokens_input += usage.prompt_token_count
+            tokens_output += usage.candidates_token_count
+    if pending and counts["failed"] == len(pending) and not counts["cached"]:
+        raise HTTPException(status_code=500, detail="AI Rewrite failed: no section could be rewritten")
+
+    analytics_store.log_event("resume_generated", {
+        "target_region": request.target_region,
+        "model": request.model_version,
+        "theme": getattr(request, "theme", None),
+        "tokens_input": tokens_input,
+        "tokens_output": tokens_output,
+        "latency_ms": elapsed_ms(started),
+        "rewrite_mode": "sections",
+        "units": counts,
+    })
+    # The merged structure is already parsed: normalize it in place rather than dump + re-parse
+    doc = ResumeDocument(apply_units(data, replacements)).normalize()
+    return keywords, doc, doc.to_yaml()
+
+@app.get("/rewrite/units/cache")
+def unit_cache_stats():
+    return unit_cache.snapshot()
+
+@app.post("/analyze_jd")
+async def analyze_job_description(request: JDAnalysisRequest):
     model = get_gemini_model(request.api_key)
+    return await get_jd_analysis(model, request.job_description)
+
+@app.post("/rewrite")
+async def rewrite_resume(request: RewriteRequest, async_job: Annotated[bool, Query(alias="async")] = False):
+    model = get_gemini_model(request.api_key, request.model_version)
+    if async_job:
+        return enqueue_job("rewrite", request)
+    keywords, doc, new_yaml_content = await run_rewrite(model, request)
+    return {"yaml": new_yaml_content}
+
+@app.post("/rewrite/stream")
+async def rewrite_resume_stream(request: RewriteRequest):
+    # Same pipeline as /rewrite, emitted as Server-Sent Events:
+    #   progress -> chunk* (raw YAML deltas) / section* (validated as each closes) -> done | error
+    model = get_gemini_model(request.api_key, request.model_version)
+
+    async def event_stream():
+        if request.rewrite_mode == "sections":
+            # Units are rewritten in parallel and reassembled, so there is no single stream to relay
+            yield sse_event("progress", {"stage": "rewrite", "status": "started", "mode": "sections"})
+            try:
+                keywords, doc, new_yaml_content = await run_rewrite(model, request)
+                yield sse_event("done", {"yaml": new_yaml_content, "keywords": keywords})
+            except HTTPException as he:
+                yield sse_event("error", {"detail": he.detail})
+            return
+
+        yield sse_event("progress", {"stage": "keywords", "status": "started"})
+        keywords = await extract_keywords(model, request.job_description)
+        yield sse_event("progress", {"stage": "keywords", "status": "done", "keywords": keywords})
+
+        yield sse_event("progress", {"stage": "rewrite", "status": "started"})
+        validator = SectionStreamValidator()
+        raw_parts = []
+        last_chunk = None
+        started = time.perf_counter()
+        try:
+            rewrite_prompt, tokens_saved = build_rewrite_prompt(request, keywords)
+            async for chunk in stream_content_async(model, rewrite_prompt):
+                last_chunk = chunk
+                text = chunk.text
+                if not text:
+                    continue
+                raw_parts.append(text)
+                yield sse_event("chunk", {"text": text})
+                for section in validator.feed(text):
+                    yield sse_event("section", section)
+            for section in validator.finish():
+                yield sse_event("section", section)
+
+            new_yaml_content = normalize_resume_yaml(clean_rewrite_output("".join(raw_parts)))
+            if last_chunk is not None:
+                # The final streamed chunk carries the totals for the whole response
+                log_rewrite_usage(request, last_chunk, started, tokens_saved)
+            yield sse_event("done", {"yaml": new_yaml_content, "keywords": keywords})
+        except Exception as e:
+            print(f"Streaming Rewrite Error: {e}")
+            yield sse_event("error", {"detail": f"AI Rewrite failed: {str(e)}"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
+async def score_ats(model, resume_yaml: str, job_context: str) -> dict:
+    resume_yaml, _ = prompt_compactor.resume("ats", resume_yaml)
     ats_prompt = f"""
     Act as an ATS (Applicant Tracking System) Score Checker. Evaluate the RESUME_YAML against the JOB_DESCRIPTION.
     
@@ -419,14 +750,14 @@ async def calculate_ats_score(request: ATSRequest):
     - "formatting_check": string (comment on structure/content quality)
 
     RESUME_YAML:
-    {request.resume_yaml}
+    {resume_yaml}
 
     JOB_DESCRIPTION:
-    {request.job_description}
+    {job_context}
     """
 
     try:
-        ats_response = model.generate_content(ats_prompt)
+        ats_response = await generate_content_async(model, ats_prompt)
         ats_text = ats_response.text
         
         # Clean markdown
@@ -447,89 +778,644 @@ async def calculate_ats_score(request: ATSRequest):
             "formatting_check": "Unknown"
         }
 
-@app.post("/render")
-async def render_pdf(request: RenderRequest):
-    yaml_content = request.resume_yaml
-    theme = request.theme or "classic"
+def score_ats_local(resume_yaml: str, job_description: str, doc: ResumeDocument = None) -> dict:
+    # No network: reuse JD analysis keywords only if they are already cached
+    cached = jd_analysis_cache.get(jd_hash(job_description))
+    return score_resume(resume_yaml, job_description, cached["keywords"] if cached else None,
+                        data=doc.data if doc else None)
+
+@app.post("/ats_score")
+async def calculate_ats_score(request: ATSRequest):
+    if request.mode != "deep":
+        return score_ats_local(request.resume_yaml, request.job_description)
+
+    model = get_gemini_model(request.api_key)
+    analysis = await get_jd_analysis(model, request.job_description)
+    return await score_ats(model, request.resume_yaml, jd_prompt_context(analysis, request.job_description, "ats"))
+
+# --- PDF Delivery ---
+# `?format=` on /render, /render_cover_letter_pdf and /tailor:
+#   json (default) - {"pdf_base64": ...} as before
+#   url            - {"pdf_url": "/render/pdf/<key>", "etag": ...}; the PDF is fetched separately
+#   pdf            - the PDF itself as application/pdf (not for /tailor, which also returns YAML/ATS)
+#   png            - /render only: a low-resolution image of page 1 for the editor preview
+# PDFs are addressed by their render cache key, a hash of the rendered content's inputs.
+# The key names the document, not the exact bytes (a RenderCV or font upgrade can change
+# them), so it is only used as a weak ETag.
+PDF_URL_MAX_AGE = int(os.environ.get("PDF_URL_MAX_AGE", "3600"))
+PDF_FORMATS = ("json", "url", "pdf")
+
+def pdf_headers(key: str, filename: str = "resume.pdf") -> dict:
+    return {
+        "ETag": f'W/"{key}"',
+        "Cache-Control": f"private, max-age={PDF_URL_MAX_AGE}",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison (RFC 9110 8.8.3.2): the W/ prefix is ignored on both sides
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def pdf_delivery(delivery: str, key: str, pdf_bytes: bytes, extra: dict = None, filename: str = "resume.pdf"):
+    if delivery not in PDF_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{delivery}' (expected one of {', '.join(PDF_FORMATS)})")
+    if delivery == "pdf":
+        return Response(content=pdf_bytes, media_type="application/pdf", headers=pdf_headers(key, filename))
+    if delivery == "url":
+        return {"pdf_url": f"/render/pdf/{key}", "etag": f'W/"{key}"', **(extra or {})}
+    return {"pdf_base64": base64.b64encode(pdf_bytes).decode('utf-8'), **(extra or {})}
+
+async def render_resume_document(doc: ResumeDocument, theme: str, profile: str = "final") -> bytes:
+    # --- Render Cache Lookup ---
+    # Identical document + theme => identical PDF, skip RenderCV entirely
+    # (and skip serializing the document: the key comes from the parsed structure).
+    # The profile only decides RenderCV's side outputs, so both profiles share the PDF.
+    cache_key = doc.cache_key(theme)
+    cached_pdf = render_cache.get(cache_key)
+    if cached_pdf is not None:
+        return cached_pdf
 
-    # Inject Theme & Validate YAML
     try:
-        # Load as dict to safely modify
-        data = yaml.safe_load(yaml_content)
-        
-        if not data or "cv" not in data:
-             raise ValueError("Invalid Resume YAML: Missing 'cv' key.")
+        # Hand off to a warm RenderCV worker without blocking the event loop
+        pdf_bytes = await render_pdf_bytes(doc.to_yaml(), profile)
+    except RenderError as re_err:
+        print(f"RenderCV Failed: {re_err}\n{re_err.logs}")
+        if re_err.logs:
+            raise HTTPException(status_code=500, detail=f"RenderCV generation failed. Logs: {re_err.logs[:500]}...")
+        raise HTTPException(status_code=500, detail=f"Render failed: {str(re_err)}")
+    except Exception as e:
+        print(f"Render Generic Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Render failed: {str(e)}")
 
-        # Ensure 'design' key exists
-        if "design" not in data:
-            data["design"] = {}
-        
-        # Theme Validation (Fix for 'custom theme folder' error)
-        valid_themes = ["classic", "engineering", "sb2nov"]
-        if theme not in valid_themes:
-            # If user selected "moderncv" or any other unsupported theme, fallback to a safe one
-            print(f"Warning: Unknown theme '{theme}', defaulting to 'sb2nov'.")
-            theme = "sb2nov"
-        
-        # Set theme
-        data["design"]["theme"] = theme
-        
-        # Dump back to string
-        yaml_content = yaml.dump(data, allow_unicode=True, sort_keys=False)
-        
+    render_cache.put(cache_key, pdf_bytes)
+    return pdf_bytes
+
+@app.post("/render")
+async def render_pdf(request: RenderRequest, async_job: Annotated[bool, Query(alias="async")] = False,
+                     delivery: Annotated[str, Query(alias="format")] = "json", profile: str = "final"):
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile '{profile}' (expected one of {', '.join(RENDER_PROFILES)})")
+    if delivery not in PDF_FORMATS and delivery != "png":
+        # Checked before rendering so a typo doesn't cost a RenderCV run
+        raise HTTPException(status_code=400, detail=f"Unknown format '{delivery}' (expected one of {', '.join(PDF_FORMATS)}, png)")
+    if async_job:
+        if delivery != "json":
+            # Async results always come back through GET /jobs/{id}; the PDF itself is at /jobs/{id}/pdf
+            raise HTTPException(status_code=400, detail="format is not supported with async=true; fetch the PDF from /jobs/{id}/pdf")
+        return enqueue_job("render", request, {"profile": profile})
+    if delivery == "png":
+        profile = "preview"
+    try:
+        # Parse once; theme injection edits the parsed document
+        doc = ResumeDocument.parse(request.resume_yaml)
+        theme = doc.with_theme(request.theme or "classic")
     except Exception as e:
         print(f"YAML Validation/Injection Error: {e}")
         # CRITICAL FIX: Fail here instead of passing garbage to RenderCV
         raise HTTPException(status_code=400, detail=f"Invalid YAML generated. Please regenerate. Error: {str(e)}")
 
-    pdf_base64 = ""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        input_yaml_path = os.path.join(temp_dir, "resume.yaml")
-        with open(input_yaml_path, "w") as f:
-            f.write(yaml_content)
-        
+    pdf_bytes = await render_resume_document(doc, theme, profile)
+    if delivery == "png":
+        return await render_preview_png(doc, theme, pdf_bytes)
+    return pdf_delivery(delivery, doc.cache_key(theme), pdf_bytes, {"final_yaml": doc.to_yaml()})
+
+async def render_preview_png(doc: ResumeDocument, theme: str, pdf_bytes: bytes) -> Response:
+    try:
+        png_bytes = await run_in_threadpool(first_page_png, pdf_bytes)
+    except RenderError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    headers = pdf_headers(doc.cache_key(theme, "png", str(RENDER_PREVIEW_DPI)), "resume.png")
+    return Response(content=png_bytes, media_type="image/png", headers=headers)
+
+@app.get("/render/pdf/{key}")
+def get_rendered_pdf(key: str, request: Request):
+    # Artifact URL handed out by `?format=url`; valid while the PDF stays in the render cache
+    if not re.fullmatch(r"[0-9a-f]{64}", key) or not render_cache.contains(key):
+        raise HTTPException(status_code=404, detail="PDF expired or not found; render again")
+    headers = pdf_headers(key)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    path = render_cache.disk_path(key)
+    if path:
+        # Streamed from disk in chunks rather than read into memory
+        return FileResponse(path, media_type="application/pdf", headers=headers)
+    pdf_bytes = render_cache.get(key)
+    if pdf_bytes is None:
+        raise HTTPException(status_code=404, detail="PDF expired or not found; render again")
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+@app.get("/render/cache")
+def render_cache_stats():
+    return render_cache.snapshot()
+
+@app.get("/gemini/clients")
+def gemini_client_stats():
+    return gemini_clients.snapshot()
+
+@app.get("/prompt/compaction")
+def prompt_compaction_stats():
+    return prompt_compactor.snapshot()
+
+@app.get("/render/pool")
+def render_pool_stats():
+    return render_pool.snapshot()
+
+# --- Live Preview ---
+# WebSocket /preview/ws keeps the editor's document server-side and re-renders it
+# as edits arrive, instead of one POST /render per keystroke:
+#   client -> {"type": "edit", "yaml": "...", "theme": "classic", "format": "url"|"png", "seq": 12}
+#             (every field but "type" optional; omitted ones keep their last value)
+#   server -> status {seq, state: "rendering"} | preview {seq, key, pdf_url | png_base64, render_ms}
+#             | unchanged {seq} | error {seq, detail}
+# Bursts are debounced (quiet period, capped so continuous typing still updates).
+# A document whose normalized hash matches what the client already has is not
+# rendered again. Each session has at most one render outstanding: a render that has
+# reached the pool cannot be stopped, so edits arriving while it runs only replace the
+# session's pending text, and the newest document is rendered once it finishes.
+# Typing therefore never builds a backlog of renders.
+PREVIEW_DEBOUNCE_MS = int(os.environ.get("PREVIEW_DEBOUNCE_MS", "400"))
+PREVIEW_MAX_WAIT_MS = int(os.environ.get("PREVIEW_MAX_WAIT_MS", "2000"))
+PREVIEW_FORMATS = ("url", "png")
+preview_stats = {"sessions": 0, "active": 0, "edits": 0, "renders": 0, "unchanged": 0, "coalesced": 0, "errors": 0}
+
+class PreviewSession:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.text = None
+        self.theme = "classic"
+        self.format = "url"
+        self.seq = 0
+        self.last_edit = 0.0
+        self.changed = asyncio.Event()
+        self.shown_key = None  # what the client is displaying
+        self.task = None  # in-flight render
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: dict):
+        async with self._send_lock:
+            try:
+                await self.websocket.send_json(message)
+            except (WebSocketDisconnect, RuntimeError):
+                pass  # client went away; the receive loop ends the session
+
+    def rendering(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def wait_render(self):
+        # Holds the pending document until the in-flight render finishes
+        if self.rendering():
+            preview_stats["coalesced"] += 1
+            await asyncio.wait({self.task})
+
+    def edit(self, message: dict):
+        if "yaml" in message:
+            self.text = str(message["yaml"])
+        if message.get("theme"):
+            self.theme = str(message["theme"])
+        if message.get("format"):
+            if message["format"] not in PREVIEW_FORMATS:
+                raise ValueError(f"Unknown format '{message['format']}' (expected one of {', '.join(PREVIEW_FORMATS)})")
+            if message["format"] != self.format:
+                self.format = message["format"]
+                self.shown_key = None  # the client needs the other representation
+        self.seq = message.get("seq", self.seq + 1)
+        self.last_edit = time.monotonic()
+        preview_stats["edits"] += 1
+        if self.text is not None:
+            self.changed.set()
+
+async def debounce_edits(session: PreviewSession):
+    # Waits until edits pause for PREVIEW_DEBOUNCE_MS, or PREVIEW_MAX_WAIT_MS after the burst began
+    burst_started = time.monotonic()
+    while True:
+        now = time.monotonic()
+        delay = min(session.last_edit + PREVIEW_DEBOUNCE_MS / 1000 - now,
+                    burst_started + PREVIEW_MAX_WAIT_MS / 1000 - now)
+        if delay <= 0:
+            return
+        await asyncio.sleep(delay)
+
+async def preview_render(session: PreviewSession, seq, doc: ResumeDocument, theme: str, key: str):
+    # key: "<format>:<render cache key>"
+    delivery, cache_key = key.split(":", 1)
+    await session.send({"type": "status", "seq": seq, "state": "rendering"})
+    started = time.perf_counter()
+    try:
+        pdf_bytes = await render_resume_document(doc, theme, "preview")
+        message = {"type": "preview", "seq": seq, "key": cache_key}
+        if delivery == "png":
+            png_bytes = await run_in_threadpool(first_page_png, pdf_bytes)
+            message["png_base64"] = base64.b64encode(png_bytes).decode("utf-8")
+        else:
+            message["pdf_url"] = f"/render/pdf/{cache_key}"
+    except (HTTPException, RenderError) as e:
+        preview_stats["errors"] += 1
+        await session.send({"type": "error", "seq": seq, "detail": getattr(e, "detail", None) or str(e)})
+        return
+    message["render_ms"] = elapsed_ms(started)
+    session.shown_key = key
+    preview_stats["renders"] += 1
+    await session.send(message)
+
+async def preview_scheduler(session: PreviewSession):
+    while True:
+        await session.changed.wait()
+        await debounce_edits(session)
+        await session.wait_render()
+        session.changed.clear()
+        seq = session.seq
         try:
-            # Run RenderCV
-            # Capture BOTH stdout and stderr to debug errors
-            result = subprocess.run(
-                ["rendercv", "render", input_yaml_path], 
-                cwd=temp_dir, 
-                check=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE
-            )
-            
-            output_dir = os.path.join(temp_dir, "rendercv_output")
-            pdf_file = None
-            for root, dirs, files in os.walk(output_dir):
-                for file in files:
-                    if file.endswith(".pdf"):
-                        pdf_file = os.path.join(root, file)
-                        break
-            
-            if not pdf_file:
-                 raise Exception("PDF generation failed, output file not found.")
-            
-            with open(pdf_file, "rb") as pdf_f:
-                pdf_bytes = pdf_f.read()
-                pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-                
-        except subprocess.CalledProcessError as cpe:
-             # Decode both to see where the error is
-             stdout = cpe.stdout.decode('utf-8') if cpe.stdout else ""
-             stderr = cpe.stderr.decode('utf-8') if cpe.stderr else ""
-             combined_error = f"STDOUT: {stdout}\nSTDERR: {stderr}"
-             
-             print(f"RenderCV Failed:\n{combined_error}")
-             raise HTTPException(status_code=500, detail=f"RenderCV generation failed. Logs: {stderr[:500]}...")
+            doc = ResumeDocument.parse(session.text)
+            theme = doc.with_theme(session.theme)
+            key = f"{session.format}:{doc.cache_key(theme)}"
         except Exception as e:
-             print(f"Render Generic Error: {e}")
-             raise HTTPException(status_code=500, detail=f"Render failed: {str(e)}")
+            # Half-typed YAML is normal while editing; keep the last good preview
+            await session.send({"type": "error", "seq": seq, "detail": f"Invalid YAML: {str(e)}"})
+            continue
+
+        if key == session.shown_key:
+            # Whitespace, comments, key order or an undo: nothing new to show
+            preview_stats["unchanged"] += 1
+            await session.send({"type": "unchanged", "seq": seq})
+            continue
+
+        session.task = asyncio.create_task(preview_render(session, seq, doc, theme, key))
+
+@app.websocket("/preview/ws")
+async def preview_socket(websocket: WebSocket):
+    await websocket.accept()
+    session = PreviewSession(websocket)
+    scheduler = asyncio.create_task(preview_scheduler(session))
+    preview_stats["sessions"] += 1
+    preview_stats["active"] += 1
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict) or message.get("type") != "edit":
+                    raise ValueError("Expected {\"type\": \"edit\", ...}")
+                session.edit(message)
+            except ValueError as e:
+                await session.send({"type": "error", "seq": None, "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        preview_stats["active"] -= 1
+        scheduler.cancel()
+        if session.rendering():
+            # Stops waiting for the result; a render already on a worker still completes
+            session.task.cancel()
+
+@app.get("/preview/stats")
+def preview_session_stats():
+    return preview_stats
+
+# --- Fused Tailoring Pipeline ---
+# rewrite -> (ATS score || render) in one request, reusing the already-parsed document
+# instead of the client uploading the new YAML again to /ats_score and /render.
+
+async def tailor_ats(model, request: TailorRequest, new_yaml_content: str, doc: ResumeDocument = None) -> dict:
+    if request.ats_mode != "deep":
+        return score_ats_local(new_yaml_content, request.job_description, doc)
+    analysis = await get_jd_analysis(model, request.job_description)
+    return await score_ats(model, new_yaml_content, jd_prompt_context(analysis, request.job_description, "ats"))
+
+async def tailor_render(doc: ResumeDocument, theme: str, new_yaml_content: str, delivery: str = "json") -> dict:
+    # delivery "bytes" is internal (batch items): the raw PDF goes straight to the job store
+    try:
+        if doc is None:
+            doc = ResumeDocument.parse(new_yaml_content)
+        theme = doc.with_theme(theme)
+        pdf_bytes = await render_resume_document(doc, theme)
+        if delivery == "bytes":
+            return {"pdf_bytes": pdf_bytes, "final_yaml": doc.to_yaml()}
+        return pdf_delivery(delivery, doc.cache_key(theme), pdf_bytes, {"final_yaml": doc.to_yaml()})
+    except HTTPException as he:
+        return {"render_error": he.detail}
+    except Exception as e:
+        print(f"Tailor Render Error: {e}")
+        return {"render_error": f"Invalid YAML generated. Please regenerate. Error: {str(e)}"}
 
-    return {"pdf_base64": pdf_base64, "final_yaml": yaml_content}
+@app.post("/tailor")
+async def tailor_resume(request: TailorRequest, delivery: Annotated[str, Query(alias="format")] = "json"):
+    model = get_gemini_model(request.api_key, request.model_version)
+    theme = request.theme or "classic"
+    if delivery not in ("json", "url"):
+        raise HTTPException(status_code=400, detail="/tailor supports format=json or format=url")
+
+    if not request.stream:
+        keywords, doc, new_yaml_content = await run_rewrite(model, request)
+        ats_result, render_result = await asyncio.gather(
+            tailor_ats(model, request, new_yaml_content, doc),
+            tailor_render(doc, theme, new_yaml_content, delivery),
+        )
+        return {"yaml": new_yaml_content, "keywords": keywords, "ats": ats_result, **render_result}
+
+    async def event_stream():
+        yield sse_event("progress", {"stage": "rewrite", "status": "started"})
+        try:
+            keywords, doc, new_yaml_content = await run_rewrite(model, request)
+        except HTTPException as he:
+            yield sse_event("error", {"stage": "rewrite", "detail": he.detail})
+            return
+        yield sse_event("rewrite", {"yaml": new_yaml_content, "keywords": keywords})
+
+        # Emit ATS and render results in whichever order they finish
+        pending = {
+            asyncio.create_task(tailor_ats(model, request, new_yaml_content, doc)): "ats",
+            asyncio.create_task(tailor_render(doc, theme, new_yaml_content, delivery)): "render",
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield sse_event(pending.pop(task), task.result())
+        finally:
+            # Client went away mid-stream: don't leave orphaned work running
+            for task in pending:
+                task.cancel()
+        yield sse_event("done", {})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# --- Batch Tailoring ---
+# One saved version against many JDs. Items run on a fixed set of worker
+# coroutines; Gemini and render throughput are still capped by their semaphores,
+# so a 30-JD batch queues behind the quota instead of behind the user.
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+BATCH_MAX_JOBS = int(os.environ.get("BATCH_MAX_JOBS", "50"))
+
+class BatchJobDescription(BaseModel):
+    job_description: str
+    label: str = ""
+
+class BatchTailorRequest(BaseModel):
+    version: str
+    job_descriptions: list[BatchJobDescription]
+    target_region: str = "international"
+    user_comments: str = ""
+    model_version: str = "gemini-3-flash-preview"
+    api_key: str = None
+    theme: str = "classic"
+    ats_mode: str = "fast"
+    rewrite_mode: str = "full"
+
+batch_queue = asyncio.Queue()
+batch_api_keys = {}  # batch id -> user API key; memory only, dropped when the batch finishes
+batch_bases = {}  # batch id -> BaseResume; rebuilt from the payload after a restart
+_batch_workers = []
+_job_listeners = {}  # job id -> set of asyncio.Event, woken on every state change
+
+def notify_job(job_id: str):
+    for event in _job_listeners.get(job_id, ()):
+        event.set()
+
+@contextlib.contextmanager
+def watch_job(job_id: str):
+    # Yields an Event that is set whenever notify_job(job_id) runs
+    wake = asyncio.Event()
+    _job_listeners.setdefault(job_id, set()).add(wake)
+    try:
+        yield wake
+    finally:
+        listeners = _job_listeners.get(job_id)
+        if listeners is not None:
+            listeners.discard(wake)
+            if not listeners:
+                _job_listeners.pop(job_id, None)
+
+async def wait_for_update(wake: asyncio.Event, timeout: float = 15):
+    # Times out periodically so streams re-check state even without a notification
+    try:
+        await asyncio.wait_for(wake.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+def load_version_yaml(name: str) -> str:
+    safe_name = sanitize_version_name(name)
+    content, _ = version_store.read(safe_name) if safe_name else (None, None)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return content
+
+def batch_summary(batch: dict) -> dict:
+    counts = job_store.status_counts(batch["id"])
+    total = sum(counts.values())
+    finished = counts.get("done", 0) + counts.get("failed", 0) + counts.get("cancelled", 0)
+    return {
+        "batch_id": batch["id"],
+        "status": batch["status"],
+        "version": batch["payload"]["version"],
+        "total": total,
+        "finished": finished,
+        "counts": counts,
+        "created_at": batch["created_at"],
+        "updated_at": batch["updated_at"],
+    }
+
+def batch_item_summary(item: dict) -> dict:
+    result = item["result"] or {}
+    return {
+        "index": item["position"],
+        "label": item["label"],
+        "status": item["status"],
+        "stage": item["stage"],
+        "error": item["error"],
+        "ats_score": (result.get("ats") or {}).get("score"),
+        "has_pdf": bool(result.get("has_pdf")),
+    }
+
+async def run_batch_item(item_id: str):
+    item = job_store.get(item_id)
+    batch = job_store.get(item["parent_id"])
+    if item["status"] != "queued" or batch["status"] == "cancelled":
+        return
+    options = batch["payload"]
+    request = TailorRequest(
+        job_description=item["payload"]["job_description"],
+        current_yaml=options["base_yaml"],
+        target_region=options["target_region"],
+        user_comments=options["user_comments"],
+        model_version=options["model_version"],
+        theme=options["theme"],
+        ats_mode=options["ats_mode"],
+        rewrite_mode=options.get("rewrite_mode", "full"),
+    )
+    try:
+        model = get_gemini_model(batch_api_keys.get(batch["id"]), request.model_version)
+        base = batch_bases.get(batch["id"])
+        if base is None:
+            base = batch_bases[batch["id"]] = BaseResume(options["base_yaml"])
+        job_store.update(item_id, status="running", stage="rewrite")
+        notify_job(batch["id"])
+        keywords, doc, new_yaml_content = await run_rewrite(model, request, base)
+
+        job_store.update(item_id, stage="score_render")
+        notify_job(batch["id"])
+        ats_result, render_result = await asyncio.gather(
+            tailor_ats(model, request, new_yaml_content, doc),
+            tailor_render(doc, request.theme, new_yaml_content, "bytes"),
+        )
+        result = {"yaml": new_yaml_content, "keywords": keywords, "ats": ats_result, "has_pdf": False}
+        if "pdf_bytes" in render_result:
+            job_store.save_artifact(item_id, "resume.pdf", render_result["pdf_bytes"], batch["id"])
+            result["has_pdf"] = True
+            result["final_yaml"] = render_result["final_yaml"]
+        else:
+            result["render_error"] = render_result.get("render_error")
+        job_store.update(item_id, status="done", stage="done", result=result)
+    except HTTPException as he:
+        job_store.update(item_id, status="failed", error=str(he.detail))
+    except Exception as e:
+        print(f"Batch Item Error ({item_id}): {e}")
+        job_store.update(item_id, status="failed", error=str(e))
+    finally:
+        finish_batch_if_complete(batch["id"])
+        notify_job(batch["id"])
+
+def finish_batch_if_complete(batch_id: str):
+    counts = job_store.status_counts(batch_id)
+    if counts.get("queued", 0) or counts.get("running", 0):
+        return
+    batch = job_store.get(batch_id)
+    if batch["status"] not in FINISHED_JOB_STATES:
+        job_store.update(batch_id, status="done" if counts.get("done") else "failed")
+    batch_api_keys.pop(batch_id, None)
+    batch_bases.pop(batch_id, None)
+
+async def batch_worker():
+    while True:
+        item_id = await batch_queue.get()
+        try:
+            await run_batch_item(item_id)
+        except Exception as e:
+            print(f"Batch Worker Error: {e}")
+        finally:
+            batch_queue.task_done()
+
+@app.on_event("startup")
+async def start_batch_workers():
+    for _ in range(BATCH_WORKERS):
+        _batch_workers.append(asyncio.create_task(batch_worker()))
+
+@app.on_event("shutdown")
+async def stop_batch_workers():
+    for task in _batch_workers:
+        task.cancel()
+    _batch_workers.clear()
+
+@app.post("/batches", status_code=202)
+async def create_batch(request: BatchTailorRequest):
+    jds = [jd for jd in request.job_descriptions if jd.job_description.strip()]
+    if not jds:
+        raise HTTPException(status_code=400, detail="No job descriptions provided")
+    if len(jds) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"Too many job descriptions (max {BATCH_MAX_JOBS})")
+    # Fail before queueing anything: missing key, missing version, unparseable base resume
+    get_gemini_model(request.api_key, request.model_version)
+    base_yaml = load_version_yaml(request.version)
+    try:
+        base = BaseResume(base_yaml)
+    except yaml.YAMLError as e:
+        raise HTTPException(status_code=400, detail=f"Base version is not valid YAML: {e}")
+
+    options = request.dict(exclude={"api_key", "job_descriptions"})
+    options["base_yaml"] = base_yaml
+    options["user_key"] = bool(request.api_key)
+    batch_id = job_store.create("tailor_batch", options)
+    if request.api_key:
+        batch_api_keys[batch_id] = request.api_key
+    batch_bases[batch_id] = base
+    for index, jd in enumerate(jds):
+        item_id = job_store.create("tailor", {"job_description": jd.job_description}, parent_id=batch_id,
+                                   position=index, label=jd.label or f"Job {index + 1}")
+        batch_queue.put_nowait(item_id)
+    job_store.update(batch_id, status="running")
+    return {"batch_id": batch_id, "total": len(jds), "status_url": f"/batches/{batch_id}", "events_url": f"/batches/{batch_id}/events"}
+
+def get_batch_or_404(batch_id: str) -> dict:
+    batch = job_store.get(batch_id)
+    if not batch or batch["kind"] != "tailor_batch":
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+@app.get("/batches/{batch_id}")
+def get_batch(batch_id: str):
+    batch = get_batch_or_404(batch_id)
+    return {**batch_summary(batch), "items": [batch_item_summary(item) for item in job_store.children(batch_id)]}
+
+@app.get("/batches/{batch_id}/events")
+async def batch_events(batch_id: str):
+    # Server-Sent Events: `progress` (batch summary) and `item` (one per item state change) until `done`
+    batch = get_batch_or_404(batch_id)
+
+    async def event_stream():
+        sent = {}
+        with watch_job(batch_id) as wake:
+            while True:
+                wake.clear()
+                batch = job_store.get(batch_id)
+                for item in job_store.children(batch_id):
+                    summary = batch_item_summary(item)
+                    key = (summary["status"], summary["stage"])
+                    if sent.get(item["id"]) != key:
+                        sent[item["id"]] = key
+                        yield sse_event("item", summary)
+                summary = batch_summary(batch)
+                yield sse_event("progress", summary)
+                if batch["status"] in FINISHED_JOB_STATES:
+                    yield sse_event("done", summary)
+                    return
+                await wait_for_update(wake)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/batches/{batch_id}/items/{index}")
+def get_batch_item(batch_id: str, index: int):
+    get_batch_or_404(batch_id)
+    item = job_store.child(batch_id, index)
+    if not item:
+        raise HTTPException(status_code=404, detail="Batch item not found")
+    result = item["result"] or {}
+    return {
+        **batch_item_summary(item),
+        "job_description": item["payload"]["job_description"],
+        **{k: v for k, v in result.items() if k != "has_pdf"},
+        "pdf_url": f"/batches/{batch_id}/items/{index}/pdf" if result.get("has_pdf") else None,
+    }
+
+@app.get("/batches/{batch_id}/items/{index}/pdf")
+def get_batch_item_pdf(batch_id: str, index: int):
+    get_batch_or_404(batch_id)
+    item = job_store.child(batch_id, index)
+    path = job_store.artifact_path(item["id"], "resume.pdf", batch_id) if item else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="PDF not available")
+    return FileResponse(path, media_type="application/pdf", filename=f"{batch_id}-{index + 1}.pdf")
+
+@app.post("/batches/{batch_id}/cancel")
+def cancel_batch(batch_id: str):
+    # Queued items are skipped by the workers; items already running finish normally
+    batch = get_batch_or_404(batch_id)
+    if batch["status"] in FINISHED_JOB_STATES:
+        raise HTTPException(status_code=409, detail=f"Batch is already {batch['status']}")
+    for item in job_store.children(batch_id):
+        if item["status"] == "queued":
+            job_store.update(item["id"], status="cancelled")
+    job_store.update(batch_id, status="cancelled")
+    batch_api_keys.pop(batch_id, None)
+    batch_bases.pop(batch_id, None)
+    notify_job(batch_id)
+    return batch_summary(job_store.get(batch_id))
 
 @app.post("/detect_ai")
 async def detect_ai_patterns(request: AIAnalysisRequest):
+    if request.mode != "deep":
+        return analyze_text(request.resume_yaml)
+
     model = get_gemini_model(request.api_key)
     
     prompt = f"""
@@ -556,7 +1442,7 @@ async def detect_ai_patterns(request: AIAnalysisRequest):
     """
     
     try:
-        response = model.generate_content(prompt)
+        response = await generate_content_async(model, prompt)
         text = response.text.replace("```json", "").replace("```", "").strip()
         data = json.loads(text)
         return data
@@ -565,17 +1451,21 @@ async def detect_ai_patterns(request: AIAnalysisRequest):
         raise HTTPException(status_code=500, detail="Failed to analyze AI patterns.")
 
 @app.post("/generate_cover_letter")
-async def generate_cover_letter(request: CoverLetterRequest):
+async def generate_cover_letter(request: CoverLetterRequest, async_job: Annotated[bool, Query(alias="async")] = False):
     model = get_gemini_model(request.api_key)
+    if async_job:
+        return enqueue_job("cover_letter", request)
+    analysis = await get_jd_analysis(model, request.job_description)
+    resume_yaml, tokens_saved = prompt_compactor.resume("cover_letter", request.resume_yaml)
     
     prompt = f"""
     Write a Professional Cover Letter based on the provided Resume and Job Description.
     
     RESUME:
-    {request.resume_yaml}
+    {resume_yaml}
     
     JOB DESCRIPTION:
-    {request.job_description}
+    {jd_prompt_context(analysis, request.job_description, "cover_letter")}
     
     Formatting Rules:
     - Keep it concise (max 300 words).
@@ -590,14 +1480,17 @@ async def generate_cover_letter(request: CoverLetterRequest):
     """
     
     try:
-        response = model.generate_content(prompt)
+        started = time.perf_counter()
+        response = await generate_content_async(model, prompt)
         text = response.text.replace("```json", "").replace("```", "").strip()
         
         # Analytics
         usage = getattr(response, 'usage_metadata', None)
-        log_event("cover_letter_generated", {
+        analytics_store.log_event("cover_letter_generated", {
             "tokens_input": usage.prompt_token_count if usage else 0,
-            "tokens_output": usage.candidates_token_count if usage else 0
+            "tokens_output": usage.candidates_token_count if usage else 0,
+            "latency_ms": elapsed_ms(started),
+            "prompt_tokens_saved": tokens_saved,
         })
 
         data = json.loads(text)
@@ -613,6 +1506,8 @@ async def generate_linkedin(request: LinkedInRequest):
          raise HTTPException(status_code=400, detail="Gemini API Key required")
     
     model = get_gemini_model(request_api_key)
+    analysis = await get_jd_analysis(model, request.job_description) if request.job_description.strip() else {}
+    company_name = request.company_name or analysis.get("company") or "the company"
 
     if request.type == "connection":
         prompt_type = "LINKEDIN CONNECTION REQUEST (Strictly < 300 characters)"
@@ -620,20 +1515,21 @@ async def generate_linkedin(request: LinkedInRequest):
     else:
         prompt_type = "LINKEDIN INMAIL / FULL MESSAGE"
         constraints = "Professional, persuasive, and concise (approx 100-150 words). Use a 'hook' in the first sentence."
+    resume_yaml, tokens_saved = prompt_compactor.resume("linkedin", request.resume_yaml)
 
     prompt = f"""
     You are a Career Networking Expert. Write a {prompt_type} to a Recruiter/Hiring Manager.
     
     MY RESUME SUMMARY (YAML):
-    {request.resume_yaml[:1500]}...
+    {resume_yaml}
     
     TARGET RECRUITER:
     Name: {request.recruiters_name or 'Hiring Manager'}
     Role: {request.recruiters_role or 'Recruiter'}
-    Company: {request.company_name or 'the company'}
+    Company: {company_name}
     
     CONTEXT/JOB:
-    {request.job_description[:500]}
+    {jd_prompt_context(analysis, request.job_description, "linkedin")}
     
     CONSTRAINTS:
     {constraints}
@@ -646,15 +1542,18 @@ async def generate_linkedin(request: LinkedInRequest):
     """
     
     try:
-        response = model.generate_content(prompt)
+        started = time.perf_counter()
+        response = await generate_content_async(model, prompt)
         text = response.text.strip().replace('"', '') # Clean quotes
         
         # Analytics
         usage = getattr(response, 'usage_metadata', None)
-        log_event("outreach_generated", {
-            "type": request.outreach_type,
+        analytics_store.log_event("outreach_generated", {
+            "type": request.type,
             "tokens_input": usage.prompt_token_count if usage else 0,
-            "tokens_output": usage.candidates_token_count if usage else 0
+            "tokens_output": usage.candidates_token_count if usage else 0,
+            "latency_ms": elapsed_ms(started),
+            "prompt_tokens_saved": tokens_saved,
         })
         
         return {"content": text}
@@ -662,7 +1561,9 @@ async def generate_linkedin(request: LinkedInRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/render_cover_letter_pdf")
-async def render_cover_letter_pdf(request: RenderCoverLetterRequest):
+def render_cover_letter_pdf(request: RenderCoverLetterRequest, delivery: Annotated[str, Query(alias="format")] = "json"):
+    if delivery not in PDF_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{delivery}' (expected one of {', '.join(PDF_FORMATS)})")
     yaml_content = request.resume_yaml
     cl_text = request.cover_letter_text
     
@@ -683,6 +1584,16 @@ async def render_cover_letter_pdf(request: RenderCoverLetterRequest):
     except Exception as e:
         print(f"YAML Parse Warning: {e}")
 
+    # Same header + text on the same day => same PDF; shares the render cache (and /render/pdf URLs)
+    from datetime import date
+    today_str = date.today().strftime("%B %d, %Y")
+    cache_key = hashlib.sha256("\0".join(
+        ["cover_letter", today_str, str(name), str(email), str(phone), str(location), cl_text]
+    ).encode("utf-8")).hexdigest()
+    cached_pdf = render_cache.get(cache_key)
+    if cached_pdf is not None:
+        return pdf_delivery(delivery, cache_key, cached_pdf, filename="cover_letter.pdf")
+
     try:
         # Generate PDF with ReportLab
         buffer = io.BytesIO()
@@ -740,8 +1651,6 @@ async def render_cover_letter_pdf(request: RenderCoverLetterRequest):
         story.append(Paragraph(contact_str, styles['HeaderContact']))
         
         # 2. Date
-        from datetime import date
-        today_str = date.today().strftime("%B %d, %Y")
         story.append(Paragraph(today_str, styles['BodyContent']))
         story.append(Spacer(1, 12))
         
@@ -761,15 +1670,13 @@ async def render_cover_letter_pdf(request: RenderCoverLetterRequest):
         doc.build(story)
         pdf_bytes = buffer.getvalue()
         buffer.close()
-        
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        return {"pdf_base64": pdf_base64}
 
     except Exception as e:
         print(f"ReportLab Error: {e}")
         raise HTTPException(status_code=500, detail=f"PDF Generation failed: {str(e)}")
 
-    return {"pdf_base64": pdf_base64}
+    render_cache.put(cache_key, pdf_bytes)
+    return pdf_delivery(delivery, cache_key, pdf_bytes, filename="cover_letter.pdf")
 
 # --- Outreach & Tracker Models ---
 
@@ -791,39 +1698,30 @@ class ApplicationUpdate(BaseModel):
     status: str
 
 # --- Persistence Helper ---
-DB_FILE = "applications_db.json"
-
-def load_db():
-    if not os.path.exists(DB_FILE):
-        return []
-    try:
-        with open(DB_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return []
-
-def save_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+# Applications live in SQLite (tracker_store); applications_db.json is imported once on first use.
 
 # --- Outreach Endpoint ---
 
 @app.post("/generate_outreach")
-async def generate_outreach(request: OutreachRequest):
+async def generate_outreach(request: OutreachRequest, async_job: Annotated[bool, Query(alias="async")] = False):
     model = get_gemini_model(request.api_key)
+    if async_job:
+        return enqueue_job("outreach", request)
+    analysis = await get_jd_analysis(model, request.job_description)
     
     # Decide Prompt and Format based on type
     if request.outreach_type == "cold_email":
         # 3-Step Sequence
+        resume_yaml, _ = prompt_compactor.resume("outreach_sequence", request.resume_yaml)
         prompt = f"""
         You are an expert Career Coach and Copywriter.
         Task: Create a 3-step Cold Email Sequence for this job application.
         
         JOB DESCRIPTION:
-        {request.job_description}
+        {jd_prompt_context(analysis, request.job_description, "outreach_sequence")}
 
         RESUME SUMMARY:
-        {request.resume_yaml[:2000]}
+        {resume_yaml}
 
         OUTPUT FORMAT:
         Strictly return a JSON object with this structure:
@@ -856,16 +1754,17 @@ async def generate_outreach(request: OutreachRequest):
             context_instruction = "Draft a short, professional LinkedIn connection request (max 300 characters). Highlight 1 key match. No subject line needed for LinkedIn."
         elif request.outreach_type == "follow_up":
             context_instruction = "Draft a polite but firm follow-up email sent 1 week after applying. Reiterate enthusiasm."
+        resume_yaml, _ = prompt_compactor.resume("outreach_message", request.resume_yaml)
 
         prompt = f"""
         You are an expert Career Coach.
         Task: {context_instruction}
         
         JOB DESCRIPTION:
-        {request.job_description[:1000]}
+        {jd_prompt_context(analysis, request.job_description, "outreach_message")}
 
         RESUME SUMMARY:
-        {request.resume_yaml[:1000]}
+        {resume_yaml}
 
         OUTPUT FORMAT:
         Strictly return a JSON object with this structure:
@@ -882,7 +1781,7 @@ async def generate_outreach(request: OutreachRequest):
         """
 
     try:
-        response = model.generate_content(prompt)
+        response = await generate_content_async(model, prompt)
         text_response = response.text
         
         # Clean potential markdown code blocks if gemini adds them
@@ -903,293 +1802,382 @@ async def generate_outreach(request: OutreachRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Async Jobs ---
+# `?async=true` on /rewrite, /generate_cover_letter, /generate_outreach and /render
+# answers 202 with a job id straight away. The work runs on its own worker pool
+# (separate from batch workers, so a big batch can't starve interactive jobs) and
+# its state lives in the job store: clients poll /jobs/{id} or subscribe to
+# /jobs/{id}/events, and a dropped connection doesn't lose the result.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "8"))
+
+ASYNC_JOB_KINDS = {
+    "rewrite": (RewriteRequest, rewrite_resume),
+    "cover_letter": (CoverLetterRequest, generate_cover_letter),
+    "outreach": (OutreachRequest, generate_outreach),
+    "render": (RenderRequest, render_pdf),
+}
+
+job_queue = asyncio.Queue()
+job_api_keys = {}  # job id -> user API key; memory only, dropped when the job finishes
+_job_workers = []
+
+def enqueue_job(kind: str, request: BaseModel, options: dict = None) -> JSONResponse:
+    # options: validated query parameters the handler needs when the job runs (e.g. render profile)
+    api_key = getattr(request, "api_key", None)
+    payload = {"request": request.dict(exclude={"api_key"}), "user_key": bool(api_key), "options": options or {}}
+    job_id = job_store.create(kind, payload)
+    if api_key:
+        job_api_keys[job_id] = api_key
+    job_queue.put_nowait(job_id)
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    })
+
+async def run_async_job(job_id: str):
+    job = job_store.get(job_id)
+    if not job or job["status"] != "queued":
+        return
+    model_cls, handler = ASYNC_JOB_KINDS[job["kind"]]
+    request = model_cls(**job["payload"]["request"])
+    if job_id in job_api_keys:
+        request.api_key = job_api_keys[job_id]
+    try:
+        job_store.update(job_id, status="running", stage=job["kind"])
+        notify_job(job_id)
+        result = await handler(request, async_job=False, **job["payload"].get("options", {}))
+        if "pdf_base64" in result:
+            # Keep the PDF on disk, not base64 in the row; GET /jobs/{id} re-inflates it
+            job_store.save_artifact(job_id, "output.pdf", base64.b64decode(result.pop("pdf_base64")))
+            result["has_pdf"] = True
+        job_store.update(job_id, status="done", stage="done", result=result)
+    except HTTPException as he:
+        job_store.update(job_id, status="failed", error=str(he.detail))
+    except Exception as e:
+        print(f"Async Job Error ({job_id}): {e}")
+        job_store.update(job_id, status="failed", error=str(e))
+    finally:
+        job_api_keys.pop(job_id, None)
+        notify_job(job_id)
+
+async def job_worker():
+    while True:
+        job_id = await job_queue.get()
+        try:
+            await run_async_job(job_id)
+        except Exception as e:
+            print(f"Job Worker Error: {e}")
+        finally:
+            job_queue.task_done()
+
+def recover_jobs():
+    # Work that was queued or running when the process stopped goes back on its queue.
+    # User API keys are never persisted, so jobs that needed one can only be failed.
+    requeued, failed, batches = 0, 0, set()
+    for job in job_store.unfinished():
+        if job["kind"] == "tailor_batch":
+            continue  # a batch's own status follows its items
+        owner = job_store.get(job["parent_id"]) if job["parent_id"] else job
+        if not owner or (owner["payload"] or {}).get("user_key"):
+            job_store.update(job["id"], status="failed", error="Interrupted by a server restart; please resubmit")
+            failed += 1
+        else:
+            job_store.update(job["id"], status="queued", stage="queued")
+            (batch_queue if job["parent_id"] else job_queue).put_nowait(job["id"])
+            requeued += 1
+        if job["parent_id"]:
+            batches.add(job["parent_id"])
+    for batch_id in batches:
+        finish_batch_if_complete(batch_id)
+    if requeued or failed:
+        print(f"Job Recovery: {requeued} requeued, {failed} failed")
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_store.purge_expired()
+    recover_jobs()
+    for _ in range(JOB_WORKERS):
+        _job_workers.append(asyncio.create_task(job_worker()))
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    for task in _job_workers:
+        task.cancel()
+    _job_workers.clear()
+
+def get_job_or_404(job_id: str) -> dict:
+    job = job_store.get(job_id)
+    if not job or job["kind"] not in ASYNC_JOB_KINDS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def job_summary(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+def job_result(job: dict):
+    # Same shape the synchronous endpoint would have returned, plus a direct PDF link
+    if job["status"] != "done":
+        return None
+    result = dict(job["result"] or {})
+    if result.pop("has_pdf", False):
+        path = job_store.artifact_path(job["id"], "output.pdf")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                result["pdf_base64"] = base64.b64encode(f.read()).decode("utf-8")
+            result["pdf_url"] = f"/jobs/{job['id']}/pdf"
+    return result
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_job_or_404(job_id)
+    return {**job_summary(job), "result": job_result(job)}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    # Server-Sent Events: `status` on every state change, then `done` (with the result) or `error`
+    get_job_or_404(job_id)
+
+    async def event_stream():
+        sent = None
+        with watch_job(job_id) as wake:
+            while True:
+                wake.clear()
+                job = job_store.get(job_id)
+                summary = job_summary(job)
+                if (summary["status"], summary["stage"]) != sent:
+                    sent = (summary["status"], summary["stage"])
+                    yield sse_event("status", summary)
+                if job["status"] == "done":
+                    yield sse_event("done", {**summary, "result": job_result(job)})
+                    return
+                if job["status"] in FINISHED_JOB_STATES:
+                    yield sse_event("error", summary)
+                    return
+                await wait_for_update(wake)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/jobs/{job_id}/pdf")
+def get_job_pdf(job_id: str):
+    get_job_or_404(job_id)
+    path = job_store.artifact_path(job_id, "output.pdf")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="PDF not available")
+    return FileResponse(path, media_type="application/pdf", filename=f"{job_id}.pdf")
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    # Only queued jobs can be cancelled; a running Gemini call or render completes
+    job = get_job_or_404(job_id)
+    if job["status"] == "queued":
+        job_store.update(job_id, status="cancelled")
+        job_api_keys.pop(job_id, None)
+        notify_job(job_id)
+    return job_summary(job_store.get(job_id))
+
 # --- Tracker Endpoints ---
 
 @app.get("/applications")
-def get_applications():
-    return load_db()
+def get_applications(response: Response, limit: int = None, offset: int = 0, status: str = None,
+                     q: str = None, sort: str = "created", order: str = "desc"):
+    # Still a plain list for existing clients; the unpaginated total rides in a header
+    rows, total = tracker_store.list(limit=limit, offset=offset, status=status, q=q, sort=sort, order=order)
+    response.headers["X-Total-Count"] = str(total)
+    return rows
 
 @app.post("/applications")
 def add_application(app: ApplicationEntry):
-    db = load_db()
     # Generate ID if not present (simple implementation)
     import uuid
     app.id = str(uuid.uuid4())[:8]
     data = app.dict()
-    db.insert(0, data) # Add to top
-    save_db(db)
+    tracker_store.add(data)
     
-    # --- Sync to Google Sheet (if configured) ---
-    try:
-        sync_to_google_sheet(data)
-    except Exception as e:
-        print(f"Background Sync Error: {e}")
-        
+    # Queued for the background Sheets worker; the response never waits on Google
+    sheets_sync.enqueue_append(data)
     return app
 
-def sync_to_google_sheet(app_data):
-    sheet_id = os.environ.get("GOOGLE_SHEET_ID")
-    creds_file = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-    
-    if not sheet_id or not creds_file:
-        print("Google Sheet Sync Skipped: Missing Configuration")
-        return
-
-    try:
-        # Authenticate
-        gc = gspread.service_account(filename=creds_file)
-        sh = gc.open_by_key(sheet_id)
-        
-        # Try to find a specific sheet or use the first one
-        try:
-            worksheet = sh.worksheet("Tracker")
-        except:
-            worksheet = sh.sheet1
-            
-        # Append Row: [Date, Company, Position, Status, JD Snippet]
-        row = [
-            app_data.get("date_applied", ""),
-            app_data.get("company_name", ""),
-            app_data.get("job_title", ""),
-            app_data.get("status", "Applied"),
-            app_data.get("job_description", "")[:200]
-        ]
-        
-        worksheet.append_row(row)
-        print(f"Synced to Google Sheet: {app_data.get('company_name')}")
-        
-    except Exception as e:
-        print(f"Google Sheet Sync Failed: {e}")
+@app.get("/applications/sync")
+def sheets_sync_stats():
+    return sheets_sync.snapshot()
 
 @app.delete("/applications/{app_id}")
 def delete_application(app_id: str):
-    db = load_db()
-    db = [entry for entry in db if entry.get("id") != app_id]
-    save_db(db)
+    tracker_store.delete(app_id)
     return {"status": "deleted"}
 
 @app.patch("/applications/{app_id}")
 def update_status(app_id: str, update: ApplicationUpdate):
-    db = load_db()
-    for entry in db:
-        if entry.get("id") == app_id:
-            entry["status"] = update.status
-            save_db(db)
-            return entry
+    entry = tracker_store.update_status(app_id, update.status)
+    if entry:
+        sheets_sync.enqueue_status(app_id, update.status)
+        return entry
     raise HTTPException(status_code=404, detail="Application not found")
 
 # --- Scraper ---
 class ScrapeRequest(BaseModel):
     url: str
 
-@app.post("/scrape-job")
-async def scrape_job(request: ScrapeRequest):
-    try:
-        url = request.url
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        }
+class BulkScrapeRequest(BaseModel):
+    urls: list[str]
 
-        # --- SPECIAL HANDLING FOR LINKEDIN ---
-        # LinkedIn "collections" or "search" URLs often redirect to login. 
-        # We need to construct the public "jobs/view" URL using the Job ID.
-        if "linkedin.com" in url:
-            job_id = None
-            # Case 1: URL query param ?currentJobId=12345
-            match = re.search(r"currentJobId=(\d+)", url)
-            if match:
-                job_id = match.group(1)
-            
-            # Case 2: URL path jobs/view/12345
-            if not job_id:
-                match = re.search(r"jobs/view/(\d+)", url)
-                if match:
-                    job_id = match.group(1)
-
-            if job_id:
-                # Rewrite to the public view URL which is often scrapable without auth
-                url = f"https://www.linkedin.com/jobs/view/{job_id}"
-                print(f"Rewrote LinkedIn URL to public version: {url}")
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        # LinkedIn might return 429 or 999 for bots, handle gracefully?
-        if response.status_code != 200:
-             raise HTTPException(status_code=400, detail=f"Scraper blocked or failed (Status {response.status_code})")
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # improved scraping logic: look for main content areas
-        # LinkedIn specific: class usually contains 'description' or 'show-more-less-html'
-        content = soup.find(class_=re.compile(r"(description|show-more-less-html|job-details)", re.I))
-        
-        if not content:
-             # Fallback to general semantic tags
-             content = soup.find('main') or soup.find('article') or soup.body
-        
-        if not content:
-             raise HTTPException(status_code=400, detail="Could not extract content from page")
+SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
 
-        # extract text from common text tags
-        text_elements = content.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'ul', 'div'])
-        
-        # filter out very short lines (often menu items or noise)
-        lines = [elem.get_text(strip=True) for elem in text_elements if len(elem.get_text(strip=True)) > 20]
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_lines = []
-        for line in lines:
-            if line not in seen:
-                unique_lines.append(line)
-                seen.add(line)
-
-        full_text = "\n\n".join(unique_lines[:100]) # Limit blocks
-        
-        return {"description": full_text}
+async def fetch_job_description(url: str) -> dict:
+    # Canonical URL -> fresh cache hit, or a (conditional) GET on the pooled client + extraction
+    canonical = canonical_job_url(url)
+    if canonical != url.strip():
+        print(f"Canonicalized job URL: {canonical}")
+
+    cached = scrape_cache.get(canonical)
+    if cached and scrape_cache.is_fresh(cached):
+        return {"description": cached["description"], "url": canonical, "cache": "hit"}
+
+    headers = {**SCRAPE_HEADERS, **scrape_cache.conditional_headers(cached)}
+    # Host slot first, so requests queued behind a slow board don't hold global slots
+    async with host_limiter.slot(urlsplit(canonical).netloc):
+        async with scrape_semaphore:
+            response = await get_http_client().get(canonical, headers=headers)
+
+    if response.status_code == 304 and cached:
+        scrape_cache.touch(canonical, cached)
+        return {"description": cached["description"], "url": canonical, "cache": "revalidated"}
+
+    # LinkedIn might return 429 or 999 for bots, handle gracefully?
+    if response.status_code != 200:
+         raise HTTPException(status_code=400, detail=f"Scraper blocked or failed (Status {response.status_code})")
 
+    # HTML parsing is CPU-bound, keep it off the event loop
+    full_text = await run_in_threadpool(extract_job_description, response.text)
+    scrape_cache.put(canonical, full_text, response.headers.get("etag"), response.headers.get("last-modified"))
+    return {"description": full_text, "url": canonical, "cache": "miss"}
+
+@app.post("/scrape-job")
+async def scrape_job(request: ScrapeRequest):
+    try:
+        return await fetch_job_description(request.url)
     except Exception as e:
         print(f"Scraping error: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to scrape URL: {str(e)}")
 
+@app.post("/scrape-jobs")
+async def scrape_jobs(request: BulkScrapeRequest):
+    # Fetches every URL concurrently and streams each outcome as it lands (SSE):
+    #   result {index, url, description, cache} | error {index, url, detail} ... -> done
+    urls = [u.strip() for u in request.urls if u and u.strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs provided")
+    if len(urls) > SCRAPE_BULK_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"Too many URLs (max {SCRAPE_BULK_MAX_URLS})")
+
+    async def scrape_one(key: str, url: str):
+        try:
+            return key, await fetch_job_description(url), None
+        except HTTPException as e:
+            return key, None, e.detail
+        except Exception as e:
+            return key, None, f"Failed to scrape URL: {str(e)}"
+
+    async def event_stream():
+        # Links that canonicalize to the same posting are fetched once
+        indexes, tasks = {}, []
+        for index, url in enumerate(urls):
+            try:
+                key = canonical_job_url(url)
+            except ValueError:
+                key = url
+            if key not in indexes:
+                indexes[key] = []
+                tasks.append(asyncio.create_task(scrape_one(key, url)))
+            indexes[key].append(index)
+
+        succeeded = failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                key, result, error = await finished
+                for index in indexes[key]:
+                    if error is None:
+                        succeeded += 1
+                        yield sse_event("result", {"index": index, "input": urls[index], **result})
+                    else:
+                        failed += 1
+                        yield sse_event("error", {"index": index, "input": urls[index], "detail": error})
+            yield sse_event("done", {"total": len(urls), "succeeded": succeeded, "failed": failed})
+        finally:
+            # Client went away: stop fetching what nobody will read
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/scrape-job/cache")
+def scrape_cache_stats():
+    return scrape_cache.snapshot()
+
 # --- Main ---
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
 # --- Version Control Endpoints ---
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-VERSIONS_DIR = os.path.join(BASE_DIR, "data", "versions")
+# Backed by version_store (content-addressed, deduplicated, with per-name history).
+# GET /versions keeps returning plain names unless `detail=true` is passed.
 
 @app.get("/versions")
-async def list_versions():
-    if not os.path.exists(VERSIONS_DIR):
-        return []
-    files = [f for f in os.listdir(VERSIONS_DIR) if f.endswith(".yaml")]
-    # return names without extension
-    return [f.replace(".yaml", "") for f in files]
+def list_versions(skill: str = None, detail: bool = False):
+    rows = version_store.list(skill=skill)
+    if detail:
+        return rows
+    return [row["name"] for row in rows]
 
 @app.get("/versions/{name}")
-async def get_version(name: str):
-    file_path = os.path.join(VERSIONS_DIR, f"{name}.yaml")
-    if not os.path.exists(file_path):
+def get_version(name: str, rev: int = None):
+    content, revision = version_store.read(name, rev)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return {"name": name, "yaml_content": content, "rev": revision["rev"], "theme": revision["theme"]}
+
+@app.get("/versions/{name}/history")
+def get_version_history(name: str):
+    history = version_store.history(name)
+    if not history:
         raise HTTPException(status_code=404, detail="Version not found")
-    with open(file_path, "r") as f:
-        content = f.read()
-    return {"name": name, "yaml_content": content}
+    return {"name": name, "revisions": history}
 
 @app.post("/versions")
-async def save_version(request: VersionRequest):
-    if not os.path.exists(VERSIONS_DIR):
-        os.makedirs(VERSIONS_DIR)
-    
-    # Sanitize filename (basic)
-    safe_name = "".join([c for c in request.name if c.isalnum() or c in (' ', '-', '_')]).strip()
+def save_version(request: VersionRequest):
+    safe_name = sanitize_version_name(request.name)
     if not safe_name:
          raise HTTPException(status_code=400, detail="Invalid version name")
 
-    file_path = os.path.join(VERSIONS_DIR, f"{safe_name}.yaml")
-    with open(file_path, "w") as f:
-        f.write(request.yaml_content)
-    
-    return {"message": "Version saved", "name": safe_name}
+    head = version_store.save(safe_name, request.yaml_content, theme=request.theme)
+    return {"message": "Version saved", "name": safe_name, "rev": head["head_rev"], "deduplicated": not head["created"]}
 
 @app.delete("/versions/{name}")
-async def delete_version(name: str):
-    file_path = os.path.join(VERSIONS_DIR, f"{name}.yaml")
-    if os.path.exists(file_path):
-        os.remove(file_path)
+def delete_version(name: str):
+    version_store.delete(name)
     return {"message": "Version deleted"}
 
-# --- Analytics Database ---
-import sqlite3
-from datetime import datetime
-
-ANALYTICS_DB_PATH = os.path.join(BASE_DIR, "data", "analytics.db")
+@app.get("/version-store")
+def version_store_stats():
+    return version_store.snapshot()
 
-def init_analytics_db():
-    if not os.path.exists(os.path.dirname(ANALYTICS_DB_PATH)):
-        os.makedirs(os.path.dirname(ANALYTICS_DB_PATH))
-    
-    conn = sqlite3.connect(ANALYTICS_DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_type TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            details TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-def log_event(event_type: str, details: dict):
-    try:
-        init_analytics_db()
-        conn = sqlite3.connect(ANALYTICS_DB_PATH)
-        c = conn.cursor()
-        c.execute("INSERT INTO events (event_type, details) VALUES (?, ?)", (event_type, json.dumps(details)))
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Analytics Error: {e}")
+# --- Analytics ---
 
 @app.get("/analytics")
-async def get_analytics():
-    init_analytics_db()
-    conn = sqlite3.connect(ANALYTICS_DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    
-    # Total count
-    c.execute("SELECT COUNT(*) as count FROM events WHERE event_type='resume_generated'")
-    total_resumes = c.fetchone()['count']
-
-    c.execute("SELECT COUNT(*) as count FROM events WHERE event_type='cover_letter_generated'")
-    total_cover_letters = c.fetchone()['count']
-    
-    # Recent activity
-    c.execute("SELECT * FROM events ORDER BY timestamp DESC LIMIT 20")
-    recent = [dict(row) for row in c.fetchall()]
-    
-    # Detailed aggregation for Charts & Tokens
-    c.execute("SELECT event_type, details FROM events")
-    region_counts = {}
-    theme_counts = {}
-    total_input_tokens = 0
-    total_output_tokens = 0
-    
-    for row in c.fetchall():
-        try:
-            d = json.loads(row['details'])
-            
-            # Count Tokens
-            total_input_tokens += d.get('tokens_input', 0)
-            total_output_tokens += d.get('tokens_output', 0)
-
-            if row['event_type'] == 'resume_generated':
-                # Region Stats
-                t = d.get('target_region', 'unknown')
-                region_counts[t] = region_counts.get(t, 0) + 1
-                
-                # Theme Stats (if available)
-                th = d.get('theme', 'unknown')
-                theme_counts[th] = theme_counts.get(th, 0) + 1
-                
-        except: pass
-
-    conn.close()
-    return {
-        "total_resumes": total_resumes,
-        "total_cover_letters": total_cover_letters,
-        "total_tokens_input": total_input_tokens,
-        "total_tokens_output": total_output_tokens,
-        "region_distribution": region_counts,
-        "theme_distribution": theme_counts,
-        "recent_activity": recent
-    }
-
-# Hook logging into existing endpoints
-# Note: I will inject the logging calls into valid rewrite_resume and render_pdf functions via editing
+def get_analytics():
+    # Served from the rollup tables; cost is independent of event history
+    return analytics_store.summary()
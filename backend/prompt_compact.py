@@ -0,0 +1,246 @@
+import os
+import re
+import threading
+
+import yaml
+
+# --- Prompt Compaction ---
+# Shrinks what goes into LLM prompts without losing what the model needs:
+# - resumes are re-serialized compactly (no comments, empty fields or render
+#   settings) and, when over budget, trimmed by whole sections/entries in
+#   priority order instead of being cut mid-line
+# - job descriptions lose boilerplate (EEO, benefits, cookie/apply chrome) and
+#   repeated sentences, and are truncated on line/sentence boundaries
+# Budgets are in estimated tokens (~4 characters each) per endpoint.
+
+PROMPT_BUDGET_SCALE = float(os.environ.get("PROMPT_BUDGET_SCALE", "1.0"))
+
+# endpoint -> (resume tokens, job description tokens); None = compact only, never truncate
+PROMPT_BUDGETS = {
+    "rewrite": (None, 2500),  # the rewrite returns the whole resume, so it must see all of it
+    "ats": (None, 2500),
+    "jd_analysis": (None, 3000),
+    "cover_letter": (2500, 2000),
+    "outreach_sequence": (500, 1500),
+    "outreach_message": (250, 250),
+    "linkedin": (400, 150),
+}
+
+# Resume sections kept first when trimming (normalized names); unlisted sections follow in document order
+SECTION_PRIORITY = (
+    "summary", "professional_summary", "personal_statement", "kurzprofil", "experience", "work_experience",
+    "professional_experience", "skills", "technical_skills", "key_skills", "projects", "certifications",
+    "education",
+)
+
+_BOILERPLATE_LINE = re.compile(
+    r"equal (employment )?opportunit|\beeo\b|affirmative action|without regard to|regardless of (race|gender|age)"
+    r"|protected veteran|reasonable accommodation|e-verify|background check"
+    r"|cookie|privacy (policy|notice)|terms of (use|service)|accept all|sign in|log in|create (an )?account"
+    r"|apply now|easy apply|share this job|save (this )?job|report this job|similar jobs|people also viewed"
+    r"|show (more|less)|referrals increase|seniority level|employment type|job function|industries$",
+    re.I,
+)
+# Headings that open a section worth dropping wholesale (until the next heading)
+_BOILERPLATE_HEADING = re.compile(
+    r"^(our )?(benefits|perks|what we offer|why (join|work with) us|equal (employment )?opportunity|eeo statement"
+    r"|diversity,? (equity|and inclusion)|our commitment to diversity|compensation (and|&) benefits)\b",
+    re.I,
+)
+_CONTENT_HEADING = re.compile(
+    r"^(about (the )?(role|job|position|team|you)|responsibilities|what you('ll| will) do|requirements"
+    r"|qualifications|(minimum|basic|preferred) qualifications|skills|experience|nice to have|bonus"
+    r"|who you are|what you('ll)? bring|tech(nology)? stack|the role|your role|key duties)\b",
+    re.I,
+)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def estimate_tokens(text: str) -> int:
+    # Gemini averages ~4 characters per token on English prose and YAML
+    return (len(text) + 3) // 4 if text else 0
+
+
+def budget_for(endpoint: str):
+    resume_budget, jd_budget = PROMPT_BUDGETS.get(endpoint, (None, None))
+    scale = lambda budget: None if budget is None else max(1, int(budget * PROMPT_BUDGET_SCALE))
+    return scale(resume_budget), scale(jd_budget)
+
+
+# --- Job Descriptions ---
+
+def _is_heading(line: str) -> bool:
+    return len(line) <= 60 and (line.endswith(":") or bool(_CONTENT_HEADING.match(line))
+                                or bool(_BOILERPLATE_HEADING.match(line)))
+
+
+def strip_job_boilerplate(text: str) -> str:
+    lines, seen, skipping = [], set(), False
+    for raw_line in (text or "").splitlines():
+        line = _WHITESPACE.sub(" ", raw_line).strip()
+        if not line:
+            continue
+        heading = line.rstrip(":").strip()
+        if _is_heading(line):
+            skipping = bool(_BOILERPLATE_HEADING.match(heading))
+            if skipping:
+                continue
+        if skipping or _BOILERPLATE_LINE.search(line):
+            continue
+        # Boards repeat the summary, requirements and footer; keep the first copy of each sentence
+        kept = []
+        for sentence in _SENTENCE_SPLIT.split(line):
+            key = sentence.lower().strip(" -•*.")
+            if key and key in seen and len(key) > 15:
+                continue
+            seen.add(key)
+            kept.append(sentence)
+        if kept:
+            lines.append(" ".join(kept))
+    return "\n".join(lines)
+
+
+def truncate_text(text: str, budget: int) -> str:
+    # Whole lines while they fit, then whole sentences of the line that doesn't
+    if budget is None or estimate_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            kept.append(line)
+            used += cost
+            continue
+        partial = []
+        for sentence in _SENTENCE_SPLIT.split(line):
+            cost = estimate_tokens(sentence) + 1
+            if used + cost > budget:
+                break
+            partial.append(sentence)
+            used += cost
+        if partial:
+            kept.append(" ".join(partial))
+        break
+    return "\n".join(kept)
+
+
+# --- Resumes ---
+
+def _prune(node):
+    # Drop None / empty strings / empty collections so they cost no tokens
+    if isinstance(node, dict):
+        pruned = {k: _prune(v) for k, v in node.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(node, list):
+        pruned = [_prune(v) for v in node]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    if isinstance(node, str):
+        return node.strip()
+    return node
+
+
+def dump_yaml(data) -> str:
+    return yaml.dump(data, Dumper=_Dumper, sort_keys=False, allow_unicode=True, default_flow_style=False,
+                     width=1_000_000, indent=2)
+
+
+def _section_rank(name: str) -> int:
+    key = re.sub(r"[\s\-]+", "_", str(name).strip().lower())
+    return SECTION_PRIORITY.index(key) if key in SECTION_PRIORITY else len(SECTION_PRIORITY)
+
+
+def _fit_sections(cv: dict, budget: int) -> dict:
+    sections = cv.get("sections")
+    header = {k: v for k, v in cv.items() if k != "sections"}
+    remaining = budget - estimate_tokens(dump_yaml({"cv": header}))
+    if not isinstance(sections, dict):
+        return header if remaining < 0 else cv
+
+    chosen = {}
+    for name in sorted(sections, key=_section_rank):  # stable: unlisted sections keep document order
+        entries = sections[name]
+        cost = estimate_tokens(dump_yaml({name: entries}))
+        if cost <= remaining:
+            chosen[name] = entries
+            remaining -= cost
+        elif isinstance(entries, list):
+            # Leading entries are the most recent / most relevant; keep as many whole ones as fit
+            kept = []
+            for entry in entries:
+                cost = estimate_tokens(dump_yaml({name: kept + [entry]}))
+                if cost > remaining:
+                    break
+                kept.append(entry)
+            if kept:
+                chosen[name] = kept
+                remaining -= estimate_tokens(dump_yaml({name: kept}))
+    # Original section order reads more naturally than priority order
+    return {**header, "sections": {name: chosen[name] for name in sections if name in chosen}}
+
+
+def compact_resume(yaml_text: str, budget: int = None, content_only: bool = True) -> str:
+    try:
+        data = yaml.load(yaml_text, Loader=_Loader)
+    except yaml.YAMLError:
+        data = None
+    if not isinstance(data, dict):
+        # Not a resume document; fall back to plain line-boundary truncation
+        return truncate_text((yaml_text or "").strip(), budget)
+
+    data = _prune(data)
+    if content_only and isinstance(data.get("cv"), dict):
+        # design / locale / rendercv_settings only matter to the renderer
+        data = {"cv": data["cv"]}
+    compact = dump_yaml(data)
+    if budget is None or estimate_tokens(compact) <= budget:
+        return compact
+    if not isinstance(data.get("cv"), dict):
+        return truncate_text(compact, budget)
+    return dump_yaml({**data, "cv": _fit_sections(data["cv"], budget)})
+
+
+class PromptCompactor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {}  # endpoint -> {"calls", "tokens_before", "tokens_after"}
+
+    def _record(self, endpoint: str, before: str, after: str) -> int:
+        tokens_before, tokens_after = estimate_tokens(before), estimate_tokens(after)
+        with self._lock:
+            entry = self.stats.setdefault(endpoint, {"calls": 0, "tokens_before": 0, "tokens_after": 0})
+            entry["calls"] += 1
+            entry["tokens_before"] += tokens_before
+            entry["tokens_after"] += tokens_after
+        return tokens_before - tokens_after
+
+    def resume(self, endpoint: str, yaml_text: str, content_only: bool = True):
+        # Returns (compacted text, tokens saved)
+        budget, _ = budget_for(endpoint)
+        compact = compact_resume(yaml_text or "", budget, content_only)
+        return compact, self._record(endpoint, yaml_text or "", compact)
+
+    def job_description(self, endpoint: str, text: str):
+        # Returns (compacted text, tokens saved)
+        _, budget = budget_for(endpoint)
+        compact = truncate_text(strip_job_boilerplate(text), budget)
+        return compact, self._record(endpoint, text or "", compact)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    **entry,
+                    "tokens_saved": entry["tokens_before"] - entry["tokens_after"],
+                    "saved_pct": round(100 * (1 - entry["tokens_after"] / entry["tokens_before"]), 1)
+                    if entry["tokens_before"] else 0.0,
+                }
+                for endpoint, entry in self.stats.items()
+            }
+        return {"budget_scale": PROMPT_BUDGET_SCALE, "endpoints": endpoints}
+
+
+prompt_compactor = PromptCompactor()
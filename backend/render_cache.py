@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# --- Render Cache ---
+# Content-addressed cache for rendered PDFs.
+# Tier 1: bounded in-memory LRU (bytes capped).
+# Tier 2: size-capped directory on disk, evicted oldest-access first.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", os.path.join(BASE_DIR, "data", "render_cache"))
+RENDER_CACHE_MEMORY_MB = int(os.environ.get("RENDER_CACHE_MEMORY_MB", "64"))
+RENDER_CACHE_DISK_MB = int(os.environ.get("RENDER_CACHE_DISK_MB", "512"))
+
+
+def make_cache_key(data, *parts: str) -> str:
+    # Normalize: key order and formatting differences in the YAML must not
+    # produce different keys, so hash the parsed structure, not the text.
+    # parts: theme, plus output variant for derived artifacts ("png", dpi)
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    h.update(canonical.encode("utf-8"))
+    return h.hexdigest()
+
+
+class RenderCache:
+    def __init__(self, cache_dir: str = RENDER_CACHE_DIR,
+                 memory_limit_bytes: int = RENDER_CACHE_MEMORY_MB * 1024 * 1024,
+                 disk_limit_bytes: int = RENDER_CACHE_DISK_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_limit_bytes = disk_limit_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes
+        self._memory_bytes = 0
+        self._disk_index = None  # key -> (size, last_access); loaded lazily
+        self._disk_bytes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # --- Disk helpers ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def _load_disk_index(self):
+        # Called with the lock held
+        if self._disk_index is not None:
+            return
+        self._disk_index = {}
+        self._disk_bytes = 0
+        if not os.path.exists(self.cache_dir):
+            return
+        for root, dirs, files in os.walk(self.cache_dir):
+            for file in files:
+                if not file.endswith(".pdf"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, file))
+                except OSError:
+                    continue
+                self._disk_index[file[:-4]] = (st.st_size, st.st_mtime)
+                self._disk_bytes += st.st_size
+
+    def _evict_disk(self):
+        # Called with the lock held
+        if self._disk_bytes <= self.disk_limit_bytes:
+            return
+        for key, (size, _) in sorted(self._disk_index.items(), key=lambda kv: kv[1][1]):
+            if self._disk_bytes <= self.disk_limit_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._disk_index[key]
+            self._disk_bytes -= size
+            self.stats["evictions"] += 1
+
+    # --- Memory helpers ---
+
+    def _remember(self, key: str, pdf_bytes: bytes):
+        # Called with the lock held
+        if len(pdf_bytes) > self.memory_limit_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = pdf_bytes
+        self._memory_bytes += len(pdf_bytes)
+        while self._memory_bytes > self.memory_limit_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # --- Public API ---
+
+    # File reads and writes happen outside the lock, so a slow disk never holds up
+    # memory-tier lookups; the lock only covers the LRU, the disk index and stats.
+
+    def get(self, key: str):
+        with self._lock:
+            pdf_bytes = self._memory.get(key)
+            if pdf_bytes is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return pdf_bytes
+            self._load_disk_index()
+            entry = self._disk_index.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(path)
+            accessed = time.time()
+        except OSError:
+            # File vanished underneath us (evicted meanwhile, manual cleanup, another container)
+            pdf_bytes = None
+
+        with self._lock:
+            if pdf_bytes is None:
+                if self._disk_index.get(key) == entry:
+                    self._disk_bytes -= entry[0]
+                    del self._disk_index[key]
+                self.stats["misses"] += 1
+                return None
+            if key in self._disk_index:
+                self._disk_index[key] = (entry[0], accessed)
+            self._remember(key, pdf_bytes)
+            self.stats["disk_hits"] += 1
+            return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes):
+        with self._lock:
+            self._remember(key, pdf_bytes)
+            self._load_disk_index()
+            self.stats["stores"] += 1
+            if key in self._disk_index or len(pdf_bytes) > self.disk_limit_bytes:
+                return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write atomically so a concurrent reader never sees a partial PDF
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+            stored_at = time.time()
+        except OSError as e:
+            print(f"Render Cache Write Error: {e}")
+            return
+
+        with self._lock:
+            if key in self._disk_index:
+                return  # a concurrent put of the same PDF got there first
+            self._disk_index[key] = (len(pdf_bytes), stored_at)
+            self._disk_bytes += len(pdf_bytes)
+            self._evict_disk()
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+            self._load_disk_index()
+            return key in self._disk_index
+
+    def disk_path(self, key: str):
+        # Lets callers stream a cached PDF from disk instead of loading it into memory
+        with self._lock:
+            self._load_disk_index()
+            if key not in self._disk_index:
+                return None
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._load_disk_index()
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+render_cache = RenderCache()
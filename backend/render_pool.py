@@ -0,0 +1,290 @@
+import multiprocessing
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+
+import toolchain_cache
+
+# --- RenderCV Worker Pool ---
+# Long-lived worker processes that import RenderCV once and call its Python API,
+# instead of paying interpreter startup + imports on every `rendercv render`.
+
+RENDER_POOL_SIZE = int(os.environ.get("RENDER_POOL_SIZE", str(max(1, os.cpu_count() or 1))))
+RENDER_JOB_TIMEOUT = float(os.environ.get("RENDER_JOB_TIMEOUT", "120"))
+RENDER_WORKER_MAX_JOBS = int(os.environ.get("RENDER_WORKER_MAX_JOBS", "50"))
+# Each new worker renders a tiny resume in this theme before taking jobs, so the first
+# real render doesn't pay for template loading and font lookup; empty disables
+RENDER_WARMUP_THEME = os.environ.get("RENDER_WARMUP_THEME", "classic")
+RENDER_PREVIEW_DPI = int(os.environ.get("RENDER_PREVIEW_DPI", "72"))
+
+# final:   whatever RenderCV produces by default (CLI: PDF + per-page PNGs + Markdown + HTML)
+# preview: the PDF alone; the page-1 PNG for the editor is rasterized from it (first_page_png)
+# Only the CLI fallback has side outputs to skip. The Python API path (the normal setup)
+# already writes just the PDF, so there both profiles do the same work.
+RENDER_PROFILES = ("final", "preview")
+PREVIEW_CLI_FLAGS = ["--dont-generate-markdown", "--dont-generate-html", "--dont-generate-png"]
+
+try:
+    import pymupdf  # installed with rendercv[full]
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF < 1.24
+    except ImportError:
+        pymupdf = None
+
+
+class RenderError(Exception):
+    def __init__(self, message: str, logs: str = ""):
+        super().__init__(message)
+        self.logs = logs
+
+
+# --- Worker Process Side ---
+
+def _load_renderer():
+    # Preferred path: RenderCV's Python API, imported once per worker
+    try:
+        from rendercv.api import create_a_pdf_from_a_yaml_string
+
+        def render_with_api(yaml_content, work_dir, profile="final"):
+            # The API only ever writes the PDF: the preview profile saves nothing here
+            pdf_path = os.path.join(work_dir, "resume.pdf")
+            errors = create_a_pdf_from_a_yaml_string(yaml_content, pdf_path)
+            if errors:
+                details = "; ".join(
+                    f"{'.'.join(str(p) for p in err.get('loc', []))}: {err.get('msg', '')}" for err in errors
+                )
+                raise RenderError("RenderCV validation failed", details)
+            return pdf_path
+
+        return render_with_api
+    except ImportError as e:
+        print(f"RenderCV API unavailable in worker ({e}), falling back to CLI")
+
+    # Fallback: same behaviour as before the pool existed
+    def render_with_cli(yaml_content, work_dir, profile="final"):
+        input_yaml_path = os.path.join(work_dir, "resume.yaml")
+        with open(input_yaml_path, "w") as f:
+            f.write(yaml_content)
+        try:
+            subprocess.run(
+                ["rendercv", "render", input_yaml_path] + (PREVIEW_CLI_FLAGS if profile == "preview" else []),
+                cwd=work_dir,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except subprocess.CalledProcessError as cpe:
+            stdout = cpe.stdout.decode('utf-8') if cpe.stdout else ""
+            stderr = cpe.stderr.decode('utf-8') if cpe.stderr else ""
+            raise RenderError("RenderCV generation failed", f"STDOUT: {stdout}\nSTDERR: {stderr}")
+
+        output_dir = os.path.join(work_dir, "rendercv_output")
+        for root, dirs, files in os.walk(output_dir):
+            for file in files:
+                if file.endswith(".pdf"):
+                    return os.path.join(root, file)
+        return None
+
+    return render_with_cli
+
+
+def _render_pdf(renderer, yaml_content: str, profile: str = "final") -> bytes:
+    # Per-document files go in a throwaway directory; fonts and TeX caches persist (toolchain_cache)
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = renderer(yaml_content, work_dir, profile)
+        if not pdf_path or not os.path.exists(pdf_path):
+            raise RenderError("PDF generation failed, output file not found.")
+        with open(pdf_path, "rb") as f:
+            return f.read()
+
+
+def render_warmup(theme: str, renderer=None) -> tuple:
+    # -> (ok, detail); in-process, used by worker start-up and `python toolchain_cache.py`
+    try:
+        _render_pdf(renderer or _load_renderer(), toolchain_cache.warmup_yaml(theme), "preview")
+    except Exception as e:
+        return False, f"{e} {getattr(e, 'logs', '')}".strip()
+    try:
+        toolchain_cache.mark_warmed(theme)
+    except OSError:
+        pass
+    return True, ""
+
+
+def _worker_main(conn):
+    toolchain_cache.configure_environment()
+    renderer = _load_renderer()
+    if RENDER_WARMUP_THEME:
+        ok, detail = render_warmup(RENDER_WARMUP_THEME, renderer)
+        if not ok:
+            print(f"Render worker warm-up failed: {detail}")
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+        yaml_content, profile = job
+        try:
+            conn.send(("ok", _render_pdf(renderer, yaml_content, profile)))
+        except RenderError as e:
+            conn.send(("error", str(e), e.logs))
+        except Exception as e:
+            conn.send(("error", f"Render failed: {e}", ""))
+
+
+# --- Parent Side ---
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RenderPool:
+    def __init__(self, size: int = RENDER_POOL_SIZE, job_timeout: float = RENDER_JOB_TIMEOUT,
+                 max_jobs_per_worker: int = RENDER_WORKER_MAX_JOBS):
+        self.size = max(1, size)
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        # spawn, not fork: the API process has live threads (uvicorn, caches)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.stats = {"jobs": 0, "preview_jobs": 0, "errors": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._closed = False
+        # Workers inherit the cache location (and toolchain key) through the environment
+        try:
+            toolchain_cache.configure_environment()
+            toolchain_cache.prune()
+        except OSError as e:
+            print(f"Toolchain Cache Warning: {e}")
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._ctx))
+        print(f"Render pool started with {self.size} workers")
+
+    def shutdown(self):
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def _replace_async(self, worker: _Worker, kill: bool):
+        # Respawning imports RenderCV again, keep that off the request path
+        def replace():
+            if kill:
+                worker.kill()
+            else:
+                worker.stop()
+            if not self._closed:
+                self._idle.put(_Worker(self._ctx))
+        threading.Thread(target=replace, daemon=True).start()
+
+    def _release(self, worker: _Worker):
+        if self._closed:
+            worker.stop()
+        elif worker.jobs_done >= self.max_jobs_per_worker:
+            self.stats["recycled"] += 1
+            self._replace_async(worker, kill=False)
+        else:
+            self._idle.put(worker)
+
+    def render(self, yaml_content: str, timeout: float = None, profile: str = "final") -> bytes:
+        # Blocking; safe to call from many threads at once (bounded by pool size)
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile '{profile}'")
+        self.start()
+        timeout = timeout or self.job_timeout
+        attempts = 2  # one transparent retry if a worker died before answering
+
+        for attempt in range(attempts):
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                self.stats["timeouts"] += 1
+                raise RenderError("Render queue is full, try again shortly.")
+
+            try:
+                worker.conn.send((yaml_content, profile))
+                if not worker.conn.poll(timeout):
+                    self.stats["timeouts"] += 1
+                    self._replace_async(worker, kill=True)
+                    raise RenderError(f"Render timed out after {timeout:.0f}s")
+                result = worker.conn.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                self.stats["crashes"] += 1
+                self._replace_async(worker, kill=True)
+                if attempt + 1 < attempts:
+                    continue
+                raise RenderError("Render worker crashed")
+
+            worker.jobs_done += 1
+            self.stats["jobs"] += 1
+            if profile == "preview":
+                self.stats["preview_jobs"] += 1
+            self._release(worker)
+
+            if result[0] == "ok":
+                return result[1]
+            self.stats["errors"] += 1
+            raise RenderError(result[1], result[2])
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "job_timeout": self.job_timeout,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "toolchain_cache": toolchain_cache.snapshot(),
+        }
+
+
+def first_page_png(pdf_bytes: bytes, dpi: int = RENDER_PREVIEW_DPI) -> bytes:
+    # Low-resolution image of page 1 for the live editor preview; CPU-bound, run off the event loop
+    if pymupdf is None:
+        raise RenderError("PNG previews need PyMuPDF (pip install pymupdf)")
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        if pdf.page_count == 0:
+            raise RenderError("Rendered PDF has no pages")
+        return pdf[0].get_pixmap(dpi=dpi).tobytes("png")
+
+
+render_pool = RenderPool()
@@ -0,0 +1,131 @@
+import yaml
+
+from render_cache import make_cache_key
+
+# --- Resume Document ---
+# One parsed resume that flows through rewrite post-processing, ATS scoring,
+# render-cache lookup and RenderCV. Text is parsed once with libyaml (when
+# available), every normalization fix runs in one in-place walk, and the YAML
+# text and cache keys are produced lazily and memoized, so a cache hit never
+# re-serializes the document at all.
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+VALID_THEMES = ["classic", "engineering", "sb2nov"]
+DEFAULT_THEME = "sb2nov"  # fallback for unknown themes
+BASICS_FIELDS = ("name", "email", "phone", "location", "website", "social_networks")
+PRESENT_WORDS = frozenset(("present", "current", "now"))
+# RenderCV wants every section to be a list; the model sometimes returns these as plain strings
+LIST_SECTIONS = ("references", "signature")
+
+
+def parse_yaml(text: str):
+    return yaml.load(text, Loader=YAML_LOADER)
+
+
+def dump_yaml(data) -> str:
+    return yaml.dump(data, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False)
+
+
+def _normalize_values(node):
+    # In place: "Present" / "Current" / "Now" -> "present" (RenderCV is case sensitive)
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        return
+    for key, value in list(items):
+        if isinstance(value, str):
+            stripped = value.strip()
+            if len(stripped) <= 7 and stripped.lower() in PRESENT_WORDS:
+                node[key] = "present"
+        elif isinstance(value, (dict, list)):
+            _normalize_values(value)
+
+
+class ResumeDocument:
+    def __init__(self, data: dict):
+        if not isinstance(data, dict):
+            raise ValueError("Invalid Resume YAML: expected a mapping at the top level.")
+        self.data = data
+        self._yaml = None
+        self._keys = {}
+
+    @classmethod
+    def parse(cls, text: str) -> "ResumeDocument":
+        return cls(parse_yaml(text))
+
+    @property
+    def cv(self) -> dict:
+        return self.data.get("cv")
+
+    @property
+    def sections(self) -> dict:
+        return (self.cv or {}).get("sections") or {}
+
+    @property
+    def theme(self):
+        return (self.data.get("design") or {}).get("theme")
+
+    def _changed(self):
+        self._yaml = None
+        self._keys.clear()
+
+    def normalize(self) -> "ResumeDocument":
+        # Rewrite post-processing: lift `basics`, stringify phone, lowercase "present",
+        # wrap string references/signature sections
+        data = self.data
+        if "cv" not in data:
+            if "name" not in data:
+                raise ValueError("Invalid Resume YAML: Missing 'cv' key.")
+            data = self.data = {"cv": data}  # model forgot the `cv` root
+        cv = data["cv"]
+        if not isinstance(cv, dict):
+            raise ValueError("Invalid Resume YAML: 'cv' must be a mapping.")
+
+        basics = cv.get("basics")
+        if isinstance(basics, dict):
+            for key in BASICS_FIELDS:
+                if key in basics and key not in cv:
+                    cv[key] = basics[key]
+        if "phone" in cv:
+            cv["phone"] = str(cv["phone"])
+
+        sections = cv.get("sections")
+        if isinstance(sections, dict):
+            for name in LIST_SECTIONS:
+                if isinstance(sections.get(name), str):
+                    sections[name] = [sections[name]]
+
+        _normalize_values(data)
+        self._changed()
+        return self
+
+    def with_theme(self, theme: str) -> str:
+        # Validates and injects design.theme; returns the theme actually used
+        if "cv" not in self.data:
+            raise ValueError("Invalid Resume YAML: Missing 'cv' key.")
+        if theme not in VALID_THEMES:
+            # If user selected "moderncv" or any other unsupported theme, fallback to a safe one
+            print(f"Warning: Unknown theme '{theme}', defaulting to '{DEFAULT_THEME}'.")
+            theme = DEFAULT_THEME
+        design = self.data.get("design")
+        if not isinstance(design, dict):
+            design = self.data["design"] = {}
+        if design.get("theme") != theme:
+            design["theme"] = theme
+            self._changed()
+        return theme
+
+    def to_yaml(self) -> str:
+        if self._yaml is None:
+            self._yaml = dump_yaml(self.data)
+        return self._yaml
+
+    def cache_key(self, *parts: str) -> str:
+        # render_cache.make_cache_key of the parsed structure, memoized until the next edit
+        if parts not in self._keys:
+            self._keys[parts] = make_cache_key(self.data, *parts)
+        return self._keys[parts]
@@ -0,0 +1,252 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# --- Resume Units ---
+# Splits cv.sections into independently rewritable units so a section-mode
+# rewrite can send them as parallel LLM calls and only for the parts the JD
+# touches. Units: the summary section, each experience entry, the projects
+# section and the skills section. Everything else (basics, education,
+# certifications, ...) passes through untouched. Rewritten units are cached by
+# unit content + JD analysis + region (+ model and user comments).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIT_CACHE_DIR = os.environ.get("UNIT_CACHE_DIR", os.path.join(BASE_DIR, "data", "unit_cache"))
+UNIT_CACHE_MEMORY_ITEMS = int(os.environ.get("UNIT_CACHE_MEMORY_ITEMS", "1024"))
+UNIT_CACHE_DISK_MB = int(os.environ.get("UNIT_CACHE_DISK_MB", "128"))
+UNIT_CACHE_MAX_AGE = int(os.environ.get("UNIT_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+# Entries unused for max_age are swept from disk at most this often
+SWEEP_INTERVAL = 3600
+# Most recent experience entries are always rewritten; older ones only if they mention a JD keyword
+RECENT_EXPERIENCE_ENTRIES = int(os.environ.get("RECENT_EXPERIENCE_ENTRIES", "3"))
+# Bump when the unit prompt changes so cached rewrites from the old prompt are not reused
+UNIT_PROMPT_VERSION = "1"
+
+SUMMARY_SECTIONS = {"summary", "professional_summary", "personal_statement", "kurzprofil", "profile", "about"}
+EXPERIENCE_SECTIONS = {"experience", "work_experience", "professional_experience", "employment"}
+PROJECT_SECTIONS = {"projects", "selected_projects", "personal_projects"}
+SKILL_SECTIONS = {"skills", "technical_skills", "key_skills", "core_competencies"}
+# Only these fields of an entry may change; names, titles, dates and locations are copied back from the input
+REWRITABLE_FIELDS = ("summary", "highlights", "details", "bullet")
+
+
+def section_kind(name: str) -> str:
+    key = re.sub(r"[\s\-]+", "_", str(name).strip().lower())
+    if key in SUMMARY_SECTIONS:
+        return "summary"
+    if key in EXPERIENCE_SECTIONS:
+        return "experience"
+    if key in PROJECT_SECTIONS:
+        return "projects"
+    if key in SKILL_SECTIONS:
+        return "skills"
+    return None
+
+
+def split_units(data: dict) -> list:
+    # -> [{"id", "kind", "section", "index" (None = whole section), "content"}] in document order
+    sections = ((data or {}).get("cv") or {}).get("sections")
+    if not isinstance(sections, dict):
+        return []
+    units = []
+    for name, value in sections.items():
+        kind = section_kind(name)
+        if kind is None or not value:
+            continue
+        if kind == "experience" and isinstance(value, list):
+            for index, entry in enumerate(value):
+                units.append({"id": f"{name}[{index}]", "kind": kind, "section": name, "index": index, "content": entry})
+        else:
+            units.append({"id": name, "kind": kind, "section": name, "index": None, "content": value})
+    return units
+
+
+def unit_text(unit: dict) -> str:
+    return json.dumps(unit["content"], sort_keys=True, default=str, ensure_ascii=False)
+
+
+def is_relevant(unit: dict, keywords: list, experience_rank: int) -> bool:
+    # Summary and skills always carry the keywords; recent roles always matter
+    if unit["kind"] in ("summary", "skills"):
+        return True
+    if unit["kind"] == "experience" and experience_rank < RECENT_EXPERIENCE_ENTRIES:
+        return True
+    text = unit_text(unit).lower()
+    return any(re.search(r"(?<!\w)" + re.escape(k.lower()) + r"(?!\w)", text) for k in keywords if k)
+
+
+def unit_cache_key(unit: dict, analysis_key: str, target_region: str, model_version: str, user_comments: str) -> str:
+    parts = [UNIT_PROMPT_VERSION, unit["kind"], unit_text(unit), analysis_key, target_region, model_version,
+             user_comments or ""]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def merge_unit(unit: dict, rewritten):
+    # Validates the model's version of a unit against the original; returns None if unusable
+    original = unit["content"]
+    if isinstance(original, dict):
+        if not isinstance(rewritten, dict):
+            return None
+        merged = copy.deepcopy(original)
+        for field in REWRITABLE_FIELDS:
+            if field in original and rewritten.get(field):
+                merged[field] = rewritten[field]
+        return merged
+    if isinstance(original, list):
+        if not isinstance(rewritten, list) or not rewritten:
+            return None
+        if len(rewritten) == len(original) and all(isinstance(o, dict) for o in original):
+            merged = [merge_unit({"content": o}, r) for o, r in zip(original, rewritten)]
+            return None if any(m is None for m in merged) else merged
+        # Summary paragraphs / skill lines may be regrouped, but the shape must stay the same
+        if all(isinstance(o, str) for o in original) and all(isinstance(r, str) for r in rewritten):
+            return rewritten
+        if all(isinstance(o, dict) for o in original) and all(isinstance(r, dict) for r in rewritten):
+            return rewritten
+        return None
+    if isinstance(original, str):
+        return rewritten if isinstance(rewritten, str) and rewritten.strip() else None
+    return None
+
+
+def apply_units(data: dict, replacements: dict) -> dict:
+    # replacements: unit id -> new content; returns a new document
+    data = copy.deepcopy(data)
+    sections = data["cv"]["sections"]
+    for unit in split_units(data):
+        if unit["id"] not in replacements:
+            continue
+        if unit["index"] is None:
+            sections[unit["section"]] = replacements[unit["id"]]
+        else:
+            sections[unit["section"]][unit["index"]] = replacements[unit["id"]]
+    return data
+
+
+class UnitCache:
+    # Disk tier is least-recently-used: hits refresh the file's mtime, entries unused for
+    # UNIT_CACHE_MAX_AGE are swept and the directory is capped at UNIT_CACHE_DISK_MB
+    def __init__(self, cache_dir: str = UNIT_CACHE_DIR, memory_items: int = UNIT_CACHE_MEMORY_ITEMS,
+                 disk_limit_bytes: int = UNIT_CACHE_DISK_MB * 1024 * 1024, max_age: int = UNIT_CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.disk_limit_bytes = disk_limit_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._disk_index = None  # key -> (size, last_access); loaded lazily
+        self._disk_bytes = 0
+        self._last_sweep = 0.0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        # Called with the lock held
+        if self._disk_index is not None:
+            return
+        self._disk_index = {}
+        self._disk_bytes = 0
+        if not os.path.exists(self.cache_dir):
+            return
+        for root, dirs, files in os.walk(self.cache_dir):
+            for file in files:
+                if not file.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, file))
+                except OSError:
+                    continue
+                self._disk_index[file[:-5]] = (st.st_size, st.st_mtime)
+                self._disk_bytes += st.st_size
+
+    def _drop_disk(self, key: str):
+        # Called with the lock held
+        size, _ = self._disk_index.pop(key)
+        self._disk_bytes -= size
+        self.stats["evictions"] += 1
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        # Called with the lock held
+        now = time.time()
+        if now - self._last_sweep > SWEEP_INTERVAL:
+            self._last_sweep = now
+            for key in [k for k, (_, last_access) in self._disk_index.items() if now - last_access > self.max_age]:
+                self._drop_disk(key)
+        if self._disk_bytes <= self.disk_limit_bytes:
+            return
+        for key, _ in sorted(self._disk_index.items(), key=lambda kv: kv[1][1]):
+            if self._disk_bytes <= self.disk_limit_bytes:
+                break
+            self._drop_disk(key)
+
+    def _remember(self, key: str, content):
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(self._memory[key])
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                content = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self._remember(key, content)
+            self._load_disk_index()
+            if key in self._disk_index:
+                self._disk_index[key] = (self._disk_index[key][0], time.time())
+        return copy.deepcopy(content)
+
+    def put(self, key: str, content):
+        with self._lock:
+            self._remember(key, content)
+            self.stats["stores"] += 1
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(content, f, default=str)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Unit Cache Write Error: {e}")
+            return
+        with self._lock:
+            self._load_disk_index()
+            old = self._disk_index.get(key)
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._disk_index[key] = (size, time.time())
+            self._evict_disk()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._load_disk_index()
+            return {**self.stats, "memory_items": len(self._memory),
+                    "disk_entries": len(self._disk_index), "disk_bytes": self._disk_bytes}
+
+
+unit_cache = UnitCache()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# --- Scrape Cache ---
+# Extracted job descriptions keyed by canonical URL. Fresh entries (within the
+# TTL) are returned without touching the network; stale ones keep their
+# ETag/Last-Modified so the next fetch is a conditional request and a 304
+# costs one round trip instead of a download + re-extraction. The disk tier
+# drops entries past max_age and is capped at SCRAPE_CACHE_DISK_MB (oldest first).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRAPE_CACHE_DIR = os.environ.get("SCRAPE_CACHE_DIR", os.path.join(BASE_DIR, "data", "scrape_cache"))
+SCRAPE_CACHE_TTL = int(os.environ.get("SCRAPE_CACHE_TTL", str(6 * 3600)))
+SCRAPE_CACHE_MAX_AGE = int(os.environ.get("SCRAPE_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+SCRAPE_CACHE_MEMORY_ITEMS = int(os.environ.get("SCRAPE_CACHE_MEMORY_ITEMS", "256"))
+SCRAPE_CACHE_DISK_MB = int(os.environ.get("SCRAPE_CACHE_DISK_MB", "64"))
+# Entries past max_age are unusable, so they are swept from disk at most this often
+SWEEP_INTERVAL = 3600
+
+# Query params that only track where the click came from
+_TRACKING_PARAMS = re.compile(r"^(utm_.*|trk.*|refid|trackingid|ref|src|source|gclid|fbclid|ebp|lipi)$", re.I)
+
+
+def canonical_job_url(url: str) -> str:
+    url = url.strip()
+    # LinkedIn collections/search pages redirect to login; the public jobs/view page is scrapable
+    if "linkedin.com" in url:
+        match = re.search(r"currentJobId=(\d+)", url) or re.search(r"jobs/view/(?:[^/?#]*-)?(\d+)", url)
+        if match:
+            return f"https://www.linkedin.com/jobs/view/{match.group(1)}"
+
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class ScrapeCache:
+    def __init__(self, cache_dir: str = SCRAPE_CACHE_DIR, ttl: int = SCRAPE_CACHE_TTL,
+                 max_age: int = SCRAPE_CACHE_MAX_AGE, memory_items: int = SCRAPE_CACHE_MEMORY_ITEMS,
+                 disk_limit_bytes: int = SCRAPE_CACHE_DISK_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_age = max_age
+        self.memory_items = memory_items
+        self.disk_limit_bytes = disk_limit_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._disk_index = None  # key -> (size, stored_at); loaded lazily
+        self._disk_bytes = 0
+        self._last_sweep = 0.0
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        # Called with the lock held
+        if self._disk_index is not None:
+            return
+        self._disk_index = {}
+        self._disk_bytes = 0
+        if not os.path.exists(self.cache_dir):
+            return
+        for root, dirs, files in os.walk(self.cache_dir):
+            for file in files:
+                if not file.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, file))
+                except OSError:
+                    continue
+                self._disk_index[file[:-5]] = (st.st_size, st.st_mtime)
+                self._disk_bytes += st.st_size
+
+    def _drop_disk(self, key: str):
+        # Called with the lock held
+        size, _ = self._disk_index.pop(key)
+        self._disk_bytes -= size
+        self._memory.pop(key, None)
+        self.stats["evictions"] += 1
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        # Called with the lock held: expired entries first, then oldest until under the size cap
+        now = time.time()
+        if now - self._last_sweep > SWEEP_INTERVAL:
+            self._last_sweep = now
+            for key in [k for k, (_, stored_at) in self._disk_index.items() if now - stored_at > self.max_age]:
+                self._drop_disk(key)
+        if self._disk_bytes <= self.disk_limit_bytes:
+            return
+        for key, _ in sorted(self._disk_index.items(), key=lambda kv: kv[1][1]):
+            if self._disk_bytes <= self.disk_limit_bytes:
+                break
+            self._drop_disk(key)
+
+    def _remember(self, key: str, entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, url: str):
+        # Returns the entry (fresh or stale-but-revalidatable) or None; a fresh entry counts as a hit
+        key = cache_key(url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            try:
+                with open(self._path(key), "r") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            with self._lock:
+                self._remember(key, entry)
+        if time.time() - entry.get("fetched_at", 0) > self.max_age:
+            with self._lock:
+                self._load_disk_index()
+                if key in self._disk_index:
+                    self._drop_disk(key)
+            return None
+        if self.is_fresh(entry):
+            with self._lock:
+                self.stats["fresh_hits"] += 1
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) <= self.ttl
+
+    def put(self, url: str, description: str, etag: str = None, last_modified: str = None) -> dict:
+        # A full fetch: nothing usable was cached, or the page changed
+        entry = {
+            "url": url,
+            "description": description,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        self._store(cache_key(url), entry)
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["stores"] += 1
+        return entry
+
+    def touch(self, url: str, entry: dict) -> dict:
+        # 304 Not Modified: same description, new freshness window
+        entry = {**entry, "fetched_at": time.time()}
+        self._store(cache_key(url), entry)
+        with self._lock:
+            self.stats["revalidated"] += 1
+        return entry
+
+    def _store(self, key: str, entry: dict):
+        with self._lock:
+            self._remember(key, entry)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Scrape Cache Write Error: {e}")
+            return
+        with self._lock:
+            self._load_disk_index()
+            old = self._disk_index.get(key)
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._disk_index[key] = (size, time.time())
+            self._evict_disk()
+
+    def conditional_headers(self, entry: dict) -> dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._load_disk_index()
+            return {**self.stats, "memory_items": len(self._memory), "ttl_seconds": self.ttl,
+                    "disk_entries": len(self._disk_index), "disk_bytes": self._disk_bytes}
+
+
+scrape_cache = ScrapeCache()
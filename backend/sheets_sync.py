@@ -0,0 +1,307 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import gspread
+import requests
+
+from tracker_store import TRACKER_DB_PATH
+
+# --- Google Sheets Sync Worker ---
+# Tracker writes land in a persistent outbox (same SQLite file as the tracker)
+# and a background thread drains it: one cached gspread client + worksheet
+# handle, pending rows coalesced into a single append_rows call, status changes
+# sent as one batch_update, failures retried with exponential backoff.
+# Request handlers never wait on Google.
+
+SHEETS_SYNC_INTERVAL = float(os.environ.get("SHEETS_SYNC_INTERVAL", "2"))
+SHEETS_SYNC_BATCH = int(os.environ.get("SHEETS_SYNC_BATCH", "200"))
+SHEETS_SYNC_MAX_ATTEMPTS = int(os.environ.get("SHEETS_SYNC_MAX_ATTEMPTS", "20"))
+SHEETS_SYNC_MAX_BACKOFF = 300
+# Point at a local fake / emulator instead of sheets.googleapis.com (no auth is sent)
+GOOGLE_SHEETS_API_URL = os.environ.get("GOOGLE_SHEETS_API_URL")
+
+SHEET_TITLE = "Tracker"
+STATUS_COLUMN = "D"
+ID_COLUMN = 6  # F
+
+_UPDATED_RANGE = re.compile(r"![A-Z]+(\d+)(?::[A-Z]+(\d+))?$")
+
+
+class _RedirectSession(requests.Session):
+    # gspread hard-codes the Google API base URL; rewrite it for the fake endpoint
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(gspread.urls.SPREADSHEETS_API_V4_BASE_URL):
+            url = self.base_url + url[len(gspread.urls.SPREADSHEETS_API_V4_BASE_URL):]
+        return super().request(method, url, *args, **kwargs)
+
+
+def sheet_row(app_data: dict) -> list:
+    # [Date, Company, Position, Status, JD Snippet, ID]; the ID column lets status updates find the row
+    return [
+        app_data.get("date_applied", ""),
+        app_data.get("company_name", ""),
+        app_data.get("job_title", ""),
+        app_data.get("status") or "Applied",
+        (app_data.get("job_description") or "")[:200],
+        app_data.get("id", ""),
+    ]
+
+
+class SheetsSync:
+    def __init__(self, db_path: str = TRACKER_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._flush_lock = threading.Lock()
+        self._worksheet = None
+        self._row_index = {}  # app id -> sheet row number
+        self.stats = {"appended": 0, "status_updates": 0, "batches": 0, "failures": 0, "dropped": 0}
+
+    @property
+    def sheet_id(self):
+        return os.environ.get("GOOGLE_SHEET_ID")
+
+    @property
+    def creds_file(self):
+        return os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+
+    def configured(self) -> bool:
+        return bool(self.sheet_id and (self.creds_file or GOOGLE_SHEETS_API_URL))
+
+    # --- Outbox ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS sheets_outbox (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        op TEXT NOT NULL,
+                        app_id TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL DEFAULT 0,
+                        last_error TEXT
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sheets_outbox_due ON sheets_outbox(next_attempt_at)")
+            self._local.conn = conn
+        return conn
+
+    def _enqueue(self, op: str, app_id: str, payload: dict):
+        if not self.configured():
+            print("Google Sheet Sync Skipped: Missing Configuration")
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO sheets_outbox (op, app_id, payload) VALUES (?, ?, ?)",
+                (op, app_id, json.dumps(payload)),
+            )
+        self._wake.set()
+
+    def enqueue_append(self, app_data: dict):
+        self._enqueue("append", app_data.get("id", ""), app_data)
+
+    def enqueue_status(self, app_id: str, status: str):
+        self._enqueue("status", app_id, {"status": status})
+
+    def pending(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sheets_outbox WHERE attempts < ?", (SHEETS_SYNC_MAX_ATTEMPTS,)
+        ).fetchone()[0]
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": self.pending(), "configured": self.configured(), "running": bool(self._thread)}
+
+    # --- Sheets client ---
+
+    def _get_worksheet(self):
+        if self._worksheet is None:
+            if GOOGLE_SHEETS_API_URL:
+                gc = gspread.Client(auth=None, session=_RedirectSession(GOOGLE_SHEETS_API_URL))
+            else:
+                gc = gspread.service_account(filename=self.creds_file)
+            sh = gc.open_by_key(self.sheet_id)
+            try:
+                self._worksheet = sh.worksheet(SHEET_TITLE)
+            except gspread.WorksheetNotFound:
+                self._worksheet = sh.sheet1
+            self._row_index = {}
+        return self._worksheet
+
+    def _find_rows(self, worksheet, app_ids) -> dict:
+        missing = [a for a in app_ids if a not in self._row_index]
+        if missing:
+            # One column read maps every synced id to its row; cached until a miss
+            ids = worksheet.col_values(ID_COLUMN)
+            self._row_index = {value: i + 1 for i, value in enumerate(ids) if value}
+        return {a: self._row_index[a] for a in app_ids if a in self._row_index}
+
+    def _remember_appended(self, response, app_ids):
+        # "Tracker!A12:F14" -> rows 12..14, so later status updates skip the column read
+        updated = ((response or {}).get("updates") or {}).get("updatedRange", "")
+        match = _UPDATED_RANGE.search(updated)
+        if not match:
+            return
+        first = int(match.group(1))
+        for offset, app_id in enumerate(app_ids):
+            self._row_index[app_id] = first + offset
+
+    # --- Worker ---
+
+    def flush(self) -> int:
+        # Drains one batch of due outbox entries; returns how many were synced
+        with self._flush_lock:
+            conn = self._conn()
+            due = conn.execute(
+                "SELECT seq, op, app_id, payload, attempts FROM sheets_outbox "
+                "WHERE next_attempt_at <= ? AND attempts < ? ORDER BY seq LIMIT ?",
+                (time.time(), SHEETS_SYNC_MAX_ATTEMPTS, SHEETS_SYNC_BATCH),
+            ).fetchall()
+            if not due:
+                return 0
+
+            appends = {}   # app_id -> (outbox row, sheet row)
+            statuses = {}  # app_id -> latest status outbox row
+            superseded = []
+            for row in due:
+                if row["op"] == "append":
+                    appends[row["app_id"]] = (row, sheet_row(json.loads(row["payload"])))
+                elif row["op"] == "status":
+                    if row["app_id"] in statuses:
+                        superseded.append(statuses[row["app_id"]])
+                    statuses[row["app_id"]] = row
+
+            # A status change for a row that is about to be appended is folded into the append
+            for app_id in list(statuses):
+                if app_id in appends:
+                    appends[app_id][1][3] = json.loads(statuses[app_id]["payload"])["status"]
+                    superseded.append(statuses.pop(app_id))
+
+            # Status changes for rows whose append is still backing off wait for it
+            # (appends that gave up no longer block them: they fail or land on their own)
+            if statuses:
+                placeholders = ",".join("?" * len(statuses))
+                waiting = {r[0] for r in conn.execute(
+                    "SELECT DISTINCT app_id FROM sheets_outbox WHERE op = 'append' AND attempts < ? "
+                    f"AND app_id IN ({placeholders})",
+                    [SHEETS_SYNC_MAX_ATTEMPTS, *statuses],
+                )}
+                for app_id in waiting - set(appends):
+                    statuses.pop(app_id)
+
+            synced = 0
+            if appends:
+                rows = list(appends.values())
+                try:
+                    worksheet = self._get_worksheet()
+                    response = worksheet.append_rows([sheet for _, sheet in rows])
+                    self._remember_appended(response, list(appends))
+                    self._done([r["seq"] for r, _ in rows] + [r["seq"] for r in superseded])
+                    superseded = []
+                    synced += len(rows)
+                    self.stats["appended"] += len(rows)
+                    print(f"Synced {len(rows)} row(s) to Google Sheet")
+                except Exception as e:
+                    self._failed([r for r, _ in rows], e)
+
+            if superseded:
+                # Only reachable when no append was in flight for them (an older status for the same app)
+                self._done([r["seq"] for r in superseded if r["app_id"] not in appends])
+
+            if statuses:
+                try:
+                    worksheet = self._get_worksheet()
+                    found = self._find_rows(worksheet, list(statuses))
+                    if found:
+                        worksheet.batch_update([
+                            {"range": f"{STATUS_COLUMN}{found[a]}", "values": [[json.loads(statuses[a]["payload"])["status"]]]}
+                            for a in found
+                        ])
+                        self._done([statuses[a]["seq"] for a in found])
+                        synced += len(found)
+                        self.stats["status_updates"] += len(found)
+                    lost = [statuses[a] for a in statuses if a not in found]
+                    if lost:
+                        self._failed(lost, LookupError("application row not found in sheet"))
+                except Exception as e:
+                    self._failed(list(statuses.values()), e)
+
+            self.stats["batches"] += 1
+            return synced
+
+    def _done(self, seqs):
+        if not seqs:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany("DELETE FROM sheets_outbox WHERE seq = ?", [(s,) for s in seqs])
+
+    def _failed(self, rows, error):
+        # Drop the cached handle too: a stale token or deleted worksheet shouldn't stick
+        self._worksheet = None
+        self.stats["failures"] += 1
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            for row in rows:
+                attempts = row["attempts"] + 1
+                conn.execute(
+                    "UPDATE sheets_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE seq = ?",
+                    (attempts, now + min(SHEETS_SYNC_MAX_BACKOFF, 2 ** attempts), str(error)[:500], row["seq"]),
+                )
+                if attempts >= SHEETS_SYNC_MAX_ATTEMPTS:
+                    self.stats["dropped"] += 1
+                    print(f"Google Sheet Sync Gave Up: {row['op']} {row['app_id']} after {attempts} attempts: {error}")
+        print(f"Google Sheet Sync Failed ({len(rows)} pending, will retry): {error}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(SHEETS_SYNC_INTERVAL)
+            self._wake.clear()
+            # Short pause so a burst of inserts lands in one append_rows call
+            if self._stop.wait(0.2):
+                break
+            try:
+                while self.flush() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                print(f"Google Sheet Sync Worker Error: {e}")
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Google Sheet Sync Worker Error: {e}")
+
+    def start(self):
+        if self._thread is not None or not self.configured():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sheets-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+sheets_sync = SheetsSync()
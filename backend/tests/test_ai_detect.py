@@ -0,0 +1,27 @@
+from ai_detect import analyze_text
+
+RESUME = """cv:
+  sections:
+    experience:
+      - company: Acme
+        highlights:
+          - Spearheading the migration of billing to a new ledger
+          - Orchestrating weekly releases across four teams
+          - Navigated a vendor change, leveraging existing contracts
+"""
+
+
+def flagged(text):
+    return {item["phrase"].lower() for item in analyze_text(text)["items"]}
+
+
+def test_past_tense_entries_match_ing_forms():
+    assert {"spearheading", "orchestrating"} <= flagged(RESUME)
+
+
+def test_ing_entries_match_past_tense():
+    assert {"navigated", "leveraging"} <= flagged(RESUME)
+
+
+def test_plain_verbs_not_flagged():
+    assert not flagged("cv:\n  highlights:\n    - Led the migration of billing and ran weekly releases\n")
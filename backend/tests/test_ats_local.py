@@ -0,0 +1,43 @@
+from ats_local import canonical_terms, score_resume
+
+ACCOUNTANT_JD = """Senior Accountant
+We are hiring a senior accountant to join the rest of the finance team this spring.
+Responsibilities: month-end close, reconciliations, data migration and process monitoring.
+Requirements: CPA, 5+ years of GAAP accounting, advanced Excel and QuickBooks. You will excel at detail.
+"""
+
+ACCOUNTANT_RESUME = """cv:
+  name: Jane Doe
+  sections:
+    experience:
+      - company: Acme
+        position: Accountant
+        highlights:
+          - Led month-end close and reconciliations under GAAP for 40 entities
+          - Built reconciliation models in Excel and QuickBooks, cutting close time 30%
+    certifications:
+      - CPA
+"""
+
+
+def test_non_tech_jd_has_no_tech_false_positives():
+    result = score_resume(ACCOUNTANT_RESUME, ACCOUNTANT_JD)
+    missing = {keyword.lower() for keyword in result["missing_keywords"]}
+    assert not missing & {"rest api", "spring boot", "cloud migration", "observability", "excel"}
+    assert result["score"] >= 90
+
+
+def test_non_tech_jd_weights_business_tools():
+    terms = canonical_terms(ACCOUNTANT_JD)
+    assert "excel" in terms and "quickbooks" in terms and "gaap" in terms
+    assert "rest api" not in terms and "spring boot" not in terms
+
+
+def test_ambiguous_aliases_count_in_tech_context():
+    terms = canonical_terms("Terraform, Ansible, Chef or Puppet. We ship on Spark and AWS Lambda behind REST APIs.")
+    assert {"chef", "puppet", "spark", "lambda", "rest api"} <= set(terms)
+
+
+def test_ambiguous_aliases_ignored_as_plain_words():
+    terms = canonical_terms("Meet the rest of the team this spring. You will excel here.")
+    assert not {"rest api", "spring boot", "excel"} & set(terms)
@@ -0,0 +1,50 @@
+import sheets_sync
+from sheets_sync import SHEETS_SYNC_MAX_ATTEMPTS, SheetsSync
+
+
+class FakeWorksheet:
+    def __init__(self, ids):
+        self.ids = ids
+        self.updates = []
+
+    def col_values(self, column):
+        return self.ids
+
+    def batch_update(self, updates):
+        self.updates.extend(updates)
+
+
+def make_sync(tmp_path, monkeypatch, worksheet):
+    monkeypatch.setenv("GOOGLE_SHEET_ID", "sheet")
+    monkeypatch.setattr(sheets_sync, "GOOGLE_SHEETS_API_URL", "http://fake")
+    sync = SheetsSync(str(tmp_path / "tracker.db"))
+    monkeypatch.setattr(sync, "_get_worksheet", lambda: worksheet)
+    return sync
+
+
+def test_dead_append_does_not_block_status_updates(tmp_path, monkeypatch):
+    worksheet = FakeWorksheet(["ID", "app-1"])
+    sync = make_sync(tmp_path, monkeypatch, worksheet)
+    sync.enqueue_append({"id": "app-1", "company_name": "Acme"})
+    conn = sync._conn()
+    with conn:
+        conn.execute("UPDATE sheets_outbox SET attempts = ?", (SHEETS_SYNC_MAX_ATTEMPTS,))
+
+    sync.enqueue_status("app-1", "Interview")
+    assert sync.flush() == 1
+    assert worksheet.updates == [{"range": "D2", "values": [["Interview"]]}]
+    assert sync.pending() == 0
+
+
+def test_status_waits_for_pending_append(tmp_path, monkeypatch):
+    worksheet = FakeWorksheet(["ID"])
+    sync = make_sync(tmp_path, monkeypatch, worksheet)
+    sync.enqueue_append({"id": "app-1"})
+    conn = sync._conn()
+    with conn:
+        conn.execute("UPDATE sheets_outbox SET attempts = 1, next_attempt_at = 1e12")
+
+    sync.enqueue_status("app-1", "Rejected")
+    assert sync.flush() == 0
+    assert worksheet.updates == []
+    assert sync.pending() == 2
@@ -0,0 +1,227 @@
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process locking, single server process assumed
+    fcntl = None
+
+# --- Render Toolchain Cache ---
+# Persistent home for everything the TeX/font toolchain caches on its own:
+# fontconfig's font scan (XDG_CACHE_HOME), TeX's generated font metrics and
+# luaotfload's font database (TEXMFVAR / TEXMFCACHE). Without it every render
+# worker, and every container boot, starts from an empty cache.
+#
+#   <RENDER_TOOLCHAIN_CACHE_DIR>/<toolchain key>/
+#       xdg-cache/      fontconfig cache
+#       texmf-var/      generated fonts, luaotfload names
+#       themes.json     theme -> last warm-up time
+#
+# The key covers the RenderCV, TeX and Python versions plus the installed font
+# directories, so an image upgrade starts a fresh directory and the stale one is
+# pruned. Per-document files (.aux, .log) still live in a throwaway directory per
+# render: reusing them would leak page counts between resumes. The TeX tools
+# write their caches atomically; the Python side only touches the cache under
+# an exclusive file lock.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RENDER_TOOLCHAIN_CACHE_DIR = os.environ.get(
+    "RENDER_TOOLCHAIN_CACHE_DIR", os.path.join(BASE_DIR, "data", "toolchain_cache")
+)
+RENDER_TOOLCHAIN_CACHE_MB = int(os.environ.get("RENDER_TOOLCHAIN_CACHE_MB", "512"))
+FONT_DIRS = ("/usr/share/fonts", "/usr/local/share/fonts", "/usr/share/texlive/texmf-dist/fonts")
+WARMUP_THEMES = ("classic", "engineering", "sb2nov")
+
+
+def _package_version(name: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return "none"
+
+
+def _command_version(command: str) -> str:
+    if not shutil.which(command):
+        return "none"
+    try:
+        output = subprocess.run([command, "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                timeout=10).stdout.decode("utf-8", "replace")
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return output.splitlines()[0] if output else "unknown"
+
+
+def toolchain_key() -> str:
+    # Memoized in the environment so spawned render workers reuse the parent's key
+    key = os.environ.get("RENDER_TOOLCHAIN_KEY")
+    if key:
+        return key
+    parts = {
+        "python": platform.python_version(),
+        "rendercv": _package_version("rendercv"),
+        "typst": _package_version("typst"),
+        "xelatex": _command_version("xelatex"),
+        "fonts": [(d, int(os.stat(d).st_mtime)) for d in FONT_DIRS if os.path.isdir(d)],
+    }
+    key = hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    os.environ["RENDER_TOOLCHAIN_KEY"] = key
+    return key
+
+
+def cache_dir() -> str:
+    return os.path.join(RENDER_TOOLCHAIN_CACHE_DIR, toolchain_key())
+
+
+def configure_environment() -> str:
+    # Points the TeX/font tools at the persistent cache; call before importing RenderCV
+    root = cache_dir()
+    xdg_cache = os.path.join(root, "xdg-cache")
+    texmf_var = os.path.join(root, "texmf-var")
+    try:
+        os.makedirs(xdg_cache, exist_ok=True)
+        os.makedirs(texmf_var, exist_ok=True)
+    except OSError as e:
+        print(f"Toolchain Cache Warning: {root} is not writable ({e}), using default caches")
+        return root
+    os.environ["XDG_CACHE_HOME"] = xdg_cache
+    os.environ["TEXMFVAR"] = texmf_var
+    os.environ["TEXMFCACHE"] = texmf_var
+    return root
+
+
+@contextlib.contextmanager
+def cache_lock():
+    os.makedirs(RENDER_TOOLCHAIN_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(RENDER_TOOLCHAIN_CACHE_DIR, ".lock"), "a") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def warmed_themes() -> dict:
+    try:
+        with open(os.path.join(cache_dir(), "themes.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def mark_warmed(theme: str):
+    with cache_lock():
+        themes = warmed_themes()
+        themes[theme] = time.time()
+        path = os.path.join(cache_dir(), "themes.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(themes, f)
+        os.replace(tmp_path, path)
+
+
+def prune(limit_bytes: int = RENDER_TOOLCHAIN_CACHE_MB * 1024 * 1024) -> dict:
+    # Drops caches of other toolchain versions, then the oldest generated files of
+    # the current one until under budget. Run before workers start (startup, warm-up).
+    removed = 0
+    with cache_lock():
+        current = toolchain_key()
+        for name in os.listdir(RENDER_TOOLCHAIN_CACHE_DIR):
+            path = os.path.join(RENDER_TOOLCHAIN_CACHE_DIR, name)
+            if name != current and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        root = cache_dir()
+        size = _dir_size(root)
+        if size > limit_bytes:
+            files = []
+            for dirpath, dirs, names in os.walk(os.path.join(root, "texmf-var")):
+                for name in names:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.lstat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+            for _, file_size, path in sorted(files):
+                if size <= limit_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    size -= file_size
+                    removed += 1
+                except OSError:
+                    pass
+    return {"removed": removed, "bytes": size}
+
+
+def snapshot() -> dict:
+    root = cache_dir()
+    return {
+        "dir": root,
+        "key": toolchain_key(),
+        "bytes": _dir_size(root) if os.path.isdir(root) else 0,
+        "limit_bytes": RENDER_TOOLCHAIN_CACHE_MB * 1024 * 1024,
+        "warmed_themes": sorted(warmed_themes()),
+    }
+
+
+def warmup_yaml(theme: str) -> str:
+    # Smallest resume that still loads the theme's fonts and packages
+    import yaml
+    return yaml.safe_dump({
+        "cv": {
+            "name": "Cache Warmup",
+            "email": "warmup@example.com",
+            "sections": {
+                "summary": ["Warm-up render for the toolchain cache."],
+                "experience": [{"company": "Example", "position": "Engineer", "start_date": "2020-01",
+                                "end_date": "present", "highlights": ["Warm-up"]}],
+            },
+        },
+        "design": {"theme": theme},
+    }, sort_keys=False)
+
+
+def warm(themes=WARMUP_THEMES) -> int:
+    # Build-time / boot-time warm-up: fontconfig scan plus one render per theme.
+    # Returns the number of themes that rendered; never raises.
+    configure_environment()
+    prune()
+    if shutil.which("fc-cache"):
+        subprocess.run(["fc-cache"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    from render_pool import render_warmup
+    warmed = 0
+    for theme in themes:
+        start = time.perf_counter()
+        ok, detail = render_warmup(theme)
+        print(f"Toolchain warm-up {theme}: {'ok' if ok else 'failed'} in {time.perf_counter() - start:.1f}s"
+              + ("" if ok else f" ({detail})"))
+        warmed += ok
+    return warmed
+
+
+if __name__ == "__main__":
+    # python toolchain_cache.py [theme ...]   (run in the Dockerfile after installing TeX and fonts)
+    count = warm(sys.argv[1:] or WARMUP_THEMES)
+    print(f"Toolchain cache ready at {cache_dir()} ({count} themes warmed)")
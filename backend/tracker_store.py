@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+
+# --- Application Tracker Store ---
+# SQLite (WAL) replacement for applications_db.json: single-row writes,
+# indexed filters, server-side pagination. Latency stays flat as the table grows.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACKER_DB_PATH = os.environ.get("TRACKER_DB_PATH", os.path.join(BASE_DIR, "data", "tracker.db"))
+LEGACY_JSON_DB = "applications_db.json"
+
+COLUMNS = ["id", "company_name", "job_title", "status", "date_applied", "job_description"]
+SORTABLE = {
+    "created": "rowid",
+    "date_applied": "date_applied",
+    "company_name": "company_name COLLATE NOCASE",
+    "job_title": "job_title COLLATE NOCASE",
+    "status": "status",
+}
+
+
+class TrackerStore:
+    def __init__(self, db_path: str = TRACKER_DB_PATH, legacy_json: str = LEGACY_JSON_DB):
+        self.db_path = db_path
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; FastAPI runs sync endpoints on a threadpool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS applications (
+                        id TEXT PRIMARY KEY,
+                        company_name TEXT NOT NULL,
+                        job_title TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'Applied',
+                        date_applied TEXT NOT NULL,
+                        job_description TEXT NOT NULL DEFAULT ''
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_date ON applications(date_applied)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._migrate_legacy_json(conn)
+            self._initialized = True
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        # One-time import of the old applications_db.json (newest-first list)
+        if conn.execute("SELECT 1 FROM meta WHERE key='legacy_json_imported'").fetchone():
+            return
+        imported = 0
+        if os.path.exists(self.legacy_json):
+            try:
+                with open(self.legacy_json, "r") as f:
+                    entries = json.load(f)
+            except Exception as e:
+                # Not marked as imported: the next start retries once the file is readable
+                print(f"Tracker Migration Warning: could not read {self.legacy_json}: {e}")
+                return
+            rows = []
+            for entry in reversed(entries):  # oldest first so rowid order == insertion order
+                if not entry.get("id"):
+                    continue
+                rows.append((
+                    entry["id"],
+                    entry.get("company_name", ""),
+                    entry.get("job_title", ""),
+                    entry.get("status") or "Applied",
+                    entry.get("date_applied", ""),
+                    entry.get("job_description") or "",
+                ))
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO applications (id, company_name, job_title, status, date_applied, job_description) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+            imported = len(rows)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_json_imported', ?)", (str(imported),))
+        if imported:
+            print(f"Tracker Migration: imported {imported} applications from {self.legacy_json}")
+
+    # --- Queries ---
+
+    def list(self, limit: int = None, offset: int = 0, status: str = None, q: str = None,
+             sort: str = "created", order: str = "desc"):
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if q:
+            where.append("(company_name LIKE ? OR job_title LIKE ?)")
+            params.extend([f"%{q}%", f"%{q}%"])
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        order_sql = f"{SORTABLE.get(sort, 'rowid')} {'ASC' if order == 'asc' else 'DESC'}"
+
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM applications {where_sql}", params).fetchone()[0]
+        page_sql = f"SELECT {', '.join(COLUMNS)} FROM applications {where_sql} ORDER BY {order_sql}"
+        page_params = list(params)
+        if limit is not None:
+            page_sql += " LIMIT ? OFFSET ?"
+            page_params.extend([limit, offset])
+        rows = [dict(row) for row in conn.execute(page_sql, page_params)]
+        return rows, total
+
+    def get(self, app_id: str):
+        row = self._conn().execute(f"SELECT {', '.join(COLUMNS)} FROM applications WHERE id = ?", (app_id,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, data: dict) -> dict:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO applications (id, company_name, job_title, status, date_applied, job_description) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(data.get(c) if data.get(c) is not None else "" for c in COLUMNS),
+            )
+        return data
+
+    def delete(self, app_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM applications WHERE id = ?", (app_id,)).rowcount > 0
+
+    def update_status(self, app_id: str, status: str):
+        conn = self._conn()
+        with conn:
+            updated = conn.execute("UPDATE applications SET status = ? WHERE id = ?", (status, app_id)).rowcount
+        return self.get(app_id) if updated else None
+
+
+tracker_store = TrackerStore()
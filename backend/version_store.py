@@ -0,0 +1,311 @@
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import yaml
+
+from resume_doc import parse_yaml
+from resume_units import section_kind
+
+# --- Version Store ---
+# Saved resume versions as immutable, content-addressed objects in SQLite:
+# - a revision's text is split into chunks at structural YAML lines (section
+#   headers, list entries), each chunk stored once as a zlib blob keyed by its
+#   sha256; a tailored variant that changes two bullets re-uses every other chunk
+# - a revision is an ordered list of chunk hashes (itself a blob, the "tree")
+# - `versions` holds one row per name pointing at its head revision, and
+#   `version_skills` indexes the head's skills, so listing, latest-by-name and
+#   "which versions mention skill X" are index lookups, not directory scans
+# Text round-trips byte for byte (comments and formatting included).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VERSION_STORE_PATH = os.environ.get("VERSION_STORE_PATH", os.path.join(BASE_DIR, "data", "version_store.db"))
+LEGACY_VERSIONS_DIR = os.path.join(BASE_DIR, "data", "versions")
+
+# A new chunk starts at a list entry or a block key, at most this deep; bullets stay inside their entry
+_CHUNK_BOUNDARY = re.compile(r"^ {0,6}(- |[^\s#:][^:]*:\s*$)")
+_SKILL_SPLIT = re.compile(r"[,;|]")
+_PARENTHETICAL = re.compile(r"\(([^()]*)\)")
+
+
+def sanitize_name(name: str) -> str:
+    return "".join([c for c in name if c.isalnum() or c in (' ', '-', '_')]).strip()
+
+
+def split_chunks(text: str) -> list:
+    chunks, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and _CHUNK_BOUNDARY.match(line):
+            chunks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def extract_skills(text: str) -> list:
+    # Normalized skill names from the skills-like sections; [] if the YAML doesn't parse
+    try:
+        data = parse_yaml(text)
+    except yaml.YAMLError:
+        return []
+    sections = ((data or {}).get("cv") or {}).get("sections") if isinstance(data, dict) else None
+    if not isinstance(sections, dict):
+        return []
+    values = []
+    for name, entries in sections.items():
+        if section_kind(name) != "skills" or not isinstance(entries, list):
+            continue
+        for entry in entries:
+            if isinstance(entry, dict):
+                values.extend(str(entry.get(k)) for k in ("details", "bullet", "name") if entry.get(k))
+            elif isinstance(entry, str):
+                values.append(entry)
+    # "Kubernetes (EKS, AKS), Docker" -> kubernetes, eks, aks, docker
+    names = []
+    for value in values:
+        names.extend(name for inner in _PARENTHETICAL.findall(value) for name in _SKILL_SPLIT.split(inner))
+        names.extend(_SKILL_SPLIT.split(_PARENTHETICAL.sub("", value)))
+    skills = {" ".join(name.split()).strip(" .").lower() for name in names}
+    return sorted(skill for skill in skills if skill and len(skill) <= 60)
+
+
+class VersionStore:
+    def __init__(self, db_path: str = VERSION_STORE_PATH, legacy_dir: str = LEGACY_VERSIONS_DIR):
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        # Re-entrant: the first connection runs the legacy import, which saves
+        self._write_lock = threading.RLock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS objects (
+                        hash TEXT PRIMARY KEY,
+                        data BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        refcount INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS revisions (
+                        name TEXT NOT NULL,
+                        rev INTEGER NOT NULL,
+                        tree TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        theme TEXT,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (name, rev)
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS versions (
+                        name TEXT PRIMARY KEY,
+                        head_rev INTEGER NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        theme TEXT,
+                        revisions INTEGER NOT NULL,
+                        skills INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS version_skills (
+                        skill TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        PRIMARY KEY (skill, name)
+                    ) WITHOUT ROWID
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_versions_updated ON versions(updated_at)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._initialized = True
+            self._import_legacy_files(conn)
+
+    def _import_legacy_files(self, conn: sqlite3.Connection):
+        # One-time import of data/versions/{name}.yaml; a {name}.yaml.bak becomes the revision before it
+        if conn.execute("SELECT 1 FROM meta WHERE key='legacy_files_imported'").fetchone():
+            return
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(self.legacy_dir, "*.yaml"))):
+            name = sanitize_name(os.path.basename(path)[:-len(".yaml")])
+            if not name:
+                continue
+            for candidate in (path + ".bak", path):
+                if not os.path.exists(candidate):
+                    continue
+                try:
+                    with open(candidate, "r") as f:
+                        self.save(name, f.read(), created_at=os.path.getmtime(candidate))
+                    imported += 1
+                except OSError as e:
+                    print(f"Version Store Migration Warning: could not read {candidate}: {e}")
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_files_imported', ?)", (str(imported),))
+        if imported:
+            print(f"Version Store Migration: imported {imported} revisions from {self.legacy_dir}")
+
+    # --- Objects ---
+
+    def _put_object(self, conn: sqlite3.Connection, data: bytes) -> tuple:
+        # -> (hash, created); adds one reference either way
+        digest = hashlib.sha256(data).hexdigest()
+        updated = conn.execute("UPDATE objects SET refcount = refcount + 1 WHERE hash = ?", (digest,)).rowcount
+        if not updated:
+            conn.execute("INSERT INTO objects (hash, data, size, refcount) VALUES (?, ?, ?, 1)",
+                         (digest, zlib.compress(data, 6), len(data)))
+        return digest, not updated
+
+    def _get_object(self, conn: sqlite3.Connection, digest: str) -> bytes:
+        row = conn.execute("SELECT data FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing object {digest}")
+        return zlib.decompress(row[0])
+
+    def _release_object(self, conn: sqlite3.Connection, digest: str) -> bool:
+        # Drops one reference; returns True when the object was deleted
+        conn.execute("UPDATE objects SET refcount = refcount - 1 WHERE hash = ?", (digest,))
+        return bool(conn.execute("DELETE FROM objects WHERE hash = ? AND refcount <= 0", (digest,)).rowcount)
+
+    # --- Writes ---
+
+    def save(self, name: str, text: str, theme: str = None, created_at: float = None) -> dict:
+        # Appends a revision unless the text equals the current head; returns the head row
+        now = created_at or time.time()
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._write_lock:
+            conn = self._conn()
+            head = conn.execute("SELECT * FROM versions WHERE name = ?", (name,)).fetchone()
+            if head and head["content_hash"] == content_hash and head["theme"] == theme:
+                return {**dict(head), "created": False}
+            with conn:
+                chunks = [chunk.encode("utf-8") for chunk in split_chunks(text)]
+                tree_hash, created = self._put_object(conn, "\n".join(
+                    hashlib.sha256(chunk).hexdigest() for chunk in chunks
+                ).encode("ascii"))
+                if created:
+                    # A new tree holds one reference to each of its chunks (existing trees already do)
+                    for chunk in chunks:
+                        self._put_object(conn, chunk)
+                rev = (head["head_rev"] + 1) if head else 1
+                conn.execute(
+                    "INSERT INTO revisions (name, rev, tree, content_hash, size, theme, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (name, rev, tree_hash, content_hash, len(text), theme, now),
+                )
+                skills = extract_skills(text)
+                conn.execute("DELETE FROM version_skills WHERE name = ?", (name,))
+                conn.executemany("INSERT INTO version_skills (skill, name) VALUES (?, ?)", [(s, name) for s in skills])
+                conn.execute(
+                    "INSERT INTO versions (name, head_rev, content_hash, size, theme, revisions, skills, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET head_rev = excluded.head_rev, content_hash = excluded.content_hash, "
+                    "size = excluded.size, theme = excluded.theme, revisions = versions.revisions + 1, "
+                    "skills = excluded.skills, updated_at = excluded.updated_at",
+                    (name, rev, content_hash, len(text), theme, len(skills), now, now),
+                )
+            return {**dict(conn.execute("SELECT * FROM versions WHERE name = ?", (name,)).fetchone()), "created": True}
+
+    def delete(self, name: str) -> int:
+        # Removes the name and its whole history; chunks shared with other versions stay
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                trees = [row[0] for row in conn.execute("SELECT tree FROM revisions WHERE name = ?", (name,))]
+                for tree in trees:
+                    tree_data = self._get_object(conn, tree)
+                    if self._release_object(conn, tree):
+                        for chunk in tree_data.decode("ascii").split("\n"):
+                            if chunk:
+                                self._release_object(conn, chunk)
+                conn.execute("DELETE FROM revisions WHERE name = ?", (name,))
+                conn.execute("DELETE FROM version_skills WHERE name = ?", (name,))
+                conn.execute("DELETE FROM versions WHERE name = ?", (name,))
+            return len(trees)
+
+    # --- Reads ---
+
+    def list(self, skill: str = None) -> list:
+        conn = self._conn()
+        if skill:
+            rows = conn.execute(
+                "SELECT v.* FROM version_skills s JOIN versions v ON v.name = s.name WHERE s.skill = ? ORDER BY v.name",
+                (skill.strip().lower(),),
+            )
+        else:
+            rows = conn.execute("SELECT * FROM versions ORDER BY name")
+        return [dict(row) for row in rows]
+
+    def head(self, name: str):
+        row = self._conn().execute("SELECT * FROM versions WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def read(self, name: str, rev: int = None):
+        # -> (text, revision row) or (None, None)
+        conn = self._conn()
+        if rev is None:
+            row = conn.execute(
+                "SELECT r.* FROM versions v JOIN revisions r ON r.name = v.name AND r.rev = v.head_rev WHERE v.name = ?",
+                (name,),
+            ).fetchone()
+        else:
+            row = conn.execute("SELECT * FROM revisions WHERE name = ? AND rev = ?", (name, rev)).fetchone()
+        if row is None:
+            return None, None
+        hashes = self._get_object(conn, row["tree"]).decode("ascii").split("\n")
+        placeholders = ",".join("?" * len(hashes))
+        blobs = {h: zlib.decompress(d) for h, d in conn.execute(
+            f"SELECT hash, data FROM objects WHERE hash IN ({placeholders})", hashes
+        )}
+        return b"".join(blobs[h] for h in hashes if h).decode("utf-8"), dict(row)
+
+    def history(self, name: str) -> list:
+        rows = self._conn().execute(
+            "SELECT rev, content_hash, size, theme, created_at FROM revisions WHERE name = ? ORDER BY rev DESC", (name,)
+        )
+        return [dict(row) for row in rows]
+
+    def snapshot(self) -> dict:
+        conn = self._conn()
+        objects, stored, raw = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()
+        revisions, logical = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM revisions").fetchone()
+        return {
+            "versions": conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0],
+            "revisions": revisions,
+            "objects": objects,
+            "logical_bytes": logical,  # sum of every revision's full text
+            "unique_bytes": raw,
+            "stored_bytes": stored,  # after dedup and compression
+            "dedup_ratio": round(logical / stored, 2) if stored else 0.0,
+        }
+
+
+version_store = VersionStore()
@@ -0,0 +1,102 @@
+import re
+import yaml
+
+# --- Incremental Section Validator ---
+# Consumes rewritten YAML as it streams from the model and reports each
+# `cv.sections.<name>` block as soon as it closes (the next sibling key or a
+# dedent appears), instead of waiting for the whole document.
+
+_KEY_LINE = re.compile(r"^(\s*)([A-Za-z0-9_\- ]+):\s*(.*)$")
+
+
+class SectionStreamValidator:
+    def __init__(self):
+        self._pending = ""          # partial line not yet terminated by "\n"
+        self._sections_indent = None
+        self._child_indent = None
+        self._current_name = None
+        self._current_lines = []
+
+    def feed(self, chunk: str) -> list:
+        self._pending += chunk
+        *lines, self._pending = self._pending.split("\n")
+        results = []
+        for line in lines:
+            results.extend(self._consume(line))
+        return results
+
+    def finish(self) -> list:
+        results = []
+        if self._pending:
+            results.extend(self._consume(self._pending))
+            self._pending = ""
+        results.extend(self._close_current())
+        return results
+
+    def _consume(self, line: str) -> list:
+        # Ignore markdown fences the model sometimes wraps around YAML
+        if line.strip().startswith("```"):
+            return []
+        line = line.replace("**", "")
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            if self._current_name is not None:
+                self._current_lines.append(line)
+            return []
+
+        indent = len(line) - len(line.lstrip(" "))
+        match = _KEY_LINE.match(line)
+
+        if self._sections_indent is None:
+            if match and match.group(2) == "sections" and not match.group(3):
+                self._sections_indent = indent
+            return []
+
+        if indent <= self._sections_indent:
+            # Left the sections mapping entirely
+            results = self._close_current()
+            self._sections_indent = None
+            self._child_indent = None
+            if match and match.group(2) == "sections" and not match.group(3):
+                self._sections_indent = indent
+            return results
+
+        if self._child_indent is None:
+            self._child_indent = indent
+
+        if indent == self._child_indent and match and not stripped.startswith("-"):
+            results = self._close_current()
+            self._current_name = match.group(2)
+            self._current_lines = [line]
+            return results
+
+        if self._current_name is not None:
+            self._current_lines.append(line)
+        return []
+
+    def _close_current(self) -> list:
+        if self._current_name is None:
+            return []
+        name, lines = self._current_name, self._current_lines
+        self._current_name, self._current_lines = None, []
+        return [validate_section(name, "\n".join(l[self._child_indent:] for l in lines))]
+
+
+def validate_section(name: str, snippet: str) -> dict:
+    result = {"section": name, "valid": True, "entries": 0, "error": None}
+    try:
+        parsed = yaml.safe_load(snippet) or {}
+        value = parsed.get(name)
+        # Same shape rules the post-processor enforces: sections are lists,
+        # references/signature may arrive as a bare string and get wrapped.
+        if isinstance(value, str) and name in ("references", "signature"):
+            value = [value]
+        if not isinstance(value, list):
+            raise ValueError(f"section '{name}' must be a list, got {type(value).__name__}")
+        if not value:
+            raise ValueError(f"section '{name}' is empty")
+        result["entries"] = len(value)
+    except Exception as e:
+        result["valid"] = False
+        result["error"] = str(e)
+    return result
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 
 export default function Home() {
   const [jd, setJd] = useState("");
@@ -59,6 +59,39 @@ export default function Home() {
   // Results
   // Results
   const [pdfUrl, setPdfUrl] = useState<string | null>(null);
+
+  // Live Preview: edits go over a WebSocket; the server debounces and skips unchanged documents
+  const [livePreview, setLivePreview] = useState(false);
+  const previewSocket = useRef<WebSocket | null>(null);
+  // Latest editor state, so a socket that opens after further edits sends the current document
+  const previewDoc = useRef({ yaml, theme });
+  previewDoc.current = { yaml, theme };
+
+  useEffect(() => {
+    if (!livePreview) return;
+    const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, "ws")}/preview/ws`);
+    socket.onopen = () => socket.send(JSON.stringify({ type: "edit", ...previewDoc.current }));
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === "preview") {
+        setPdfUrl(`${API_BASE_URL}${message.pdf_url}`);
+      } else if (message.type === "error") {
+        console.warn("Live preview:", message.detail);
+      }
+    };
+    previewSocket.current = socket;
+    return () => {
+      socket.close();
+      previewSocket.current = null;
+    };
+  }, [livePreview]);
+
+  useEffect(() => {
+    const socket = previewSocket.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: "edit", yaml, theme }));
+    }
+  }, [yaml, theme]);
   const [atsAnalysis, setAtsAnalysis] = useState<any>(null);
   const [aiDetection, setAiDetection] = useState<any>(null);
 
@@ -110,11 +143,11 @@ export default function Home() {
     const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || "https://resume-backend-463635413770.asia-south1.run.app";
 
     try {
-      // --- Step 1: Rewrite ---
+      // --- Single round trip: Rewrite -> (ATS || Render) runs server-side ---
       setCurrentStep("rewriting");
-      setStatusMessage("AI is rewriting your resume to match the Job Description...");
+      setStatusMessage("AI is rewriting your resume, scoring it and rendering the PDF...");
 
-      const rewriteRes = await fetch(`${backendUrl}/rewrite`, {
+      const tailorRes = await fetch(`${backendUrl}/tailor?format=url`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -122,51 +155,21 @@ export default function Home() {
           current_yaml: yaml,
           target_region: targetRegion,
           user_comments: userComments,
-          api_key: apiKey
-        })
-      });
-
-      if (!rewriteRes.ok) throw new Error((await rewriteRes.json()).detail || "Rewrite failed");
-      const rewriteData = await rewriteRes.json();
-
-      // Update the YAML in the editor so the user sees the transformation
-      const newYaml = rewriteData.yaml;
-      setYaml(newYaml);
-
-      // --- Step 2: Parallel ATS & Render ---
-      // We can run these together to save time
-      setCurrentStep("analyzing"); // "analyzing" & "rendering" conceptually
-      setStatusMessage("Calculating ATS Score & Rendering PDF...");
-
-      const atsPromise = fetch(`${backendUrl}/ats_score`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          job_description: jd,
-          resume_yaml: newYaml,
-          api_key: apiKey
-        })
-      });
-
-      const renderPromise = fetch(`${backendUrl}/render`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          resume_yaml: newYaml,
+          api_key: apiKey,
           theme: theme
         })
       });
 
-      const [atsRes, renderRes] = await Promise.all([atsPromise, renderPromise]);
+      if (!tailorRes.ok) throw new Error((await tailorRes.json()).detail || "Rewrite failed");
+      const tailorData = await tailorRes.json();
 
-      if (!atsRes.ok) throw new Error("ATS Analysis failed");
-      if (!renderRes.ok) throw new Error("PDF Rendering failed");
-
-      const atsData = await atsRes.json();
-      const renderData = await renderRes.json();
+      // Update the YAML in the editor so the user sees the transformation
+      setYaml(tailorData.yaml);
+      setAtsAnalysis(tailorData.ats);
 
-      setAtsAnalysis(atsData);
-      setPdfUrl("data:application/pdf;base64," + renderData.pdf_base64);
+      if (tailorData.render_error) throw new Error("PDF Rendering failed: " + tailorData.render_error);
+      // PDF is fetched as binary from the render cache instead of riding along as base64
+      setPdfUrl(`${backendUrl}${tailorData.pdf_url}`);
 
       setCurrentStep("complete");
       setStatusMessage("Optimization Complete!");
@@ -186,7 +189,7 @@ export default function Home() {
       const res = await fetch(`${API_BASE_URL}/detect_ai`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ resume_yaml: yaml, api_key: apiKey })
+        body: JSON.stringify({ resume_yaml: yaml, api_key: apiKey, mode: "fast" })
       });
 
       const data = await res.json();
@@ -238,7 +241,7 @@ export default function Home() {
     setIsGeneratingClPdf(true);
 
     try {
-      const res = await fetch(`${API_BASE_URL}/render_cover_letter_pdf`, {
+      const res = await fetch(`${API_BASE_URL}/render_cover_letter_pdf?format=pdf`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -249,15 +252,16 @@ export default function Home() {
       });
 
       if (!res.ok) throw new Error("PDF Generation failed");
-      const data = await res.json();
+      const blobUrl = URL.createObjectURL(await res.blob());
 
       // Download logic
       const link = document.createElement('a');
-      link.href = "data:application/pdf;base64," + data.pdf_base64;
+      link.href = blobUrl;
       link.download = `${downloadName}_Cover_Letter.pdf`;
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      URL.revokeObjectURL(blobUrl);
 
     } catch (e: any) {
       alert("Failed to download PDF: " + e.message);
@@ -606,6 +610,7 @@ export default function Home() {
                         {versions.map(v => <option key={v} value={v}>{v}</option>)}
                       </select>
                       <button onClick={() => setShowSaveVersion(true)} className="text-[10px] text-slate-400 hover:text-white">💾</button>
+                      <button onClick={() => setLivePreview(!livePreview)} title="Live preview while editing" className={`text-[10px] font-bold ${livePreview ? "text-green-400" : "text-slate-400"} hover:text-white`}>● LIVE</button>
                     </div>
                   </div>
 